@@ -1,25 +1,46 @@
 import asyncio
 import json
+import time
 import uuid
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware  # Import CORS middleware
 
+from app.main.models.BatchCircuitRequest import BatchCircuitRequest
+from app.main.models.BatchTaskResponse import BatchTaskResponse
 from app.main.models.QuantumCircuitRequest import QuantumCircuitRequest
+from app.main.models.TaskListResponse import TaskListResponse
 from app.main.models.TaskResponse import TaskResponse
+from app.main.models.TaskSummary import TaskSummary
 from app.main.models.PendingTaskResponse import PendingTaskResponse
-from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.models.QueuedBatch import QueuedBatch
+from app.main.models.QueuedSweep import QueuedSweep
+from app.main.models.QueuedTask import QueuedTask
+from app.main.models.SweepPoint import SweepPoint
+from app.main.models.SweepRequest import SweepRequest
+from app.main.models.SweepResultPage import SweepResultPage
 from app.main.models.CompletedTaskResponse import CompletedTaskResponse
 from app.main.models.ErrorTaskResponse import ErrorTaskResponse
-from app.main.exceptions.custom_exceptions import QASMParsingError, CircuitExecutionError, RedisConnectionError, \
-    TaskProcessingError, TaskTimeoutError
+from app.main.redis_connection import REDIS_HOST, REDIS_PORT, create_async_redis_client, wait_for_redis
+from app.main.service.circuit_sweep import SWEEP_MAX_POINTS, sweep_size
+from app.main.service.counts_encoding import PackedCounts, counts_to_bytes, decode_counts
+from app.main.service.pipeline_metrics import render_metrics
+from app.main.service.qasm_translator import normalize_qasm
+from app.main.service.result_cache import ResultCache
+from app.main.service.shot_memory import ShotMemory, memory_item_size
+from app.main.service.single_flight import COALESCE_ENABLED, SingleFlight, flight_key
+from app.main.service.sweep_results import SweepResults
+from app.main.service.task_events import task_events
+from app.main.service.task_index import TASK_STATUSES, TaskIndex
+from app.main.service.task_queue import TaskQueue
+from app.main.service.task_scheduler import estimate_cost
 
 import logging
-import redis
 import os
-
-load_dotenv()
+import redis
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,26 +48,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6378))
-try:
-    redis_client = redis.Redis(
-        host=REDIS_HOST,
-        port=REDIS_PORT,
-        db=0,
-        decode_responses=True
-    )
-    redis_client.ping()
-    logger.info(f"Successfully connected to Redis at {REDIS_HOST}:{REDIS_PORT}")
-except redis.ConnectionError as e:
-    logger.error(f"Failed to connect to Redis: {str(e)}")
-    logger.error(f"Connection details: {REDIS_HOST}:{REDIS_PORT}")
-    raise RedisConnectionError(host=REDIS_HOST, port=REDIS_PORT)
+BATCH_MAX_CIRCUITS = int(os.getenv("BATCH_MAX_CIRCUITS", 1000))
+TASK_LIST_MAX_LIMIT = int(os.getenv("TASK_LIST_MAX_LIMIT", 1000))
+SWEEP_PAGE_MAX_LIMIT = int(os.getenv("SWEEP_PAGE_MAX_LIMIT", 1000))
+# Every open event stream holds one subscriber connection
+TASK_EVENTS_MAX_STREAMS = int(os.getenv("TASK_EVENTS_MAX_STREAMS", 1000))
+
+# Handlers share one asyncio client and its bounded connection pool; event
+# streams subscribe through their own pool so they cannot starve requests
+redis_client = create_async_redis_client()
+pubsub_client = create_async_redis_client(max_connections=TASK_EVENTS_MAX_STREAMS)
+
+task_queue = TaskQueue(redis_client)
+result_cache = ResultCache(redis_client)
+task_index = TaskIndex(redis_client)
+shot_memory = ShotMemory(redis_client)
+sweep_results = SweepResults(redis_client)
+single_flight = SingleFlight(redis_client)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Connect to Redis in the background, so the API serves liveness probes while Redis is still coming up.
+
+    Until Redis answers, requests that need it fail and the readiness probe
+    keeps the replica out of the load balancer.
+    """
+    async def connect():
+        attempts = await wait_for_redis(redis_client)
+        logger.info(f"Successfully connected to Redis at {REDIS_HOST}:{REDIS_PORT} after {attempts} attempts")
+
+    connecting = asyncio.create_task(connect())
+    try:
+        yield
+    finally:
+        connecting.cancel()
+
 
 app = FastAPI(
     title="Quantum Circuit API",
     description="API for executing Quantum Circuits asynchronously",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -58,102 +102,131 @@ app.add_middleware(
 )
 
 
-async def process_quantum_circuit(task_id: str, qasm_string: str, timeout: int = 30):
+def _task_response(task_data):
     """
-    Process a quantum circuit asynchronously.
-
-    Args:
-        task_id: Unique task identifier
-        qasm_string: QASM representation of a quantum circuit
-        timeout: Maximum processing time in seconds
+    Build the API response for the contents of a task:{task_id} hash.
     """
-    try:
-
-        await asyncio.sleep(30)
-
-        service = QuantumCircuitService(shots=1024)
-
-        result = await asyncio.wait_for(service.execute_qasm(qasm_string), timeout=timeout)
-
-        if result.get("error", False):
-            redis_client.hset(
-                f"task:{task_id}",
-                mapping={
-                    "status": "error",
-                    "message": result.get("message", "Unknown error")
-                }
-            )
-        else:
-            redis_client.hset(
-                f"task:{task_id}",
-                mapping={
-                    "status": "completed",
-                    "result": json.dumps(result.get("counts", {}))
-                }
-            )
+    if not task_data:
+        return ErrorTaskResponse(
+            status="error",
+            message="Task not found."
+        )
 
-        logger.info(f"Task {task_id} completed successfully")
-    except asyncio.TimeoutError:
-        logger.error(f"Task {task_id} timed out after {timeout} seconds")
-        redis_client.hset(
-            f"task:{task_id}",
-            mapping={
-                "status": "error",
-                "message": f"Task timed out after {timeout} seconds"
-            }
+    task_data = {k.decode() if isinstance(k, bytes) else k:
+                     v.decode() if isinstance(v, bytes) else v
+                 for k, v in task_data.items()}
+
+    status = task_data.get("status")
+
+    if status == "completed":
+        result_data = decode_counts(task_data.get("result", "{}"))
+        return CompletedTaskResponse(
+            status="completed",
+            result=result_data.to_dict() if isinstance(result_data, PackedCounts) else result_data,
+            method=task_data.get("method"),
+            optimization=json.loads(task_data["optimization"]) if "optimization" in task_data else None,
+            queue_wait_seconds=task_data.get("queue_wait_seconds"),
+            memory_shots=task_data.get("memory_shots"),
+            coalesced_with=task_data.get("coalesced_with"),
+            sweep_points=task_data.get("sweep_points")
         )
-        raise TaskTimeoutError(task_id=task_id, timeout=timeout)
-    except QASMParsingError as e:
-        logger.error(f"QASM parsing error for task {task_id}: {str(e)}")
-        redis_client.hset(
-            f"task:{task_id}",
-            mapping={
-                "status": "error",
-                "message": f"QASM parsing error: {str(e)}"
-            }
+    elif status == "error":
+        return ErrorTaskResponse(
+            status="error",
+            message=task_data.get("message", "Unknown error"),
+            queue_wait_seconds=task_data.get("queue_wait_seconds")
         )
-    except CircuitExecutionError as e:
-        logger.error(f"Circuit execution error for task {task_id}: {str(e)}")
-        redis_client.hset(
-            f"task:{task_id}",
-            mapping={
-                "status": "error",
-                "message": f"Circuit execution error: {str(e)}"
-            }
+    else:
+        return PendingTaskResponse(
+            status="pending",
+            message=task_data.get("message", "Task is still in progress."),
+            queue_wait_seconds=task_data.get("queue_wait_seconds")
         )
+
+
+def _submission_key_and_cost(request, coalesce):
+    """
+    Flight key (None unless coalesce is set) and estimated cost of a submitted task.
+
+    The program is translated once for both.
+    """
+    try:
+        normalized = normalize_qasm(request.qc)
     except Exception as e:
-        logger.error(f"Unexpected error processing task {task_id}: {str(e)}")
-        redis_client.hset(
-            f"task:{task_id}",
-            mapping={
-                "status": "error",
-                "message": f"Unexpected error: {str(e)}"
-            }
-        )
-        raise TaskProcessingError(task_id=task_id, message=str(e))
+        # Malformed programs run alone, at no cost, and fail fast on the worker
+        logger.warning(f"Could not translate a submitted circuit: {str(e)}")
+        return None, 0.0
+    key = flight_key(request.qc, request.shots, request.seed, normalized=normalized) if coalesce else None
+    return key, estimate_cost(request.qc, request.shots, translated=normalized).seconds
 
 
 @app.post("/api/tasks", response_model=TaskResponse, status_code=202)
-async def create_task(request: QuantumCircuitRequest, background_tasks: BackgroundTasks):
+async def create_task(request: QuantumCircuitRequest):
     """
     Submit a quantum circuit for asynchronous processing.
 
     - **qc**: Serialized quantum circuit in QASM3 format
-
+    - **shots**: Optional number of shots
+    - **seed**: Optional simulator seed; repeated seeded submissions are served from the result cache
+    - **use_cache**: Set to false to always run the simulation
+    - **memory**: Set to true to keep the outcome of every shot (see GET /api/tasks/{task_id}/memory)
+    - **priority**: Priority class, one of high, normal (default) and low
+
+    While a task with the same circuit, shots and seed is queued or running,
+    the new task is attached to it instead of being queued, and gets a copy
+    of its outcome.
+
+    The task is added to the Redis work queue and executed by a worker
+    process (see app/main/worker.py). Within a priority class, cheaper
+    circuits run first; the estimated cost is derived from the qubit count,
+    gate count, depth and shots (see task_scheduler.py).
     Returns a unique task ID for tracking the processing status.
     """
     task_id = str(uuid.uuid4())
+    # Shot memory is kept per task, so such tasks always run on their own
+    coalesce = COALESCE_ENABLED and request.use_cache and not request.memory
+    # Translating a large program takes seconds, too long to block the event loop
+    key, cost = await asyncio.to_thread(_submission_key_and_cost, request, coalesce)
 
     try:
-        redis_client.hset(
+        pipeline = redis_client.pipeline()
+        pipeline.hset(
             f"task:{task_id}",
             mapping={
                 "status": "pending",
-                "message": "Task submitted successfully."
+                "message": "Task submitted successfully.",
+                "created_at": time.time()
             }
         )
+        await task_index.add([task_id], pipeline)
+        if key is not None:
+            # The hash is written before the task can be found as a follower,
+            # so it never overwrites the outcome fanned out to it
+            await pipeline.execute()
+            leader_id = await single_flight.join(key, task_id)
+            if leader_id is not None:
+                logger.info(f"Task {task_id} attached to identical task {leader_id}")
+                return TaskResponse(
+                    task_id=task_id,
+                    message="Task submitted successfully."
+                )
+            pipeline = redis_client.pipeline()
+        task_queue.enqueue(
+            QueuedTask(
+                task_id=task_id,
+                qc=request.qc,
+                shots=request.shots,
+                seed=request.seed,
+                use_cache=request.use_cache,
+                memory=request.memory,
+                flight_key=key,
+                priority=request.priority,
+                cost=cost
+            ),
+            pipeline=pipeline
+        )
+        await pipeline.execute()
 
-        background_tasks.add_task(process_quantum_circuit, task_id, request.qc)
         return TaskResponse(
             task_id=task_id,
             message="Task submitted successfully."
@@ -163,93 +236,477 @@ async def create_task(request: QuantumCircuitRequest, background_tasks: Backgrou
         raise HTTPException(status_code=500, detail=f"Error creating task: {str(e)}")
 
 
-@app.get("/api/tasks/{task_id}", response_model=None)
-async def get_task(task_id: str):
+@app.post("/api/tasks/batch", response_model=BatchTaskResponse, status_code=202)
+async def create_batch(request: BatchCircuitRequest):
     """
-    Retrieve the status and results of a previously submitted task.
+    Submit many quantum circuits as one batch.
+
+    - **circuits**: List of serialized quantum circuits in QASM3 format
+    - **shots**: Optional number of shots per circuit
+    - **seed**: Optional simulator seed
+    - **priority**: Priority class of the whole batch
+
+    Every circuit gets its own task ID that can be polled with
+    GET /api/tasks/{task_id}; the batch is executed by one worker as
+    grouped simulator runs.
+    """
+    if len(request.circuits) > BATCH_MAX_CIRCUITS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {BATCH_MAX_CIRCUITS} circuits"
+        )
+
+    batch_id = str(uuid.uuid4())
+    task_ids = [str(uuid.uuid4()) for _ in request.circuits]
+    cost = await asyncio.to_thread(
+        lambda: sum(estimate_cost(circuit, request.shots).seconds for circuit in request.circuits)
+    )
+
+    try:
+        pipeline = redis_client.pipeline()
+        created_at = time.time()
+        for task_id in task_ids:
+            pipeline.hset(
+                f"task:{task_id}",
+                mapping={
+                    "status": "pending",
+                    "message": "Task submitted successfully.",
+                    "batch_id": batch_id,
+                    "created_at": created_at
+                }
+            )
+        await task_index.add(task_ids, pipeline)
+        pipeline.hset(
+            f"batch:{batch_id}",
+            mapping={
+                "status": "pending",
+                "task_ids": json.dumps(task_ids)
+            }
+        )
+        task_queue.enqueue(
+            QueuedBatch(
+                batch_id=batch_id,
+                task_ids=task_ids,
+                circuits=request.circuits,
+                shots=request.shots,
+                seed=request.seed,
+                priority=request.priority,
+                cost=cost
+            ),
+            pipeline=pipeline
+        )
+        await pipeline.execute()
+
+        return BatchTaskResponse(
+            batch_id=batch_id,
+            task_ids=task_ids,
+            message="Batch submitted successfully."
+        )
+    except Exception as e:
+        logger.error(f"Error creating batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating batch: {str(e)}")
+
+
+@app.post("/api/sweeps", response_model=TaskResponse, status_code=202)
+async def create_sweep(request: SweepRequest):
+    """
+    Submit a circuit template to run at many parameter values.
+
+    - **qc**: QASM program whose gate arguments refer to the parameters,
+      optionally declared with "input float[64] theta;"
+    - **parameters**: Values of every parameter, e.g. {"theta": [0, 0.1, 0.2]}
+    - **mode**: grid (every combination, default) or zip (values paired by position)
+    - **shots**: Optional number of shots per point
+    - **seed**: Optional simulator seed
+    - **priority**: Priority class of the whole sweep
+
+    The template is parsed once and all points run as batched simulator
+    experiments with the parameters bound in bulk. Poll the status with
+    GET /api/tasks/{sweep_id} and page through the results with
+    GET /api/sweeps/{sweep_id}.
+    """
+    try:
+        points = sweep_size(request.parameters, request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if points > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"A sweep may have at most {SWEEP_MAX_POINTS} points, got {points}")
+
+    sweep_id = str(uuid.uuid4())
+    cost = points * (await asyncio.to_thread(estimate_cost, request.qc, request.shots)).seconds
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.hset(
+            f"task:{sweep_id}",
+            mapping={
+                "status": "pending",
+                "message": "Sweep submitted successfully.",
+                "created_at": time.time()
+            }
+        )
+        await task_index.add([sweep_id], pipeline)
+        task_queue.enqueue(
+            QueuedSweep(
+                sweep_id=sweep_id,
+                qc=request.qc,
+                parameters=request.parameters,
+                mode=request.mode,
+                shots=request.shots,
+                seed=request.seed,
+                priority=request.priority,
+                cost=cost
+            ),
+            pipeline=pipeline
+        )
+        await pipeline.execute()
+
+        return TaskResponse(
+            task_id=sweep_id,
+            message="Sweep submitted successfully."
+        )
+    except Exception as e:
+        logger.error(f"Error creating sweep: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating sweep: {str(e)}")
+
+
+@app.get("/api/sweeps/{sweep_id}", response_model=None)
+async def get_sweep(sweep_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1)):
+    """
+    Page through the results of a completed sweep, in point order.
 
     Args:
-        task_id: Unique task identifier
+        sweep_id: Identifier returned by POST /api/sweeps
+        offset: Index of the first point
+        limit: Maximum number of points, capped at SWEEP_PAGE_MAX_LIMIT
 
     Returns:
-        Current status and results (if completed) of the task
+        SweepResultPage, or the task status while the sweep is not completed
     """
     try:
-        task_data = redis_client.hgetall(f"task:{task_id}")
+        task_data = await redis_client.hgetall(f"task:{sweep_id}")
+        if task_data.get("status") != "completed" or "sweep_points" not in task_data:
+            return _task_response(task_data)
+
+        limit = min(limit, SWEEP_PAGE_MAX_LIMIT)
+        names = json.loads(task_data["sweep_parameters"])
+        page = await sweep_results.page(sweep_id, task_data, offset=offset, limit=limit)
+        num_points = int(task_data["sweep_points"])
+        return SweepResultPage(
+            sweep_id=sweep_id,
+            points=num_points,
+            parameters=names,
+            results=[
+                SweepPoint(index=index, parameters=dict(zip(names, values.tolist())), counts=counts.to_dict())
+                for index, values, counts in page
+            ],
+            next_offset=offset + limit if offset + limit < num_points else None
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving sweep {sweep_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving sweep: {str(e)}")
 
-        if not task_data:
+
+@app.get("/api/tasks/batch/{batch_id}", response_model=None)
+async def get_batch(batch_id: str):
+    """
+    Retrieve the status and results of every task in a batch.
+
+    Args:
+        batch_id: Batch identifier returned by POST /api/tasks/batch
+    """
+    try:
+        batch_data = await redis_client.hgetall(f"batch:{batch_id}")
+        if not batch_data:
             return ErrorTaskResponse(
                 status="error",
-                message="Task not found."
+                message="Batch not found."
             )
 
-        task_data = {k.decode() if isinstance(k, bytes) else k:
-                         v.decode() if isinstance(v, bytes) else v
-                     for k, v in task_data.items()}
+        task_ids = json.loads(batch_data["task_ids"])
+        pipeline = redis_client.pipeline()
+        for task_id in task_ids:
+            pipeline.hgetall(f"task:{task_id}")
 
-        status = task_data.get("status")
+        return {
+            "batch_id": batch_id,
+            "status": batch_data.get("status", "pending"),
+            "tasks": [
+                {"task_id": task_id, **_task_response(task_data).model_dump()}
+                for task_id, task_data in zip(task_ids, await pipeline.execute())
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error retrieving batch {batch_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving batch: {str(e)}")
 
-        if status == "completed":
-            result_data = json.loads(task_data.get("result", "{}"))
-            return CompletedTaskResponse(
-                status="completed",
-                result=result_data
-            )
-        elif status == "error":
-            return ErrorTaskResponse(
-                status="error",
-                message=task_data.get("message", "Unknown error")
-            )
-        else:
-            return PendingTaskResponse(
-                status="pending",
-                message=task_data.get("message", "Task is still in progress.")
-            )
 
+@app.get("/api/tasks/{task_id}", response_model=None)
+async def get_task(task_id: str, format: str = Query("json", pattern="^(json|binary)$")):
+    """
+    Retrieve the status and results of a previously submitted task.
+
+    Args:
+        task_id: Unique task identifier
+        format: "binary" returns the counts of a completed task as
+            application/octet-stream in the packed layout described in
+            counts_encoding.py; tasks that are not completed are answered in JSON
+
+    Returns:
+        Current status and results (if completed) of the task
+    """
+    try:
+        task_data = await redis_client.hgetall(f"task:{task_id}")
+        if format == "binary" and task_data.get("status") == "completed":
+            content = counts_to_bytes(task_data.get("result", "{}"))
+            if content is None:
+                raise HTTPException(status_code=406, detail="The counts of this task have no binary form")
+            return Response(content=content, media_type="application/octet-stream")
+        return _task_response(task_data)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving task {task_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving task: {str(e)}")
 
 
+@app.get("/api/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """
+    Stream the status of a task as Server-Sent Events until it completes or fails.
 
+    The current status is sent right away and every change is pushed as soon
+    as the worker writes it, so clients do not need to poll.
 
-@app.get("/api/tasks")
-async def get_all_tasks():
+    Args:
+        task_id: Unique task identifier
+
+    Returns:
+        text/event-stream of "status" events shaped like GET /api/tasks/{task_id}
     """
-    Retrieve all tasks in the system.
+    async def event_stream():
+        async for task_data in task_events(redis_client, task_id, pubsub_client=pubsub_client):
+            if task_data is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {_task_response(task_data).model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _parse_byte_range(range_header, size):
+    """
+    Parse a single-range "bytes=first-last" header into a (start, stop) slice, None if unsatisfiable.
     """
+    unit, _, byte_range = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in byte_range:
+        return None
+    first, _, last = byte_range.strip().partition("-")
     try:
-        task_keys = redis_client.keys("task:*")
+        if not first:
+            start, stop = max(size - int(last), 0), size
+        else:
+            start, stop = int(first), min(int(last) + 1, size) if last else size
+    except ValueError:
+        return None
+    if start >= stop:
+        return None
+    return start, stop
+
+
+@app.get("/api/tasks/{task_id}/memory")
+async def get_task_memory(request: Request, task_id: str,
+                          format: str = Query("ndjson", pattern="^(ndjson|binary)$"),
+                          start: int = Query(0, ge=0), stop: Optional[int] = Query(None, ge=0)):
+    """
+    Stream the per-shot outcomes of a task submitted with memory enabled.
 
-        tasks = []
-        for key in task_keys:
-            task_id = key.replace("task:", "")
-            task_data = redis_client.hgetall(key)
+    The outcomes are read and unpacked one stored chunk at a time, so the
+    size of the response does not bound the memory it takes to serve it.
 
-            task_info = {
-                "task_id": task_id,
-                "status": task_data.get("status", "unknown")
-            }
+    Args:
+        task_id: Unique task identifier
+        format: "ndjson" sends one {"offset": ..., "outcomes": [...]} object
+            per chunk with the outcomes as integers of the classical bits;
+            "binary" sends every outcome as a little-endian unsigned integer of
+            the X-Shot-Item-Size header's size and honours byte Range headers
+        start: First shot to send
+        stop: Shot after the last one to send, the end of the memory if omitted
+    """
+    task_data = await redis_client.hgetall(f"task:{task_id}")
+    if not task_data:
+        raise HTTPException(status_code=404, detail="Task not found.")
+    if task_data.get("status") != "completed":
+        raise HTTPException(status_code=409, detail="Task is not completed.")
+    if "memory_shots" not in task_data:
+        raise HTTPException(status_code=404, detail="Task was not submitted with memory enabled.")
+
+    shots = int(task_data["memory_shots"])
+    stop = shots if stop is None else min(stop, shots)
+
+    if format == "ndjson":
+        async def lines():
+            async for offset, outcomes in shot_memory.read(task_id, task_data, start, stop):
+                yield json.dumps({"offset": offset, "outcomes": outcomes.tolist()}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    item_size = memory_item_size(int(task_data["memory_width"]))
+    size = shots * item_size
+    byte_start, byte_stop = min(start, stop) * item_size, stop * item_size
+    status_code = 200
+    headers = {
+        "Accept-Ranges": "bytes",
+        "X-Shots": str(shots),
+        "X-Shot-Width": task_data["memory_width"],
+        "X-Shot-Item-Size": str(item_size)
+    }
+
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = _parse_byte_range(range_header, size)
+        if byte_range is None:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                headers={"Content-Range": f"bytes */{size}"})
+        byte_start, byte_stop = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {byte_start}-{byte_stop - 1}/{size}"
+    headers["Content-Length"] = str(byte_stop - byte_start)
+
+    async def body():
+        # Ranges need not start or end on a shot boundary
+        first_shot = byte_start // item_size
+        position = first_shot * item_size
+        async for _, outcomes in shot_memory.read(task_id, task_data, first_shot, -(-byte_stop // item_size)):
+            data = outcomes.astype(f"<u{item_size}").tobytes()
+            yield data[max(byte_start - position, 0):byte_stop - position]
+            position += len(data)
+
+    return StreamingResponse(body(), status_code=status_code, media_type="application/octet-stream",
+                             headers=headers)
+
+
+@app.websocket("/api/tasks/{task_id}/ws")
+async def task_events_websocket(websocket: WebSocket, task_id: str):
+    """
+    WebSocket equivalent of GET /api/tasks/{task_id}/events.
+
+    Sends the task status as JSON now and on every change, then closes once
+    the task has completed or failed.
+    """
+    await websocket.accept()
+    try:
+        async for task_data in task_events(redis_client, task_id, pubsub_client=pubsub_client):
+            if task_data is not None:
+                await websocket.send_text(_task_response(task_data).model_dump_json())
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Client stopped listening to events of task {task_id}")
+
+
+@app.get("/api/tasks", response_model=TaskListResponse)
+async def get_all_tasks(
+        status: Optional[str] = Query(None, description="Only list tasks with this status"),
+        cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+        limit: int = Query(50, ge=1, description="Maximum number of tasks per page")
+):
+    """
+    List tasks page by page, newest first.
 
-            if "message" in task_data:
-                task_info["message"] = task_data["message"]
+    Tasks are read from the creation-order index maintained on submit, so the
+    cost of a page depends on its size rather than on the number of tasks.
+    """
+    if status is not None and status not in TASK_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status '{status}', expected one of {', '.join(TASK_STATUSES)}")
 
-            tasks.append(task_info)
+    try:
+        page, next_cursor = await task_index.page(status=status, cursor=cursor, limit=min(limit, TASK_LIST_MAX_LIMIT))
 
-        return tasks
+        tasks = []
+        for task_id, task_data in page:
+            if not task_data:
+                continue
+            tasks.append(TaskSummary(
+                task_id=task_id,
+                status=task_data.get("status", "unknown"),
+                message=task_data.get("message"),
+                created_at=task_data.get("created_at")
+            ))
+
+        return TaskListResponse(tasks=tasks, next_cursor=next_cursor)
     except Exception as e:
         logger.error(f"Error retrieving all tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving tasks: {str(e)}")
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters and size of the simulation result cache.
+    """
+    try:
+        return await result_cache.stats()
+    except redis.RedisError as e:
+        logger.error(f"Error retrieving cache stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving cache stats: {str(e)}")
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Per-stage latency histograms, task outcomes and queue gauges in the Prometheus text format.
+    """
+    try:
+        content = await render_metrics(redis_client)
+    except redis.RedisError as e:
+        logger.error(f"Error retrieving metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving metrics: {str(e)}")
+    return Response(content=content, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/redis/pool")
+async def get_redis_pool_stats():
+    """
+    Saturation metrics of the Redis connection pools used by the API.
+    """
+    return {
+        "requests": redis_client.connection_pool.stats(),
+        "event_streams": pubsub_client.connection_pool.stats()
+    }
+
+
+@app.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the process serves requests. Does not depend on Redis.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: Redis answers, so the API can accept and report tasks.
+    """
+    try:
+        await redis_client.ping()
+    except redis.RedisError as e:
+        logger.warning(f"Not ready, Redis at {REDIS_HOST}:{REDIS_PORT} is not reachable: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Redis at {REDIS_HOST}:{REDIS_PORT} is not reachable")
+    return {"status": "ready"}
+
+
 @app.get("/api/test-redis")
 async def check_redis_connection():
     """
     Test the connection to the Redis server.
     """
     try:
-        redis_client.ping()
-        info = redis_client.info()
+        await redis_client.ping()
+        info = await redis_client.info()
         return {
             "status": "success",
             "message": "Connected to Redis",
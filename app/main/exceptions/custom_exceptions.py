@@ -29,6 +29,12 @@ class CircuitExecutionError(QuantumCircuitError):
         self.message = message
         super().__init__(self.message)
 
+class ResourceLimitError(QuantumCircuitError):
+    """Exception raised when a circuit needs more memory or time than a worker allows."""
+    def __init__(self, message="Circuit exceeds the resource limits of a worker"):
+        self.message = message
+        super().__init__(self.message)
+
 
 class QuantumTaskError(Exception):
     """Base exception for quantum task processing errors."""
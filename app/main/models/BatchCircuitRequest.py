@@ -0,0 +1,10 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchCircuitRequest(BaseModel):
+    circuits: List[str] = Field(min_length=1, description="QASM strings executed together in grouped simulator runs")
+    shots: Optional[int] = Field(default=None, gt=0, description="Number of shots per circuit, defaults to the worker setting")
+    seed: Optional[int] = Field(default=None, description="Simulator seed")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Priority class of the batch")
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class BatchTaskResponse(BaseModel):
+    batch_id: str
+    task_ids: List[str]
+    message: str
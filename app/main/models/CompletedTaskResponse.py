@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 from pydantic import Field, BaseModel
 
 
@@ -6,3 +6,11 @@ class CompletedTaskResponse(BaseModel):
     """Response when task is completed"""
     status: str = "completed"
     result: Dict[str, int]
+    method: Optional[str] = Field(None, description="Simulation method the circuit ran with")
+    optimization: Optional[Dict[str, int]] = Field(
+        None, description="Gate and qubit counts before and after the optimization passes"
+    )
+    queue_wait_seconds: Optional[float] = Field(None, description="Time the task waited in the queue")
+    memory_shots: Optional[int] = Field(None, description="Number of shots available from /api/tasks/{task_id}/memory")
+    coalesced_with: Optional[str] = Field(None, description="Identical task whose execution this task shared")
+    sweep_points: Optional[int] = Field(None, description="Number of sweep points available from /api/sweeps/{sweep_id}")
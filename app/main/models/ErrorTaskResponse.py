@@ -1,7 +1,10 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
 class ErrorTaskResponse(BaseModel):
     """Response when task had an error"""
     status: str = "error"
-    message: str
\ No newline at end of file
+    message: str
+    queue_wait_seconds: Optional[float] = Field(None, description="Time the task waited in the queue")
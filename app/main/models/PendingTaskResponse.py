@@ -1,4 +1,5 @@
 from dataclasses import Field
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -6,4 +7,5 @@ from pydantic import BaseModel
 class PendingTaskResponse(BaseModel):
     """Response when task is still processing"""
     status: str = "pending"
-    message: str = "Task is still in progress."
\ No newline at end of file
+    message: str = "Task is still in progress."
+    queue_wait_seconds: Optional[float] = None
@@ -1,5 +1,12 @@
-from pydantic import BaseModel
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
 
 
 class QuantumCircuitRequest(BaseModel):
-    qc: str
\ No newline at end of file
+    qc: str
+    shots: Optional[int] = Field(default=None, gt=0, description="Number of shots, defaults to the worker setting")
+    seed: Optional[int] = Field(default=None, description="Simulator seed, seeded submissions may be served from cache")
+    use_cache: bool = Field(default=True, description="Set to false to bypass the result cache and always run a fresh simulation")
+    memory: bool = Field(default=False, description="Also keep the outcome of every shot, served by /api/tasks/{task_id}/memory")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Priority class of the task")
@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class QueuedBatch(BaseModel):
+    """Batch payload stored on the Redis work queue, executed as grouped simulator runs"""
+    batch_id: str
+    task_ids: List[str]
+    circuits: List[str]
+    shots: Optional[int] = None
+    seed: Optional[int] = None
+    priority: str = "normal"
+    cost: float = 0.0
+    enqueued_at: float = 0.0
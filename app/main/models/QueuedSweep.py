@@ -0,0 +1,16 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class QueuedSweep(BaseModel):
+    """Parameter sweep payload stored on the Redis work queue, executed as one parameterized simulator run"""
+    sweep_id: str
+    qc: str
+    parameters: Dict[str, List[float]]
+    mode: str = "grid"
+    shots: Optional[int] = None
+    seed: Optional[int] = None
+    priority: str = "normal"
+    cost: float = 0.0
+    enqueued_at: float = 0.0
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class QueuedTask(BaseModel):
+    """Task payload stored on the Redis work queue"""
+    task_id: str
+    qc: str
+    shots: Optional[int] = None
+    seed: Optional[int] = None
+    use_cache: bool = True
+    memory: bool = False
+    # Set when identical submissions may attach to this task (see single_flight.py)
+    flight_key: Optional[str] = None
+    priority: str = "normal"
+    cost: float = 0.0
+    enqueued_at: float = 0.0
@@ -0,0 +1,9 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class SweepPoint(BaseModel):
+    index: int
+    parameters: Dict[str, float]
+    counts: Dict[str, int]
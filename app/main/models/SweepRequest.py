@@ -0,0 +1,13 @@
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SweepRequest(BaseModel):
+    qc: str = Field(description="QASM program whose gate arguments refer to the parameters, e.g. rx(theta) q[0];")
+    parameters: Dict[str, List[float]] = Field(min_length=1, description="Values of every parameter")
+    mode: Literal["grid", "zip"] = Field(default="grid", description="grid runs every combination of the values, "
+                                                                     "zip the i-th values of all parameters together")
+    shots: Optional[int] = Field(default=None, gt=0, description="Number of shots per point, defaults to the worker setting")
+    seed: Optional[int] = Field(default=None, description="Simulator seed")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Priority class of the sweep")
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.main.models.SweepPoint import SweepPoint
+
+
+class SweepResultPage(BaseModel):
+    sweep_id: str
+    points: int = Field(description="Total number of points of the sweep")
+    parameters: List[str]
+    results: List[SweepPoint]
+    next_offset: Optional[int] = Field(default=None, description="Pass as offset to fetch the next page, null on the last page")
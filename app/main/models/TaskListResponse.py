@@ -0,0 +1,10 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.main.models.TaskSummary import TaskSummary
+
+
+class TaskListResponse(BaseModel):
+    tasks: List[TaskSummary]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as cursor to fetch the next page, null on the last page")
@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TaskSummary(BaseModel):
+    task_id: str
+    status: str
+    message: Optional[str] = None
+    created_at: Optional[float] = None
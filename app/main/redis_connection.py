@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+import redis
+import redis.asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6378))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 5))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+# Seconds between the first two connection attempts at startup, doubled after every failure up to the maximum
+REDIS_CONNECT_BACKOFF_INITIAL = float(os.getenv("REDIS_CONNECT_BACKOFF_INITIAL", 0.1))
+REDIS_CONNECT_BACKOFF_MAX = float(os.getenv("REDIS_CONNECT_BACKOFF_MAX", 5))
+
+
+def create_redis_client():
+    """
+    Create a Redis client for the configured host and port.
+
+    Shared by the API and the worker processes so both tiers talk to the same
+    task store and queue.
+    """
+    return redis.Redis(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=0,
+        decode_responses=True
+    )
+
+
+class InstrumentedConnectionPool(redis.asyncio.BlockingConnectionPool):
+    """
+    Bounded asyncio connection pool that records how saturated it is.
+
+    Callers wait up to timeout seconds for a free connection instead of
+    opening an unbounded number of them. The pool counts connections in use,
+    their peak, how often a caller found every connection taken, and the total
+    and longest time spent waiting.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_use = 0
+        # Connections held plus callers still acquiring one
+        self.demand = 0
+        self.peak_in_use = 0
+        self.acquisitions = 0
+        self.saturated = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def get_connection(self, *args, **kwargs):
+        if self.demand >= self.max_connections:
+            self.saturated += 1
+        self.demand += 1
+
+        start_time = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except BaseException as e:
+            self.demand -= 1
+            if isinstance(e, redis.ConnectionError):
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start_time
+
+        self.acquisitions += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return connection
+
+    async def release(self, connection):
+        self.in_use -= 1
+        self.demand -= 1
+        await super().release(connection)
+
+    def stats(self):
+        return {
+            "max_connections": self.max_connections,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "acquisitions": self.acquisitions,
+            "saturated": self.saturated,
+            "timeouts": self.timeouts,
+            "mean_wait_seconds": self.wait_seconds / self.acquisitions if self.acquisitions else 0.0,
+            "max_wait_seconds": self.max_wait_seconds
+        }
+
+
+def create_async_redis_client(max_connections=REDIS_MAX_CONNECTIONS):
+    """
+    Create an asyncio Redis client backed by a shared, bounded connection pool.
+
+    Used on the request and result paths, where a blocking client would stall
+    the event loop for every round-trip.
+    """
+    pool = InstrumentedConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=0,
+        decode_responses=True,
+        max_connections=max_connections,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL
+    )
+    return redis.asyncio.Redis(connection_pool=pool)
+
+
+async def wait_for_redis(client, initial_delay=REDIS_CONNECT_BACKOFF_INITIAL, max_delay=REDIS_CONNECT_BACKOFF_MAX):
+    """
+    Ping Redis until it answers, backing off exponentially between attempts.
+
+    Every delay is randomized between half and all of its nominal value, so
+    replicas started together do not retry in lockstep.
+
+    Args:
+        client: An asyncio Redis client
+        initial_delay: Seconds to wait after the first failed attempt
+        max_delay: Upper bound on the seconds between two attempts
+
+    Returns:
+        Number of attempts it took
+    """
+    delay = initial_delay
+    attempt = 1
+    while True:
+        try:
+            await client.ping()
+            return attempt
+        except redis.RedisError as e:
+            logger.warning(f"Redis at {REDIS_HOST}:{REDIS_PORT} is not reachable (attempt {attempt}): {str(e)}, "
+                           f"retrying in {delay:.1f} seconds")
+        await asyncio.sleep(delay * random.uniform(0.5, 1))
+        delay = min(delay * 2, max_delay)
+        attempt += 1
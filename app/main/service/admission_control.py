@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from contextlib import asynccontextmanager
+
+from app.main.service.resource_estimator import format_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def _physical_memory():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 8 * 1024 ** 3
+
+
+# Memory all simulations running on a worker host may commit together
+SIMULATION_MEMORY_BUDGET = int(os.getenv("SIMULATION_MEMORY_BUDGET", _physical_memory() // 2))
+# Largest single simulation accepted, in bytes and predicted seconds
+SIMULATION_MAX_JOB_MEMORY = int(os.getenv("SIMULATION_MAX_JOB_MEMORY", SIMULATION_MEMORY_BUDGET))
+SIMULATION_MAX_JOB_SECONDS = float(os.getenv("SIMULATION_MAX_JOB_SECONDS", 3600))
+ADMISSION_POLL_INTERVAL = float(os.getenv("ADMISSION_POLL_INTERVAL", 0.05))
+
+_default_controller = None
+_default_controller_lock = threading.Lock()
+
+
+class AdmissionController:
+    """
+    Accounts for the memory committed by running simulations against a budget.
+
+    The commitments live in a shared-memory array with one slot per worker
+    process, so every worker process of a host sees the same total. A
+    simulation only starts once its predicted memory fits next to what is
+    already committed; until then the caller waits without occupying the
+    simulation executor. A worker process that dies has its slot reset when
+    it is restarted, so its commitments are not leaked.
+    """
+
+    def __init__(self, budget=SIMULATION_MEMORY_BUDGET, commitments=None, slot=0):
+        self.budget = budget
+        self.commitments = commitments if commitments is not None else multiprocessing.Array("q", 1)
+        self.slot = slot
+        self.waits = 0
+        with self.commitments.get_lock():
+            self.commitments[self.slot] = 0
+
+    def committed(self):
+        with self.commitments.get_lock():
+            return sum(self.commitments)
+
+    def _try_commit(self, num_bytes):
+        with self.commitments.get_lock():
+            if sum(self.commitments) + num_bytes > self.budget:
+                return False
+            self.commitments[self.slot] += num_bytes
+            return True
+
+    def _release(self, num_bytes):
+        with self.commitments.get_lock():
+            self.commitments[self.slot] -= num_bytes
+
+    @asynccontextmanager
+    async def reserve(self, num_bytes):
+        """
+        Commit num_bytes for the duration of the block, waiting until they fit in the budget.
+        """
+        if not self._try_commit(num_bytes):
+            self.waits += 1
+            logger.info(f"Waiting for {format_bytes(num_bytes)} of the simulation memory budget, "
+                        f"{format_bytes(self.committed())} of {format_bytes(self.budget)} committed")
+            while not self._try_commit(num_bytes):
+                await asyncio.sleep(ADMISSION_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            self._release(num_bytes)
+
+    def stats(self):
+        return {
+            "budget": self.budget,
+            "committed": self.committed(),
+            "waits": self.waits
+        }
+
+
+def configure_admission_controller(commitments, slot):
+    """
+    Make this process account its simulations in the given slot of a host-wide commitments array.
+    """
+    global _default_controller
+    with _default_controller_lock:
+        _default_controller = AdmissionController(commitments=commitments, slot=slot)
+        return _default_controller
+
+
+def get_default_admission_controller():
+    """
+    Return the admission controller of this process, creating a process-local one on first use.
+    """
+    global _default_controller
+    with _default_controller_lock:
+        if _default_controller is None:
+            _default_controller = AdmissionController()
+        return _default_controller
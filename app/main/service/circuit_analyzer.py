@@ -0,0 +1,77 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_ANALYZER_STATEVECTOR_MAX_QUBITS = int(os.getenv("CIRCUIT_ANALYZER_STATEVECTOR_MAX_QUBITS", 24))
+CIRCUIT_ANALYZER_DENSITY_MATRIX_MAX_QUBITS = int(os.getenv("CIRCUIT_ANALYZER_DENSITY_MATRIX_MAX_QUBITS", 12))
+CIRCUIT_ANALYZER_MPS_MIN_QUBITS = int(os.getenv("CIRCUIT_ANALYZER_MPS_MIN_QUBITS", 16))
+CIRCUIT_ANALYZER_MPS_MAX_DEPTH = int(os.getenv("CIRCUIT_ANALYZER_MPS_MAX_DEPTH", 20))
+
+# Gates that map stabilizer states to stabilizer states
+CLIFFORD_GATES = {
+    "id", "x", "y", "z", "h", "s", "sdg", "sx", "sxdg",
+    "cx", "cy", "cz", "swap", "iswap", "ecr", "dcx"
+}
+# Instructions that are not gates but do not prevent any simulation method
+NON_GATE_INSTRUCTIONS = {"measure", "barrier", "reset", "delay"}
+# Instructions that describe noise and need a mixed-state simulation
+NOISE_INSTRUCTIONS = {"kraus", "superop", "quantum_channel"}
+
+
+class CircuitAnalysis:
+    """
+    Structural properties of a circuit and the simulation method chosen for it.
+    """
+
+    def __init__(self, num_qubits, depth, gate_counts, clifford, noisy, max_gate_qubits, method):
+        self.num_qubits = num_qubits
+        self.depth = depth
+        self.gate_counts = gate_counts
+        self.clifford = clifford
+        self.noisy = noisy
+        self.max_gate_qubits = max_gate_qubits
+        self.method = method
+
+
+def analyze_circuit(circuit):
+    """
+    Inspect the gate set, width and depth of a circuit and pick an Aer simulation method.
+
+    The rules, in order:
+        Clifford gates only                      -> stabilizer, at any width
+        noise instructions, small enough         -> density_matrix
+        at most STATEVECTOR_MAX_QUBITS qubits,
+        unless wide, shallow and 2-qubit gates   -> statevector
+        everything else                          -> matrix_product_state
+
+    Args:
+        circuit: QuantumCircuit to analyze
+
+    Returns:
+        CircuitAnalysis with the chosen method
+    """
+    gate_counts = dict(circuit.count_ops())
+    names = set(gate_counts)
+    gate_names = names - NON_GATE_INSTRUCTIONS
+    num_qubits = circuit.num_qubits
+    depth = circuit.depth()
+    max_gate_qubits = max((len(instruction.qubits) for instruction in circuit.data
+                           if instruction.operation.name not in NON_GATE_INSTRUCTIONS), default=0)
+
+    clifford = gate_names <= CLIFFORD_GATES
+    noisy = bool(names & NOISE_INSTRUCTIONS)
+    shallow = depth <= CIRCUIT_ANALYZER_MPS_MAX_DEPTH and max_gate_qubits <= 2
+
+    if clifford:
+        method = "stabilizer"
+    elif noisy and num_qubits <= CIRCUIT_ANALYZER_DENSITY_MATRIX_MAX_QUBITS:
+        method = "density_matrix"
+    elif num_qubits <= CIRCUIT_ANALYZER_STATEVECTOR_MAX_QUBITS and not (
+            shallow and num_qubits >= CIRCUIT_ANALYZER_MPS_MIN_QUBITS):
+        method = "statevector"
+    else:
+        method = "matrix_product_state"
+
+    logger.debug(f"Circuit with {num_qubits} qubits and depth {depth} will run with the {method} method")
+    return CircuitAnalysis(num_qubits, depth, gate_counts, clifford, noisy, max_gate_qubits, method)
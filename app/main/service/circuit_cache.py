@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CACHE_MAX_BYTES = int(os.getenv("CIRCUIT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Rough in-memory footprint of one parsed instruction (operation, qubit and clbit tuples)
+INSTRUCTION_SIZE_ESTIMATE = 400
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def estimate_circuit_size(circuit):
+    """
+    Approximate number of bytes a parsed circuit occupies.
+    """
+    return 1024 + INSTRUCTION_SIZE_ESTIMATE * len(circuit.data)
+
+
+class CircuitCache:
+    """
+    In-process LRU cache of parsed QuantumCircuit objects.
+
+    Entries are keyed by the SHA-256 of the preprocessed QASM plus a variant
+    label (e.g. whether the circuit was transpiled for the simulator), and
+    the total estimated size of the cached circuits stays below max_bytes.
+    Cached circuits are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes=CIRCUIT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(processed_qasm, variant="parsed"):
+        return f"{variant}:{hashlib.sha256(processed_qasm.encode()).hexdigest()}"
+
+    def get_or_create(self, key, factory):
+        """
+        Return the circuit cached under key, building it with factory() on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        circuit = factory()
+        self._put(key, circuit)
+        return circuit
+
+    def _put(self, key, circuit):
+        size = estimate_circuit_size(circuit)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (circuit, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+def get_default_circuit_cache():
+    """
+    Return the circuit cache of this process, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CircuitCache()
+        return _default_cache
@@ -0,0 +1,147 @@
+import logging
+import os
+from collections import Counter
+
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import CXGate, CYGate, CZGate, HGate, SdgGate, SGate, SwapGate, SXdgGate, SXGate, \
+    TdgGate, TGate, XGate, YGate, ZGate
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import InverseCancellation, Optimize1qGatesDecomposition
+
+from app.main.service.circuit_analyzer import CLIFFORD_GATES, NON_GATE_INSTRUCTIONS
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZATION_PASSES = ("cancel_inverses", "merge_1q", "remove_idle_qubits")
+# Comma-separated passes run on every circuit before simulation, in this order; empty disables them
+CIRCUIT_OPTIMIZATION_PASSES = [
+    name.strip() for name in os.getenv("CIRCUIT_OPTIMIZATION_PASSES", ",".join(OPTIMIZATION_PASSES)).split(",")
+    if name.strip()
+]
+
+# Self-inverse gates and pairs of mutually inverse gates
+INVERSE_GATES = [HGate(), XGate(), YGate(), ZGate(), CXGate(), CYGate(), CZGate(), SwapGate(),
+                 (SGate(), SdgGate()), (TGate(), TdgGate()), (SXGate(), SXdgGate())]
+
+
+def count_gates(circuit):
+    return sum(1 for instruction in circuit.data if instruction.operation.name not in NON_GATE_INSTRUCTIONS)
+
+
+def cancel_inverses(circuit):
+    """
+    Remove adjacent pairs of gates that undo each other, e.g. h h or s sdg on the same qubits.
+
+    Repeated until nothing changes, as removing a pair can make the gates
+    around it adjacent, as in h cx cx h.
+    """
+    pass_manager = PassManager([InverseCancellation(INVERSE_GATES)])
+    while True:
+        size = len(circuit.data)
+        circuit = pass_manager.run(circuit)
+        if len(circuit.data) == size:
+            return circuit
+
+
+def merge_1q(circuit):
+    """
+    Replace every run of consecutive single-qubit gates on a qubit by at most one u gate.
+
+    Circuits of Clifford gates only are left alone: merging turns gates
+    such as h and s into u gates, and the stabilizer method, which
+    simulates Clifford circuits at any width, cannot run those.
+    """
+    names = set(circuit.count_ops()) - NON_GATE_INSTRUCTIONS
+    if names <= CLIFFORD_GATES:
+        return circuit
+    return PassManager([Optimize1qGatesDecomposition(basis=["u"])]).run(circuit)
+
+
+def remove_idle_qubits(circuit):
+    """
+    Drop qubits that no gate acts on.
+
+    Such a qubit stays in |0>, so a measurement of it always writes 0; the
+    measurement is dropped along with the qubit when nothing else writes its
+    classical bit, which then keeps its initial 0. Classical bits are all
+    kept, so counts are unchanged. Every qubit removed halves the memory of
+    a statevector simulation.
+
+    Circuits are left alone when no measurement would remain, e.g. one that
+    only measures qubits in |0>, as a simulation without measurements
+    yields no counts.
+    """
+    touched = set()
+    writes = Counter()
+    for instruction in circuit.data:
+        writes.update(instruction.clbits)
+        if instruction.operation.name not in ("measure", "barrier"):
+            touched.update(instruction.qubits)
+
+    idle = set(circuit.qubits) - touched
+    for instruction in circuit.data:
+        if instruction.operation.name == "measure" and instruction.qubits[0] in idle \
+                and writes[instruction.clbits[0]] > 1:
+            idle.discard(instruction.qubits[0])
+    if not idle:
+        return circuit
+    if not any(instruction.operation.name == "measure" and instruction.qubits[0] not in idle
+               for instruction in circuit.data):
+        return circuit
+
+    optimized = QuantumCircuit([qubit for qubit in circuit.qubits if qubit not in idle], *circuit.cregs,
+                               name=circuit.name, global_phase=circuit.global_phase, metadata=circuit.metadata)
+    if optimized.clbits != circuit.clbits:
+        # Classical bits outside registers would change position in the counts
+        return circuit
+    for instruction in circuit.data:
+        qubits = [qubit for qubit in instruction.qubits if qubit not in idle]
+        if len(qubits) == len(instruction.qubits):
+            optimized.append(instruction.operation, instruction.qubits, instruction.clbits)
+        elif instruction.operation.name == "barrier" and qubits:
+            optimized.barrier(*qubits)
+    return optimized
+
+
+PASSES = {
+    "cancel_inverses": cancel_inverses,
+    "merge_1q": merge_1q,
+    "remove_idle_qubits": remove_idle_qubits,
+}
+
+
+def optimize_circuit(circuit, passes=CIRCUIT_OPTIMIZATION_PASSES):
+    """
+    Run the given passes on a circuit and report how much smaller it became.
+
+    Every pass preserves the measurement distribution. Parameterized
+    circuits and circuits with classically conditioned operations are
+    returned unchanged.
+
+    Args:
+        circuit: Parsed QuantumCircuit
+        passes: Names of passes from OPTIMIZATION_PASSES, run in order
+
+    Returns:
+        (optimized circuit, report) where report maps gates_before,
+        gates_after, qubits_before and qubits_after to their values
+
+    Raises:
+        ValueError: If a pass name is unknown
+    """
+    unknown = [name for name in passes if name not in PASSES]
+    if unknown:
+        raise ValueError(f"Unknown optimization passes: {', '.join(unknown)}")
+
+    report = {"gates_before": count_gates(circuit), "qubits_before": circuit.num_qubits}
+    if passes and not circuit.parameters and not any(
+            getattr(instruction.operation, "condition", None) is not None for instruction in circuit.data):
+        for name in passes:
+            circuit = PASSES[name](circuit)
+    report["gates_after"] = count_gates(circuit)
+    report["qubits_after"] = circuit.num_qubits
+
+    if report["gates_after"] < report["gates_before"] or report["qubits_after"] < report["qubits_before"]:
+        logger.info(f"Optimized circuit from {report['gates_before']} gates on {report['qubits_before']} qubits "
+                    f"to {report['gates_after']} gates on {report['qubits_after']} qubits")
+    return circuit, report
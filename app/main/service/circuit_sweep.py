@@ -0,0 +1,136 @@
+import logging
+import math
+import os
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", 100000))
+
+SWEEP_MODES = ("grid", "zip")
+# Names of the generated gates that carry the sweep parameters through the QASM 2 parser
+WRAPPER_PREFIX = "sweep_parameters_"
+
+_INPUT = re.compile(r'^input\s+(?:float|angle)(?:\s*\[\s*\d+\s*\])?\s+([A-Za-z_]\w*)\s*;$')
+_GATE_CALL = re.compile(r'^([A-Za-z_]\w*)\s*\((.*)\)\s*([^()]+);$')
+_IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+# QASM 2 gate parameters are lowercase identifiers, and must not shadow its functions and constants
+_PARAMETER_NAME = re.compile(r'^[a-z]\w*$')
+_RESERVED_NAMES = {"pi", "sin", "cos", "tan", "exp", "ln", "sqrt"}
+
+
+def sweep_size(parameters, mode):
+    """
+    Number of points of a sweep without expanding it.
+
+    Args:
+        parameters: Mapping of parameter name to its list of values
+        mode: "grid" for every combination of the values, "zip" for the
+            i-th value of every parameter together
+
+    Raises:
+        ValueError: If the values of a zip sweep differ in length
+    """
+    lengths = [len(values) for values in parameters.values()]
+    if mode == "zip":
+        if len(set(lengths)) > 1:
+            raise ValueError("Every parameter of a zip sweep needs the same number of values")
+        return lengths[0] if lengths else 0
+    return math.prod(lengths) if lengths else 0
+
+
+def sweep_points(parameters, mode):
+    """
+    Expand a sweep into a (points, parameters) array, parameters in the order of the mapping.
+
+    Grid sweeps vary the last parameter fastest.
+    """
+    sweep_size(parameters, mode)
+    columns = [np.asarray(values, dtype=np.float64) for values in parameters.values()]
+    if mode == "zip":
+        return np.column_stack(columns)
+    return np.stack(np.meshgrid(*columns, indexing="ij"), axis=-1).reshape(-1, len(columns))
+
+
+def parameterize_qasm(processed_qasm, names):
+    """
+    Rewrite a QASM program with free parameters so the QASM 2 parser accepts it.
+
+    The QASM 2 parser needs numeric gate arguments in the program body but
+    keeps gate definitions symbolic. Every gate call whose arguments refer to
+    a parameter is therefore moved into a generated gate that takes all
+    parameters, and called with zeros; parse_template puts the parameters
+    back. "input float theta;" declarations are dropped.
+
+    Args:
+        processed_qasm: Output of translate_qasm, one statement per line
+        names: Parameter names
+
+    Returns:
+        (QASM 2 program, names of the generated gates)
+    """
+    for name in names:
+        if not _PARAMETER_NAME.match(name) or name in _RESERVED_NAMES:
+            raise ValueError(f"Invalid parameter name '{name}', expected a lowercase identifier")
+
+    parameter_names = set(names)
+    statements = []
+    wrappers = []
+    in_definition = 0
+
+    for statement in processed_qasm.splitlines():
+        if statement.endswith("{"):
+            in_definition += 1
+        elif statement == "}":
+            in_definition -= 1
+
+        declaration = _INPUT.match(statement)
+        if declaration is not None:
+            if declaration.group(1) not in parameter_names:
+                raise ValueError(f"Parameter '{declaration.group(1)}' is declared but has no values")
+            continue
+
+        call = None if in_definition else _GATE_CALL.match(statement)
+        if call is None or not parameter_names & set(_IDENTIFIER.findall(call.group(2))):
+            statements.append(statement)
+            continue
+
+        gate, arguments, operands = call.groups()
+        num_operands = len(operands.split(","))
+        qubits = ", ".join(f"a{index}" for index in range(num_operands))
+        wrapper = f"{WRAPPER_PREFIX}{len(wrappers)}"
+        wrappers.append(wrapper)
+        statements.append(f"gate {wrapper}({', '.join(names)}) {qubits} {{ {gate}({arguments}) {qubits}; }}")
+        statements.append(f"{wrapper}({', '.join('0' for _ in names)}) {operands.strip()};")
+
+    return "\n".join(statements), wrappers
+
+
+def parse_template(processed_qasm, names):
+    """
+    Parse a QASM program with free parameters into a parameterized QuantumCircuit.
+
+    Args:
+        processed_qasm: Output of translate_qasm
+        names: Parameter names
+
+    Returns:
+        QuantumCircuit whose parameters are named after the sweep parameters
+        it uses
+    """
+    # Imported here so the API, which only sizes sweeps, starts without loading qiskit
+    from qiskit import QuantumCircuit
+    from qiskit.circuit import Parameter
+
+    program, wrappers = parameterize_qasm(processed_qasm, names)
+    circuit = QuantumCircuit.from_qasm_str(program)
+    if not wrappers:
+        return circuit
+
+    parameters = [Parameter(name) for name in names]
+    for instruction in circuit.data:
+        if instruction.operation.name in wrappers:
+            instruction.operation.params = list(parameters)
+    return circuit.decompose(gates_to_decompose=wrappers)
@@ -0,0 +1,172 @@
+import base64
+import json
+import logging
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "binary" stores packed counts, "json" the decimal-keyed JSON object
+RESULT_ENCODING = os.getenv("RESULT_ENCODING", "binary")
+# Packed payloads of at least this many bytes are zlib-compressed, -1 disables compression
+RESULT_COMPRESSION_MIN_BYTES = int(os.getenv("RESULT_COMPRESSION_MIN_BYTES", 1024))
+
+MAGIC = b"QCNT"
+VERSION = 1
+FLAG_ZLIB = 1
+# magic, version, flags, outcome item size, count item size, number of outcomes
+HEADER = struct.Struct("<4sBBBBI")
+# Prefix of packed counts stored as text in Redis
+TEXT_PREFIX = "qcnt:"
+MAX_OUTCOME_BITS = 64
+
+
+class PackedCounts(Mapping):
+    """
+    Measurement counts as two parallel NumPy arrays of outcome integers and counts.
+
+    It reads like the decimal-keyed counts dictionary of the API, which is
+    only built (with vectorized conversions) when it is first accessed that
+    way. Outcomes are sorted, which keeps merging and encoding cheap.
+    """
+
+    def __init__(self, outcomes, counts):
+        order = np.argsort(outcomes, kind="stable")
+        self.outcomes = np.asarray(outcomes, dtype=np.uint64)[order]
+        self.counts = np.asarray(counts, dtype=np.int64)[order]
+        self._dict = None
+
+    @classmethod
+    def from_bitstrings(cls, counts):
+        """
+        Pack counts keyed by bitstrings of one register, e.g. {"011": 5}.
+
+        Returns:
+            PackedCounts, or None if the keys are not equal-length bitstrings
+            of at most MAX_OUTCOME_BITS bits (e.g. several registers)
+        """
+        if not counts:
+            return cls(np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64))
+
+        keys = list(counts)
+        width = len(keys[0])
+        if width == 0 or width > MAX_OUTCOME_BITS or any(len(key) != width for key in keys):
+            return None
+        try:
+            characters = np.frombuffer("".join(keys).encode("ascii"), dtype=np.uint8).reshape(len(keys), width)
+        except UnicodeEncodeError:
+            return None
+        bits = characters - ord("0")
+        if np.any(bits > 1):
+            return None
+
+        # Right-align every bitstring in 64 bits and read the rows as big-endian integers
+        padded = np.zeros((len(keys), MAX_OUTCOME_BITS), dtype=np.uint8)
+        padded[:, MAX_OUTCOME_BITS - width:] = bits
+        outcomes = np.packbits(padded, axis=1).view(">u8").ravel().astype(np.uint64)
+        return cls(outcomes, np.fromiter(counts.values(), dtype=np.int64, count=len(keys)))
+
+    @classmethod
+    def merge(cls, packed_counts):
+        """
+        Add up several PackedCounts, e.g. the shards of one run.
+        """
+        outcomes = np.concatenate([packed.outcomes for packed in packed_counts])
+        counts = np.concatenate([packed.counts for packed in packed_counts])
+        unique, inverse = np.unique(outcomes, return_inverse=True)
+        return cls(unique, np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64))
+
+    def to_dict(self):
+        if self._dict is None:
+            self._dict = dict(zip(self.outcomes.astype(str).tolist(), self.counts.tolist()))
+        return self._dict
+
+    def __getitem__(self, key):
+        return self.to_dict()[key]
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def __repr__(self):
+        return f"PackedCounts({len(self)} outcomes, {int(self.counts.sum())} shots)"
+
+    def __getstate__(self):
+        return {"outcomes": self.outcomes, "counts": self.counts, "_dict": None}
+
+    def to_bytes(self, compression_min_bytes=RESULT_COMPRESSION_MIN_BYTES):
+        """
+        Binary form of the counts.
+
+        Layout, little-endian: a 12-byte header of the magic "QCNT", version,
+        flags (bit 0: payload is zlib-compressed), outcome item size in bytes
+        (1, 2, 4 or 8), count item size in bytes (4 or 8) and the number of
+        outcomes as uint32, then the payload: all outcomes as unsigned
+        integers in ascending order followed by their counts.
+        """
+        largest = int(self.outcomes[-1]) if len(self) else 0
+        outcome_size = next(size for size in (1, 2, 4, 8) if largest < 1 << (8 * size))
+        count_size = 4 if not len(self) or int(self.counts.max()) < 1 << 32 else 8
+
+        payload = (self.outcomes.astype(f"<u{outcome_size}").tobytes()
+                   + self.counts.astype(f"<u{count_size}").tobytes())
+        flags = 0
+        if 0 <= compression_min_bytes <= len(payload):
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= FLAG_ZLIB
+        return HEADER.pack(MAGIC, VERSION, flags, outcome_size, count_size, len(self)) + payload
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, flags, outcome_size, count_size, length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a packed counts encoding")
+        payload = data[HEADER.size:]
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        outcomes = np.frombuffer(payload, dtype=f"<u{outcome_size}", count=length)
+        counts = np.frombuffer(payload, dtype=f"<u{count_size}", count=length, offset=length * outcome_size)
+        return cls(outcomes, counts)
+
+
+def encode_counts(counts, encoding=RESULT_ENCODING):
+    """
+    Text form of counts for a Redis hash field or cache entry.
+
+    PackedCounts are stored as base64 of their binary form behind
+    TEXT_PREFIX; other counts, or all counts with the "json" encoding, as
+    JSON.
+    """
+    if isinstance(counts, PackedCounts) and encoding == "binary":
+        return TEXT_PREFIX + base64.b64encode(counts.to_bytes()).decode("ascii")
+    return json.dumps(dict(counts))
+
+
+def decode_counts(text):
+    """
+    Counts from the output of encode_counts, PackedCounts or a dictionary.
+    """
+    if text.startswith(TEXT_PREFIX):
+        return PackedCounts.from_bytes(base64.b64decode(text[len(TEXT_PREFIX):]))
+    return json.loads(text)
+
+
+def counts_to_bytes(text):
+    """
+    Binary form of counts stored by encode_counts, None if they have no binary form.
+    """
+    if text.startswith(TEXT_PREFIX):
+        return base64.b64decode(text[len(TEXT_PREFIX):])
+    counts = json.loads(text)
+    try:
+        return PackedCounts([int(key) for key in counts], list(counts.values())).to_bytes()
+    except (ValueError, OverflowError):
+        return None
@@ -0,0 +1,203 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from app.main.service.task_queue import PROCESSING_KEY_PREFIX, TASK_QUEUE_KEY, WORKERS_KEY
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Seconds between two flushes of a worker's metrics to Redis
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+METRICS_KEY = "metrics:pipeline"
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+# Upper bounds of the qubit ranges simulation times are grouped by
+QUBIT_BUCKETS = (5, 10, 15, 20, 25, 30)
+
+METRICS = {
+    "quantum_stage_seconds": ("histogram", "Time tasks spend in each stage of the pipeline"),
+    "quantum_simulation_seconds": ("histogram", "Simulator run time by circuit width and method"),
+    "quantum_tasks_total": ("counter", "Finished tasks by outcome"),
+    "quantum_queue_depth": ("gauge", "Tasks waiting in the queue"),
+    "quantum_queue_head_age_seconds": ("gauge", "Time the task that runs next has been waiting"),
+    "quantum_tasks_in_progress": ("gauge", "Tasks reserved by workers"),
+}
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def qubit_bucket(num_qubits):
+    """
+    Label of the qubit range a circuit width falls in, e.g. "6-10".
+    """
+    index = bisect.bisect_left(QUBIT_BUCKETS, num_qubits)
+    if index == len(QUBIT_BUCKETS):
+        return f"{QUBIT_BUCKETS[-1] + 1}+"
+    lower = QUBIT_BUCKETS[index - 1] + 1 if index else 1
+    return f"{lower}-{QUBIT_BUCKETS[index]}"
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class PipelineMetrics:
+    """
+    Histograms and counters of the task pipeline, aggregated across processes in Redis.
+
+    Observations only update in-process bucket counts under a lock, so the
+    hot path costs a bisect and a few dictionary updates. Every
+    METRICS_FLUSH_INTERVAL seconds a worker adds what it collected to one
+    Redis hash with a single pipelined HINCRBY/HINCRBYFLOAT round-trip and
+    starts over; the API renders that hash in the Prometheus text format.
+    Histogram fields are stored cumulatively per bucket, so increments from
+    any number of workers add up.
+    """
+
+    def __init__(self, flush_interval=METRICS_FLUSH_INTERVAL, enabled=METRICS_ENABLED):
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._last_flush = time.monotonic()
+
+    def observe(self, name, seconds, **labels):
+        """
+        Record a duration in the histogram name with the given labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(STAGE_BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(STAGE_BUCKETS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def observe_stages(self, timings):
+        """
+        Record a mapping of stage name to seconds, as returned by QuantumCircuitService.
+        """
+        for stage, seconds in timings.items():
+            self.observe("quantum_stage_seconds", seconds, stage=stage)
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Record the duration of the block as a pipeline stage.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("quantum_stage_seconds", time.perf_counter() - started, stage=stage)
+
+    def increment(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    async def flush(self, redis_client, force=False):
+        """
+        Add the collected metrics to the shared Redis hash, at most once per flush_interval.
+
+        Args:
+            redis_client: Asyncio Redis client
+            force: Flush even if the interval has not passed, e.g. on shutdown
+        """
+        if not force and time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            counters, self._counters = self._counters, {}
+            self._last_flush = time.monotonic()
+        if not histograms and not counters:
+            return
+
+        pipeline = redis_client.pipeline(transaction=False)
+        for (name, labels), (buckets, total) in histograms.items():
+            cumulative = 0
+            for bound, count in zip(STAGE_BUCKETS + ("+Inf",), buckets):
+                cumulative += count
+                pipeline.hincrby(METRICS_KEY, _series(f"{name}_bucket", labels + (("le", bound),)), cumulative)
+            pipeline.hincrby(METRICS_KEY, _series(f"{name}_count", labels), cumulative)
+            pipeline.hincrbyfloat(METRICS_KEY, _series(f"{name}_sum", labels), total)
+        for (name, labels), amount in counters.items():
+            pipeline.hincrby(METRICS_KEY, _series(name, labels), amount)
+        await pipeline.execute()
+
+
+async def render_metrics(redis_client):
+    """
+    All pipeline metrics in the Prometheus text exposition format.
+
+    Histograms and counters come from the shared Redis hash; the queue
+    gauges are read from the queue when scraped.
+
+    Args:
+        redis_client: Asyncio Redis client
+    """
+    pipeline = redis_client.pipeline()
+    pipeline.hgetall(METRICS_KEY)
+    pipeline.zcard(TASK_QUEUE_KEY)
+    pipeline.zrange(TASK_QUEUE_KEY, 0, 0)
+    pipeline.smembers(WORKERS_KEY)
+    stored, depth, head, workers = await pipeline.execute()
+
+    pipeline = redis_client.pipeline()
+    for worker_id in workers:
+        pipeline.llen(f"{PROCESSING_KEY_PREFIX}{worker_id}")
+    in_progress = sum(await pipeline.execute()) if workers else 0
+
+    head_age = 0.0
+    if head:
+        enqueued_at = json.loads(head[0]).get("enqueued_at", 0.0)
+        head_age = max(time.time() - enqueued_at, 0.0) if enqueued_at else 0.0
+
+    series = dict(stored)
+    series["quantum_queue_depth"] = depth
+    series["quantum_queue_head_age_seconds"] = head_age
+    series["quantum_tasks_in_progress"] = in_progress
+
+    lines = []
+    for name, (metric_type, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        suffixes = ("_bucket", "_count", "_sum") if metric_type == "histogram" else ("",)
+        for field in sorted(series, key=_bucket_order):
+            base = field.split("{", 1)[0]
+            if any(base == name + suffix for suffix in suffixes):
+                lines.append(f"{field} {series[field]}")
+    return "\n".join(lines) + "\n"
+
+
+def _bucket_order(field):
+    # Keep the buckets of a series in ascending order of their bound
+    base, _, labels = field.partition('le="')
+    bound = labels.split('"', 1)[0]
+    return base, float("inf") if bound == "+Inf" else float(bound) if bound else 0.0
+
+
+def get_default_pipeline_metrics():
+    """
+    Return the pipeline metrics of this process, creating them on first use.
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = PipelineMetrics()
+        return _default_metrics
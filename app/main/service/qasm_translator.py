@@ -0,0 +1,223 @@
+import re
+
+QELIB_INCLUDE = 'include "qelib1.inc";'
+
+# Everything besides ';' that ends a statement or starts a comment
+_SPECIAL = re.compile(r'//|/\*|[{}]')
+_WHITESPACE = re.compile(r'\s+')
+
+_VERSION = re.compile(r'^OPENQASM\s+([0-9.]+)$')
+_INCLUDE = re.compile(r'^include\s*"([^"]*)"$')
+_REGISTER = re.compile(r'^(qubit|bit)\s*(?:\[\s*(\d+)\s*\])?\s*([A-Za-z_]\w*)$')
+_MEASURE_ASSIGN = re.compile(r'^([A-Za-z_]\w*(?:\s*\[\s*\d+\s*\])?)\s*=\s*measure\s+(.+)$')
+
+_REGISTER_KEYWORDS = {"qubit": "qreg", "bit": "creg"}
+# QASM 3 standard library; its gates are provided by qelib1.inc
+_QASM3_STANDARD_INCLUDES = {"stdgates.inc"}
+
+
+class QasmTranslator:
+    """
+    Single-pass, streaming translator from OpenQASM 3 to the OpenQASM 2 dialect understood by Qiskit.
+
+    Input is fed in chunks of any size (a whole program, lines of a file,
+    network reads). Comments are dropped, and every complete statement is
+    translated as soon as its terminating ';', '{' or '}' has been seen, so
+    the translator only ever buffers the statement in progress.
+
+    Translation rules for OPENQASM 3 programs:
+        OPENQASM 3.x;                 -> OPENQASM 2.0; include "qelib1.inc";
+        include "stdgates.inc";       -> dropped, qelib1.inc provides the gates
+        qubit[n] name; / qubit name;  -> qreg name[n]; / qreg name[1];
+        bit[n] name; / bit name;      -> creg name[n]; / creg name[1];
+        c[0] = measure q[0];          -> measure q[0] -> c[0];
+
+    OPENQASM 2.0 programs only get the qelib1.inc include added if it is
+    missing. Programs without a version statement and other versions are
+    passed through statement by statement.
+    """
+
+    def __init__(self):
+        self._statement = []
+        self._pending = ""
+        self._in_line_comment = False
+        self._in_block_comment = False
+        self._seen_statement = False
+        self._qasm3 = False
+        self._qelib_included = False
+
+    def feed(self, text):
+        """
+        Consume the next chunk of the program and return the translated output completed by it.
+        """
+        output = []
+        text = self._pending + text
+        self._pending = ""
+        position = 0
+        length = len(text)
+
+        while position < length:
+            if self._in_block_comment:
+                end = text.find("*/", position)
+                if end < 0:
+                    # A '*' at the end may be the first half of the terminator
+                    self._pending = "*" if text.endswith("*") else ""
+                    return "".join(output)
+                position = end + 2
+                self._in_block_comment = False
+                continue
+
+            if self._in_line_comment:
+                end = text.find("\n", position)
+                if end < 0:
+                    return "".join(output)
+                position = end + 1
+                self._in_line_comment = False
+                continue
+
+            match = _SPECIAL.search(text, position)
+            end = match.start() if match is not None else length
+            segment = text[position:end]
+            if match is None and segment.endswith("/"):
+                # May be the first half of a comment opener
+                self._pending = "/"
+                segment = segment[:-1]
+
+            # Plain statements are split in bulk, only the last one can be incomplete
+            statements = segment.split(";")
+            if len(statements) > 1:
+                self._statement.append(statements[0])
+                self._emit(";", output)
+                for statement in statements[1:-1]:
+                    self._emit_statement(statement, output)
+            self._statement.append(statements[-1])
+
+            if match is None:
+                break
+
+            token = match.group()
+            if token == "//":
+                self._in_line_comment = True
+            elif token == "/*":
+                self._in_block_comment = True
+            else:
+                self._emit(token, output)
+            position = match.end()
+
+        return "".join(output)
+
+    def close(self):
+        """
+        Finish the program and return any remaining output.
+        """
+        output = []
+        if self._pending and not self._in_block_comment:
+            self._statement.append(self._pending)
+        self._pending = ""
+        remainder = _normalize_whitespace("".join(self._statement))
+        self._statement = []
+        if remainder:
+            output.append(remainder)
+            output.append("\n")
+        return "".join(output)
+
+    def _emit(self, terminator, output):
+        statement = "".join(self._statement)
+        self._statement = []
+
+        if terminator == ";":
+            self._emit_statement(statement, output)
+            return
+
+        statement = _normalize_whitespace(statement)
+        if statement:
+            output.append(f"{statement} {terminator}\n")
+        else:
+            output.append(f"{terminator}\n")
+
+    def _emit_statement(self, statement, output):
+        statement = _normalize_whitespace(statement)
+        if not statement:
+            return
+
+        first_statement = not self._seen_statement
+        self._seen_statement = True
+
+        if first_statement:
+            version = _VERSION.match(statement)
+            if version is not None and version.group(1).split(".")[0] in ("2", "3"):
+                self._qasm3 = version.group(1).startswith("3")
+                self._qelib_included = True
+                output.append(f"OPENQASM 2.0;\n{QELIB_INCLUDE}\n")
+                return
+
+        include = _INCLUDE.match(statement) if statement.startswith("include") else None
+        if include is not None:
+            filename = include.group(1)
+            if filename == "qelib1.inc" and self._qelib_included:
+                return
+            if self._qasm3 and filename in _QASM3_STANDARD_INCLUDES:
+                return
+
+        if self._qasm3:
+            statement = self._translate_qasm3(statement)
+
+        output.append(statement)
+        output.append(";\n")
+
+    @staticmethod
+    def _translate_qasm3(statement):
+        if statement.startswith(("qubit", "bit")):
+            register = _REGISTER.match(statement)
+            if register is not None:
+                keyword, size, name = register.groups()
+                return f"{_REGISTER_KEYWORDS[keyword]} {name}[{size or 1}]"
+
+        measure = _MEASURE_ASSIGN.match(statement) if "measure" in statement else None
+        if measure is not None:
+            target, source = measure.groups()
+            return f"measure {source} -> {target}"
+
+        return statement
+
+
+def _normalize_whitespace(statement):
+    statement = statement.strip()
+    if "\n" in statement or "\t" in statement or "  " in statement:
+        statement = _WHITESPACE.sub(" ", statement)
+    return statement
+
+
+def translate_qasm(source):
+    """
+    Translate a program to Qiskit's OpenQASM 2 dialect in a single pass.
+
+    Args:
+        source: The program as a string, or any iterable of string chunks
+            such as an open text file
+
+    Returns:
+        The translated program, assembled once at the end
+    """
+    translator = QasmTranslator()
+    if isinstance(source, str):
+        source = (source,)
+
+    output = [translator.feed(chunk) for chunk in source]
+    output.append(translator.close())
+    return "".join(output)
+
+
+def normalize_qasm(source):
+    """
+    Translated program with comments, indentation and blank lines removed.
+
+    Two programs that only differ in layout normalize to the same text,
+    which makes it suitable for content-addressed lookups.
+    """
+    lines = []
+    for line in translate_qasm(source).split('\n'):
+        line = line.split('//', 1)[0].strip()
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
@@ -1,46 +1,304 @@
+import asyncio
 import logging
+import os
+import time
 
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
+import numpy as np
+from qiskit import QuantumCircuit, transpile
 from qiskit.qasm2.exceptions import QASM2ParseError
 
-from app.main.exceptions.custom_exceptions import QASMParsingError, CircuitExecutionError
+from app.main.exceptions.custom_exceptions import QASMParsingError, CircuitExecutionError, ResourceLimitError
+from app.main.service.admission_control import (SIMULATION_MAX_JOB_MEMORY, SIMULATION_MAX_JOB_SECONDS,
+                                                get_default_admission_controller)
+from app.main.service.circuit_analyzer import analyze_circuit
+from app.main.service.circuit_cache import get_default_circuit_cache
+from app.main.service.circuit_optimizer import CIRCUIT_OPTIMIZATION_PASSES, optimize_circuit
+from app.main.service.circuit_sweep import parse_template
+from app.main.service.counts_encoding import PackedCounts
+from app.main.service.qasm_translator import normalize_qasm, translate_qasm
+from app.main.service.resource_estimator import estimate_resources, format_bytes
+from app.main.service.shot_memory import MAX_MEMORY_BITS, memory_from_bitstrings
+from app.main.service.simulation_executor import SIMULATION_MAX_WORKERS, get_default_executor
+from app.main.service.simulator_pool import get_default_simulator_pool
+from app.main.service.statevector_engine import STATEVECTOR_MAX_QUBITS, StatevectorEngine, samples_final_state
 
 # Configure the logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 100))
+CIRCUIT_CACHE_TRANSPILE = os.getenv("CIRCUIT_CACHE_TRANSPILE", "false").lower() == "true"
+# Runs with more shots are split into shards of about this many shots, 0 disables sharding
+SHOT_SHARD_SIZE = int(os.getenv("SHOT_SHARD_SIZE", 100000))
+SHOT_SHARD_MAX = int(os.getenv("SHOT_SHARD_MAX", SIMULATION_MAX_WORKERS))
+# Statevector circuits measured only at the end with at most this many qubits sample all shots from the final state
+FINAL_STATE_SAMPLING_MAX_QUBITS = int(os.getenv("FINAL_STATE_SAMPLING_MAX_QUBITS", 24))
+
+
 class QuantumCircuitService:
     """
     Service for creating, executing, and processing quantum circuits.
     """
 
-    def __init__(self, shots=10000):
+    def __init__(self, shots=10000, executor=None, simulator_pool=None, method="automatic", circuit_cache=None,
+                 statevector_max_qubits=STATEVECTOR_MAX_QUBITS, admission_controller=None,
+                 max_job_memory=SIMULATION_MAX_JOB_MEMORY, max_job_seconds=SIMULATION_MAX_JOB_SECONDS,
+                 shot_shard_size=SHOT_SHARD_SIZE, max_shards=SHOT_SHARD_MAX,
+                 optimization_passes=CIRCUIT_OPTIMIZATION_PASSES,
+                 final_state_sampling_max_qubits=FINAL_STATE_SAMPLING_MAX_QUBITS):
         """
         Initialize the quantum circuit service.
+
+        Args:
+            shots: Number of shots per circuit execution
+            executor: SimulationExecutor that runs the blocking work, the
+                process-wide default executor is used if omitted
+            simulator_pool: SimulatorPool to borrow simulators from, the
+                pool of the executing process is used if omitted
+            method: Aer simulation method, "automatic" picks one per circuit
+                (see circuit_analyzer.py)
+            circuit_cache: CircuitCache for parsed circuits, the cache of
+                the executing process is used if omitted
+            statevector_max_qubits: Circuits with at most this many qubits
+                run on the built-in NumPy statevector engine instead of Aer,
+                0 disables the engine
+            admission_controller: AdmissionController that holds back
+                simulations until their memory fits in the budget, the one of
+                the executing process is used if omitted
+            max_job_memory: Circuits predicted to need more bytes are rejected
+            max_job_seconds: Circuits predicted to run longer are rejected
+            shot_shard_size: Runs with more shots are split into shards of
+                about this many shots that run in parallel, 0 disables sharding
+            max_shards: Upper bound on the number of shards of a run
+            optimization_passes: Passes run on every parsed circuit before
+                simulation (see circuit_optimizer.py), empty to disable them
+            final_state_sampling_max_qubits: Statevector circuits with at
+                most this many qubits and only terminal measurements are
+                simulated once and all shots drawn from the final state,
+                0 disables this
         """
         self.shots = shots
-        self.simulator = AerSimulator()
+        self.method = method
+        self.executor = executor
+        self.simulator_pool = simulator_pool
+        self.circuit_cache = circuit_cache
+        self.statevector_engine = StatevectorEngine(max_qubits=statevector_max_qubits)
+        self.admission_controller = admission_controller
+        self.max_job_memory = max_job_memory
+        self.max_job_seconds = max_job_seconds
+        self.shot_shard_size = shot_shard_size
+        self.max_shards = max_shards
+        self.optimization_passes = list(optimization_passes)
+        self.final_state_sampling_max_qubits = final_state_sampling_max_qubits
         logger.info(f"Initialized QuantumCircuitService with {shots} shots")
 
-    async def execute_qasm(self, qasm_string):
+    def __getstate__(self):
+        # Only the configuration is shipped to process pool workers, which
+        # use their own simulator pool and circuit cache
+        state = self.__dict__.copy()
+        state["executor"] = None
+        state["simulator_pool"] = None
+        state["circuit_cache"] = None
+        state["admission_controller"] = None
+        return state
+
+    async def execute_qasm(self, qasm_string, shots=None, seed=None, memory=False):
         """
         Execute a quantum circuit from QASM string.
+
+        Parsing, simulation and count formatting run on the simulation
+        executor so the event loop stays responsive, and cancelling the
+        caller (e.g. through asyncio.wait_for) stops waiting immediately.
+
+        The resources of the circuit are estimated first. A circuit that
+        exceeds the job limits gets an error result without being simulated,
+        and the simulation only starts once its predicted memory fits in the
+        budget of the admission controller.
+
+        Runs with more than shot_shard_size shots are split into shards that
+        run concurrently on the executor (see shard_shots), and their counts
+        are added up. Circuits sampled from their final state are not
+        sharded, as drawing the shots costs little next to the simulation.
+
+        Args:
+            qasm_string: QASM representation of a quantum circuit
+            shots: Number of shots, defaults to the service setting
+            seed: Optional simulator seed for reproducible counts
+            memory: Also return the outcome of every shot, as a NumPy array
+                under "memory" with the number of classical bits under
+                "memory_width"
+        """
+        executor = self.executor or get_default_executor()
+        try:
+            plan = await executor.run(self.plan_qasm, qasm_string, shots)
+        except ResourceLimitError as e:
+            logger.error(f"Circuit rejected. Error: {str(e)}")
+            return {"error": True, "message": str(e)}
+        if plan is None:
+            # Unparsable, run_qasm reports the error
+            return await executor.run(self.run_qasm, qasm_string, shots, seed)
+
+        admission_controller = self.admission_controller or get_default_admission_controller()
+
+        async def run_shard(shard_shots, shard_seed):
+            # Shot memory takes 8 bytes per shot on top of the simulation
+            reservation = plan.memory_bytes + (8 * shard_shots if memory else 0)
+            started = time.perf_counter()
+            async with admission_controller.reserve(reservation):
+                admission_seconds = time.perf_counter() - started
+                result = await executor.run(self.run_qasm, qasm_string, shard_shots, shard_seed, plan.method, memory)
+            if "timings" in result:
+                result["timings"]["admission"] = admission_seconds
+            return result
+
+        shots = shots or self.shots
+        if plan.final_state_sampling and not memory:
+            shards = [(shots, seed)]
+        else:
+            shards = self.shard_shots(shots, seed)
+        if len(shards) == 1:
+            return await run_shard(*shards[0])
+
+        logger.info(f"Running {shots} shots as {len(shards)} shards")
+        results = await asyncio.gather(*(run_shard(shard_shots, shard_seed) for shard_shots, shard_seed in shards))
+        return self.merge_results(results)
+
+    def shard_shots(self, shots, seed=None):
+        """
+        Split the shots of a run into shards of at most about shot_shard_size shots.
+
+        Every shard gets its own seed, derived from the seed of the run with
+        numpy's SeedSequence, so the shards sample independently and a
+        seeded run is reproducible. Unseeded runs stay unseeded.
+
+        Args:
+            shots: Number of shots of the run
+            seed: Optional seed of the run
+
+        Returns:
+            list of (shots, seed) tuples, one per shard
+        """
+        if self.shot_shard_size <= 0 or shots <= self.shot_shard_size:
+            return [(shots, seed)]
+
+        num_shards = min(-(-shots // self.shot_shard_size), max(self.max_shards, 1))
+        sizes = [shots // num_shards + (1 if index < shots % num_shards else 0) for index in range(num_shards)]
+        if seed is None:
+            return [(size, None) for size in sizes]
+        seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(num_shards)]
+        return list(zip(sizes, seeds))
+
+    def merge_results(self, results):
+        """
+        Add up the counts of the shards of a run and concatenate their shot memory, in shard order.
+
+        The first error wins.
+        """
+        for result in results:
+            if result.get("error", False):
+                return result
+
+        if all(isinstance(result["counts"], PackedCounts) for result in results):
+            counts = PackedCounts.merge([result["counts"] for result in results])
+        else:
+            counts = {}
+            for result in results:
+                for outcome, count in result["counts"].items():
+                    counts[outcome] = counts.get(outcome, 0) + count
+
+        # Shards run side by side, so a stage takes as long as in the slowest shard
+        timings = {}
+        for result in results:
+            for stage, seconds in result.get("timings", {}).items():
+                timings[stage] = max(timings.get(stage, 0.0), seconds)
+        merged = {"error": False, "counts": counts, "method": results[0]["method"], "timings": timings,
+                  "num_qubits": results[0].get("num_qubits"), "optimization": results[0].get("optimization")}
+        if "memory" in results[0]:
+            merged["memory"] = np.concatenate([result["memory"] for result in results])
+            merged["memory_width"] = results[0]["memory_width"]
+        return merged
+
+    def plan_qasm(self, qasm_string, shots=None):
+        """
+        Estimate the resources of a circuit from QASM string with the method it will run with.
+
+        Returns:
+            ResourceEstimate, or None if the program does not parse
+
+        Raises:
+            ResourceLimitError: If no method fits in the job limits
         """
         try:
+            circuit = self._parse_circuit(self._preprocess_qasm(qasm_string))
+        except (QASM2ParseError, QASMParsingError):
+            return None
+        return self._plan(circuit, shots or self.shots, self._preferred_method(circuit))
+
+    def run_qasm(self, qasm_string, shots=None, seed=None, method=None, memory=False):
+        """
+        Execute a quantum circuit from QASM string, blocking until the result is ready.
+
+        The result carries the seconds spent in every stage under "timings"
+        and the width of the circuit under "num_qubits", which the caller
+        records as pipeline metrics (see pipeline_metrics.py); they are
+        measured here because this may run in a pool process.
+
+        Args:
+            method: Simulation method chosen by plan_qasm, planned again if omitted
+            memory: Also return the outcome of every shot (see execute_qasm)
+        """
+        shots = shots or self.shots
+        run_options = {"shots": shots}
+        if seed is not None:
+            run_options["seed_simulator"] = seed
+        if memory:
+            run_options["memory"] = True
+
+        timings = {}
+        try:
+            started = time.perf_counter()
             processed_qasm = self._preprocess_qasm(qasm_string)
-            logger.info(f"Processed QASM string:\n{processed_qasm}")
+            logger.debug(f"Processed QASM string:\n{processed_qasm}")
+            timings["preprocess"] = time.perf_counter() - started
 
-            circuit = QuantumCircuit.from_qasm_str(processed_qasm)
+            started = time.perf_counter()
+            circuit = self._parse_circuit(processed_qasm)
             logger.info(f"Successfully parsed QASM string into circuit with {circuit.num_qubits} qubits")
+            timings["parse"] = time.perf_counter() - started
+
+            if memory and circuit.num_clbits > MAX_MEMORY_BITS:
+                raise CircuitExecutionError(
+                    message=f"Shot memory supports at most {MAX_MEMORY_BITS} classical bits, "
+                            f"the circuit has {circuit.num_clbits}"
+                )
+
+            if method is None:
+                method = self._plan(circuit, shots, self._preferred_method(circuit)).method
 
-            job = self.simulator.run(circuit, shots=self.shots)
-            result = job.result()
-            counts = result.get_counts(circuit)
+            # The engine and final state sampling only produce counts
+            started = time.perf_counter()
+            if not memory and self._uses_engine(method, circuit):
+                counts = self.statevector_engine.run(circuit, shots, seed)
+            elif not memory and self._samples_final_state(method, circuit):
+                counts = self._sample_final_state(circuit, shots, seed)
+            else:
+                with (self.simulator_pool or get_default_simulator_pool()).checkout(method) as simulator:
+                    result = simulator.run(circuit, **run_options).result()
+                counts = result.get_counts(circuit)
+            timings["simulate"] = time.perf_counter() - started
 
-            logger.info(f"Circuit execution complete with {len(counts)} unique outcomes")
+            logger.info(f"Circuit execution with the {method} method complete with {len(counts)} unique outcomes")
+            started = time.perf_counter()
             formatted_counts = self.format_counts(counts)
-            return {"error": False, "counts": formatted_counts}
+            timings["format"] = time.perf_counter() - started
+
+            execution_result = {"error": False, "counts": formatted_counts, "method": method,
+                                "timings": timings, "num_qubits": circuit.num_qubits,
+                                "optimization": self._optimization_report(circuit)}
+            if memory:
+                execution_result["memory"] = memory_from_bitstrings(result.get_memory(circuit), circuit.num_clbits)
+                execution_result["memory_width"] = circuit.num_clbits
+            return execution_result
 
         except QASM2ParseError as e:
             logger.error(f"QASM parsing failed. Error: {str(e)}")
@@ -48,6 +306,9 @@ class QuantumCircuitService:
         except QASMParsingError as e:
             logger.error(f"QASM parsing failed. Error: {str(e)}")
             return {"error": True, "message": str(e)}
+        except ResourceLimitError as e:
+            logger.error(f"Circuit rejected. Error: {str(e)}")
+            return {"error": True, "message": str(e)}
         except CircuitExecutionError as e:
             logger.error(f"Circuit execution failed. Error: {str(e)}")
             return {"error": True, "message": str(e)}
@@ -55,57 +316,315 @@ class QuantumCircuitService:
             logger.error(f"Unexpected error: {str(e)}")
             raise CircuitExecutionError(message=str(e))
 
-    def _preprocess_qasm(self, qasm_string):
+    async def execute_batch(self, qasm_strings, shots=None, seed=None):
         """
-        Preprocess QASM string to ensure compatibility.
+        Execute many circuits from QASM strings as grouped simulator runs.
+
+        Returns one result per circuit, in order, shaped like the result of
+        execute_qasm.
+        """
+        executor = self.executor or get_default_executor()
+        return await executor.run(self.run_batch, qasm_strings, shots, seed)
+
+    def run_batch(self, qasm_strings, shots=None, seed=None):
+        """
+        Execute many circuits, blocking until every result is ready.
+
+        Circuits that fail to parse or exceed the job limits get an error
+        result; the rest are grouped by simulation method and handed to the simulator BATCH_CHUNK_SIZE at a
+        time as one multi-experiment run, which lets Aer parallelize across
+        experiments.
+        """
+        shots = shots or self.shots
+        run_options = {"shots": shots, "max_parallel_experiments": 0}
+        if seed is not None:
+            run_options["seed_simulator"] = seed
+
+        results = [None] * len(qasm_strings)
+        groups = {}
+        for index, qasm_string in enumerate(qasm_strings):
+            try:
+                circuit = self._parse_circuit(self._preprocess_qasm(qasm_string))
+            except (QASM2ParseError, QASMParsingError) as e:
+                results[index] = {"error": True, "message": f"QASM parsing error: {str(e)}"}
+                continue
+            try:
+                method = self._plan(circuit, shots, self._select_method(circuit)).method
+            except ResourceLimitError as e:
+                results[index] = {"error": True, "message": str(e)}
+                continue
+            circuits, indices = groups.setdefault(method, ([], []))
+            circuits.append(circuit)
+            indices.append(index)
+
+        for method, (circuits, indices) in groups.items():
+            for start in range(0, len(circuits), BATCH_CHUNK_SIZE):
+                chunk = circuits[start:start + BATCH_CHUNK_SIZE]
+                chunk_indices = indices[start:start + BATCH_CHUNK_SIZE]
+                try:
+                    with (self.simulator_pool or get_default_simulator_pool()).checkout(method) as simulator:
+                        result = simulator.run(chunk, **run_options).result()
+                except Exception as e:
+                    logger.error(f"Batch execution failed. Error: {str(e)}")
+                    for index in chunk_indices:
+                        results[index] = {"error": True, "message": f"Circuit execution error: {str(e)}"}
+                    continue
+
+                for experiment, index in enumerate(chunk_indices):
+                    try:
+                        counts = result.get_counts(experiment)
+                        results[index] = {"error": False, "counts": self.format_counts(counts), "method": method,
+                                          "optimization": self._optimization_report(chunk[experiment])}
+                    except Exception as e:
+                        results[index] = {"error": True, "message": f"Circuit execution error: {str(e)}"}
+
+        logger.info(f"Batch execution complete for {len(qasm_strings)} circuits")
+        return results
+
+    async def execute_sweep(self, qasm_string, names, values, shots=None, seed=None):
         """
+        Execute a QASM template with free parameters at many parameter values.
+
+        Returns {"error": False, "counts": [...], "method": ...} with the
+        PackedCounts of every point in order, or an error result.
+
+        Args:
+            qasm_string: QASM program whose gate arguments refer to the parameters
+            names: Parameter names
+            values: (points x parameters) NumPy array of parameter values
+            shots: Number of shots per point, defaults to the service setting
+            seed: Optional simulator seed
+        """
+        executor = self.executor or get_default_executor()
+        return await executor.run(self.run_sweep, qasm_string, names, values, shots, seed)
+
+    def run_sweep(self, qasm_string, names, values, shots=None, seed=None):
+        """
+        Execute a parameter sweep, blocking until every point is done.
+
+        The template is parsed into one parameterized circuit, cached like any
+        other circuit, and handed to the simulator BATCH_CHUNK_SIZE points at
+        a time with Aer's parameter_binds, which binds the parameters inside
+        the simulator instead of building a circuit per point. Counts keep all
+        classical bits in one integer, as in shot memory.
+        """
+        shots = shots or self.shots
+        run_options = {"shots": shots, "max_parallel_experiments": 0}
+        if seed is not None:
+            run_options["seed_simulator"] = seed
+
         try:
-            # Handle QASM 3.0 to 2.0 conversion
-            if "OPENQASM 3.0" in qasm_string:
-                logger.info("Converting QASM 3.0 to QASM 2.0 format")
+            processed_qasm = self._preprocess_qasm(qasm_string)
+            cache = self.circuit_cache or get_default_circuit_cache()
+            circuit = cache.get_or_create(cache.key(processed_qasm, f"sweep:{','.join(names)}"),
+                                          lambda: parse_template(processed_qasm, names))
+            if circuit.num_clbits > MAX_MEMORY_BITS:
+                raise CircuitExecutionError(message=f"Sweeps support at most {MAX_MEMORY_BITS} classical bits")
+            method = self._plan(circuit, shots, self._select_method(circuit)).method
+
+            parameters = {parameter.name: parameter for parameter in circuit.parameters}
+            columns = {parameters[name]: values[:, index] for index, name in enumerate(names) if name in parameters}
+            counts = []
+            with (self.simulator_pool or get_default_simulator_pool()).checkout(method) as simulator:
+                for start in range(0, len(values), BATCH_CHUNK_SIZE):
+                    size = min(BATCH_CHUNK_SIZE, len(values) - start)
+                    if columns:
+                        binds = [{parameter: column[start:start + size].tolist() for parameter, column in columns.items()}]
+                        result = simulator.run([circuit], parameter_binds=binds, **run_options).result()
+                    else:
+                        result = simulator.run([circuit] * size, **run_options).result()
+                    for experiment in range(size):
+                        bitstrings = result.get_counts(experiment)
+                        counts.append(PackedCounts.from_bitstrings(
+                            {key.replace(" ", ""): count for key, count in bitstrings.items()}
+                        ))
+
+            logger.info(f"Sweep of {len(values)} points complete with the {method} method")
+            return {"error": False, "counts": counts, "method": method}
+
+        except (QASM2ParseError, QASMParsingError, ValueError) as e:
+            logger.error(f"Sweep template parsing failed. Error: {str(e)}")
+            return {"error": True, "message": f"QASM parsing error: {str(e)}"}
+        except (ResourceLimitError, CircuitExecutionError) as e:
+            logger.error(f"Sweep rejected. Error: {str(e)}")
+            return {"error": True, "message": str(e)}
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            raise CircuitExecutionError(message=str(e))
+
+    def _preferred_method(self, circuit):
+        """
+        Simulation method a single circuit runs with when it fits in the job limits.
+        """
+        if self.method == "automatic" and self.statevector_engine.supports(circuit):
+            return "statevector"
+        return self._select_method(circuit)
+
+    def _uses_engine(self, method, circuit):
+        return self.method == "automatic" and method == "statevector" and self.statevector_engine.supports(circuit)
+
+    def _samples_final_state(self, method, circuit):
+        """
+        Whether all shots of a circuit are drawn from a single simulation of its final state.
+        """
+        if self._uses_engine(method, circuit):
+            return True
+        return method == "statevector" and circuit.num_qubits <= self.final_state_sampling_max_qubits \
+            and samples_final_state(circuit)
+
+    def _sample_final_state(self, circuit, shots, seed):
+        """
+        Simulate a circuit without its measurements once with Aer and draw all shots from the final state.
+
+        Only valid for circuits accepted by samples_final_state, whose
+        measurements all come last and so do not disturb the state.
+        """
+        evolution = circuit.copy_empty_like()
+        for instruction in circuit.data:
+            if instruction.operation.name != "measure":
+                evolution.append(instruction.operation, instruction.qubits, instruction.clbits)
+        evolution.save_statevector()
+
+        with (self.simulator_pool or get_default_simulator_pool()).checkout("statevector") as simulator:
+            state = simulator.run(evolution, shots=1).result().get_statevector(evolution)
+        probabilities = np.abs(np.asarray(state)) ** 2
+        return StatevectorEngine.sample(circuit, probabilities / probabilities.sum(), shots, seed)
+
+    def _plan(self, circuit, shots, method):
+        """
+        Estimate the resources of running a circuit with a method, within the job limits.
+
+        With the automatic method, a circuit that is too large for the
+        preferred method falls back to matrix-product state if that fits,
+        e.g. a wide but shallow circuit that would not fit as a statevector.
+
+        Raises:
+            ResourceLimitError: If neither method fits in the job limits
+        """
+        num_gates = sum(1 for instruction in circuit.data if instruction.operation.name not in ("barrier", "measure"))
+        depth = circuit.depth()
 
-                lines = qasm_string.strip().split('\n')
-                processed_lines = []
+        estimate = estimate_resources(method, circuit.num_qubits, num_gates, depth, shots,
+                                      final_state_sampling=self._samples_final_state(method, circuit))
+        if self._within_limits(estimate):
+            return estimate
 
-                for line in lines:
-                    line = line.strip()
+        if self.method == "automatic" and method != "matrix_product_state":
+            fallback = estimate_resources("matrix_product_state", circuit.num_qubits, num_gates, depth, shots)
+            if self._within_limits(fallback):
+                logger.info(f"Circuit needs {format_bytes(estimate.memory_bytes)} with the {method} method, "
+                            f"running it with matrix_product_state instead")
+                return fallback
 
-                    if "OPENQASM 3.0" in line:
-                        processed_lines.append("OPENQASM 2.0;")
-                        processed_lines.append('include "qelib1.inc";')
-                        continue
+        raise ResourceLimitError(
+            f"Circuit with {circuit.num_qubits} qubits needs ~{format_bytes(estimate.memory_bytes)} and "
+            f"~{estimate.seconds:.0f} seconds with the {method} method, the limits are "
+            f"{format_bytes(self.max_job_memory)} and {self.max_job_seconds:.0f} seconds"
+        )
 
-                    if line.startswith("qubit[") or line.startswith("bit["):
-                        line = line.replace("qubit[", "qreg q[").replace("bit[", "creg c[")
+    def _within_limits(self, estimate):
+        return estimate.memory_bytes <= self.max_job_memory and estimate.seconds <= self.max_job_seconds
 
-                    if " = measure " in line:
-                        line = line.replace(" = measure ", " measure ")
+    def _select_method(self, circuit):
+        """
+        Simulation method for a circuit: the configured one, or the analyzer's choice when automatic.
+        """
+        if self.method != "automatic":
+            return self.method
+        return analyze_circuit(circuit).method
 
-                    processed_lines.append(line)
+    def _parse_circuit(self, processed_qasm):
+        """
+        Parse preprocessed QASM, reusing the cached circuit for a program seen before.
 
-                processed_qasm = '\n'.join(processed_lines)
-                return processed_qasm
+        The parsed circuit goes through the optimization passes, and the
+        optimized circuit is cached with their report in its metadata. With
+        CIRCUIT_CACHE_TRANSPILE enabled the circuit is also transpiled for
+        the simulator once and the transpiled circuit is cached instead.
+        """
+        cache = self.circuit_cache or get_default_circuit_cache()
+        variant = f"optimized:{','.join(self.optimization_passes)}"
 
-            if "OPENQASM 2.0" in qasm_string and 'include "qelib1.inc"' not in qasm_string:
-                lines = qasm_string.strip().split('\n')
-                for i, line in enumerate(lines):
-                    if "OPENQASM 2.0" in line:
-                        lines.insert(i + 1, 'include "qelib1.inc";')
-                        break
-                return '\n'.join(lines)
+        def parse_and_optimize():
+            circuit, report = optimize_circuit(QuantumCircuit.from_qasm_str(processed_qasm), self.optimization_passes)
+            circuit.metadata = {**(circuit.metadata or {}), "optimization": report}
+            return circuit
 
-            return qasm_string
+        if not CIRCUIT_CACHE_TRANSPILE:
+            return cache.get_or_create(cache.key(processed_qasm, variant), parse_and_optimize)
 
+        def parse_and_transpile():
+            circuit = parse_and_optimize()
+            with (self.simulator_pool or get_default_simulator_pool()).checkout(self.method) as simulator:
+                transpiled = transpile(circuit, backend=simulator)
+            transpiled.metadata = circuit.metadata
+            return transpiled
+
+        key = cache.key(processed_qasm, f"transpiled:{self.method}:{variant}")
+        return cache.get_or_create(key, parse_and_transpile)
+
+    @staticmethod
+    def _optimization_report(circuit):
+        return (circuit.metadata or {}).get("optimization")
+
+    def normalized_qasm(self, qasm_string):
+        """
+        Preprocessed QASM with comments, indentation and blank lines removed.
+
+        Two programs that only differ in layout normalize to the same text,
+        which makes it suitable for content-addressed lookups.
+        """
+        try:
+            return normalize_qasm(qasm_string)
+        except Exception as e:
+            raise QASMParsingError(message=str(e), original_qasm=qasm_string)
+
+    def simulator_options(self):
+        """
+        Simulator settings that influence the result of a run.
+        """
+        return {
+            "backend": "aer_simulator",
+            "method": self.method,
+            "statevector_max_qubits": self.statevector_engine.max_qubits,
+            # Sharded seeded runs sample differently from a single run
+            "shot_shard_size": self.shot_shard_size,
+            "max_shards": self.max_shards,
+            # Optimized circuits sample differently from the same seed
+            "optimization_passes": self.optimization_passes,
+            # Final state sampling draws different shots from the same seed
+            "final_state_sampling_max_qubits": self.final_state_sampling_max_qubits
+        }
+
+    def _preprocess_qasm(self, qasm_string):
+        """
+        Preprocess QASM string to ensure compatibility.
+
+        QASM 3 programs are translated to the QASM 2 dialect the Qiskit
+        parser understands, and QASM 2 programs get the qelib1.inc include
+        when it is missing (see qasm_translator.py).
+        """
+        try:
+            return translate_qasm(qasm_string)
         except Exception as e:
             raise QASMParsingError(message=str(e), original_qasm=qasm_string)
 
     def format_counts(self, counts):
         """
         Format counts for API response.
+
+        Counts of a single register are packed into integer arrays in one
+        vectorized pass (see counts_encoding.py) and read like a dictionary
+        keyed by decimal outcomes. Other counts, e.g. of several registers,
+        are converted key by key.
         """
         if not counts:
             return {}
 
+        packed = PackedCounts.from_bitstrings(counts)
+        if packed is not None:
+            return packed
+
         formatted_counts = {}
 
         for bitstring, count in counts.items():
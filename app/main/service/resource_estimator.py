@@ -0,0 +1,87 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Simulator throughput assumed by the runtime model
+SIMULATION_OPS_PER_SECOND = float(os.getenv("SIMULATION_OPS_PER_SECOND", 1e8))
+SIMULATION_SAMPLES_PER_SECOND = float(os.getenv("SIMULATION_SAMPLES_PER_SECOND", 1e7))
+# Largest bond dimension a matrix-product state is expected to reach
+SIMULATION_MPS_MAX_BOND_DIMENSION = int(os.getenv("SIMULATION_MPS_MAX_BOND_DIMENSION", 4096))
+
+# Bytes per complex amplitude in double precision
+AMPLITUDE_BYTES = 16
+# Bytes per basis state probability
+PROBABILITY_BYTES = 8
+
+
+class ResourceEstimate:
+    """
+    Predicted peak memory and runtime of simulating a circuit with one method.
+    """
+
+    def __init__(self, method, memory_bytes, seconds, final_state_sampling=False):
+        self.method = method
+        self.memory_bytes = memory_bytes
+        self.seconds = seconds
+        # Whether all shots are drawn from the final state in one go
+        self.final_state_sampling = final_state_sampling
+
+    def __repr__(self):
+        return f"ResourceEstimate({self.method}, {format_bytes(self.memory_bytes)}, {self.seconds:.3g}s)"
+
+
+def estimate_resources(method, num_qubits, num_gates, depth, shots, final_state_sampling=False):
+    """
+    Predict the memory and runtime of a simulation from the size of the circuit.
+
+    Statevector needs 16 * 2^n bytes and touches every amplitude per gate,
+    density matrix 16 * 4^n. Stabilizer keeps a (2n x 2n) bit tableau with
+    O(n) work per gate and O(n^2) per measured shot. A matrix-product state
+    holds two (chi x chi) tensors per qubit, where the bond dimension chi
+    doubles with every layer of entangling gates up to 2^(n/2) and the
+    configured cap, and costs chi^3 per gate.
+
+    When the shots are drawn from the final statevector in one multinomial
+    draw, sampling scales with the number of basis states instead of the
+    shots, and a copy of the state plus its probabilities are held on top.
+
+    Args:
+        method: Aer simulation method, "automatic" is treated as statevector
+        num_qubits: Width of the circuit
+        num_gates: Number of gate applications
+        depth: Circuit depth
+        shots: Number of shots
+        final_state_sampling: Whether a statevector run samples its final state
+
+    Returns:
+        ResourceEstimate for the method
+    """
+    sampling_seconds = shots * num_qubits / SIMULATION_SAMPLES_PER_SECOND
+
+    if method == "stabilizer":
+        memory_bytes = (2 * num_qubits) * (2 * num_qubits + 1) // 8
+        seconds = (num_gates * num_qubits + shots * num_qubits ** 2) / SIMULATION_OPS_PER_SECOND
+    elif method == "density_matrix":
+        memory_bytes = AMPLITUDE_BYTES * 4 ** num_qubits
+        seconds = num_gates * 4 ** num_qubits / SIMULATION_OPS_PER_SECOND + sampling_seconds
+    elif method == "matrix_product_state":
+        bond_dimension = min(2 ** min(depth, num_qubits // 2), SIMULATION_MPS_MAX_BOND_DIMENSION)
+        memory_bytes = num_qubits * 2 * bond_dimension ** 2 * AMPLITUDE_BYTES
+        seconds = num_gates * bond_dimension ** 3 / SIMULATION_OPS_PER_SECOND + sampling_seconds
+    elif final_state_sampling:
+        memory_bytes = (2 * AMPLITUDE_BYTES + PROBABILITY_BYTES) * 2 ** num_qubits
+        sampling_seconds = min(shots, 2 ** num_qubits) * num_qubits / SIMULATION_SAMPLES_PER_SECOND
+        seconds = num_gates * 2 ** num_qubits / SIMULATION_OPS_PER_SECOND + sampling_seconds
+    else:
+        memory_bytes = AMPLITUDE_BYTES * 2 ** num_qubits
+        seconds = num_gates * 2 ** num_qubits / SIMULATION_OPS_PER_SECOND + sampling_seconds
+
+    return ResourceEstimate(method, memory_bytes, seconds, final_state_sampling and method == "statevector")
+
+
+def format_bytes(num_bytes):
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if num_bytes < 1024 or unit == "TiB":
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} B"
+        num_bytes /= 1024
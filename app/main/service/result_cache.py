@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from app.main.service.counts_encoding import decode_counts, encode_counts
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 24 * 60 * 60))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 10000))
+
+RESULT_KEY_PREFIX = "cache:result:"
+LRU_KEY = "cache:lru"
+STATS_KEY = "cache:stats"
+
+
+def compute_cache_key(normalized_qasm, shots, seed, simulator_options):
+    """
+    Content address of a simulation: hash of the circuit and everything that affects its counts.
+    """
+    payload = json.dumps(
+        {
+            "qasm": normalized_qasm,
+            "shots": shots,
+            "seed": seed,
+            "options": simulator_options
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Redis-backed cache of simulation counts keyed by circuit content.
+
+    Entries expire after ttl seconds. A sorted set tracks the last access
+    time of every entry, and the least recently used entries are evicted once
+    more than max_entries are stored. Hit, miss and eviction counts are kept
+    in a Redis hash so they add up across every worker.
+    """
+
+    def __init__(self, redis_client, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    async def get(self, key):
+        """
+        Return the cached counts for key, or None on a miss.
+        """
+        cached = await self.redis_client.get(f"{RESULT_KEY_PREFIX}{key}")
+
+        pipeline = self.redis_client.pipeline()
+        if cached is None:
+            pipeline.hincrby(STATS_KEY, "misses", 1)
+            pipeline.zrem(LRU_KEY, key)
+        else:
+            pipeline.hincrby(STATS_KEY, "hits", 1)
+            pipeline.zadd(LRU_KEY, {key: time.time()})
+        await pipeline.execute()
+
+        return None if cached is None else decode_counts(cached)
+
+    async def put(self, key, counts):
+        """
+        Store counts under key and evict least recently used entries beyond the size cap.
+        """
+        pipeline = self.redis_client.pipeline()
+        pipeline.set(f"{RESULT_KEY_PREFIX}{key}", encode_counts(counts), ex=self.ttl)
+        pipeline.zadd(LRU_KEY, {key: time.time()})
+        pipeline.zcard(LRU_KEY)
+        size = (await pipeline.execute())[-1]
+
+        if size > self.max_entries:
+            evicted = [member for member, _ in await self.redis_client.zpopmin(LRU_KEY, size - self.max_entries)]
+            if evicted:
+                pipeline = self.redis_client.pipeline()
+                pipeline.delete(*(f"{RESULT_KEY_PREFIX}{member}" for member in evicted))
+                pipeline.hincrby(STATS_KEY, "evictions", len(evicted))
+                await pipeline.execute()
+                logger.info(f"Evicted {len(evicted)} entries from the result cache")
+
+    async def stats(self):
+        """
+        Hit, miss and eviction counters plus the current number of entries.
+        """
+        pipeline = self.redis_client.pipeline()
+        pipeline.hgetall(STATS_KEY)
+        pipeline.zcard(LRU_KEY)
+        counters, size = await pipeline.execute()
+
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": int(counters.get("evictions", 0)),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl
+        }
@@ -0,0 +1,118 @@
+import base64
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shots per Redis value; the API never decodes more than one chunk at a time
+SHOT_MEMORY_CHUNK_SHOTS = int(os.getenv("SHOT_MEMORY_CHUNK_SHOTS", 65536))
+MAX_MEMORY_BITS = 64
+
+
+def memory_key(task_id, chunk):
+    return f"task:{task_id}:memory:{chunk}"
+
+
+def memory_item_size(width):
+    """
+    Bytes per shot in the binary download: the smallest unsigned integer that holds width bits.
+    """
+    return next(size for size in (1, 2, 4, 8) if width <= 8 * size)
+
+
+def memory_from_bitstrings(memory, num_clbits):
+    """
+    Per-shot outcomes as integers, from the bitstrings of Qiskit's get_memory.
+
+    Registers are separated by spaces and listed last to first, so dropping
+    the spaces leaves every clbit at its index counted from the right, and
+    the rows are parsed in one vectorized pass.
+    """
+    if num_clbits == 0 or not memory:
+        return np.zeros(len(memory), dtype=np.uint64)
+    characters = np.frombuffer("".join(memory).replace(" ", "").encode("ascii"), dtype=np.uint8)
+    bits = (characters.reshape(len(memory), num_clbits) - ord("0")).astype(np.uint64)
+    weights = np.left_shift(np.uint64(1), np.arange(num_clbits - 1, -1, -1, dtype=np.uint64))
+    return (bits * weights).sum(axis=1, dtype=np.uint64)
+
+
+def pack_shots(values, width):
+    """
+    Bit-pack per-shot outcomes, width bits per shot, least significant bit first.
+    """
+    shifts = np.arange(width, dtype=np.uint64)
+    bits = ((np.asarray(values, dtype=np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits, axis=None, bitorder="little").tobytes()
+
+
+def unpack_shots(data, width, count):
+    """
+    Inverse of pack_shots for the first count shots of data.
+    """
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * width, bitorder="little")
+    shifts = np.arange(width, dtype=np.uint64)
+    return (bits.reshape(count, width).astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+
+class ShotMemory:
+    """
+    Per-shot measurement outcomes of a task, stored bit-packed in fixed-size chunks.
+
+    Chunk i of a task holds shots [i * chunk_shots, (i + 1) * chunk_shots)
+    under task:{task_id}:memory:{i}, base64-encoded because the Redis
+    clients decode responses as text. The number of shots, the bits per shot
+    and the chunk size are kept in the task hash, so a range of shots is
+    served by reading and unpacking only the chunks it overlaps.
+    """
+
+    def __init__(self, redis_client, chunk_shots=SHOT_MEMORY_CHUNK_SHOTS):
+        # An asyncio Redis client
+        self.redis_client = redis_client
+        self.chunk_shots = chunk_shots
+
+    def add(self, task_id, values, width, pipeline):
+        """
+        Write the chunks of a task's shot memory.
+
+        Args:
+            task_id: Unique task identifier
+            values: NumPy array of per-shot outcomes
+            width: Number of classical bits per shot
+            pipeline: Pipeline to add the commands to; the caller executes it
+
+        Returns:
+            Fields describing the memory, to be stored in the task hash
+        """
+        for chunk, start in enumerate(range(0, len(values), self.chunk_shots)):
+            packed = pack_shots(values[start:start + self.chunk_shots], width)
+            pipeline.set(memory_key(task_id, chunk), base64.b64encode(packed).decode("ascii"))
+        return {"memory_shots": len(values), "memory_width": width, "memory_chunk_shots": self.chunk_shots}
+
+    async def read(self, task_id, task_data, start=0, stop=None):
+        """
+        Yield (offset, outcomes) for consecutive slices of the shots in [start, stop), one chunk at a time.
+
+        Args:
+            task_id: Unique task identifier
+            task_data: Contents of the task hash, with the fields returned by add
+            start: First shot
+            stop: Shot after the last one, the end of the memory if omitted
+        """
+        shots = int(task_data["memory_shots"])
+        width = int(task_data["memory_width"])
+        chunk_shots = int(task_data["memory_chunk_shots"])
+        stop = shots if stop is None else min(stop, shots)
+
+        position = start
+        while position < stop:
+            chunk = position // chunk_shots
+            chunk_start = chunk * chunk_shots
+            encoded = await self.redis_client.get(memory_key(task_id, chunk))
+            if encoded is None:
+                raise KeyError(f"Shot memory chunk {chunk} of task {task_id} is missing")
+            values = unpack_shots(base64.b64decode(encoded), width, min(chunk_shots, shots - chunk_start))
+            end = min(stop, chunk_start + len(values))
+            yield position, values[position - chunk_start:end - chunk_start]
+            position = end
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_EXECUTOR = os.getenv("SIMULATION_EXECUTOR", "thread")
+SIMULATION_MAX_WORKERS = int(os.getenv("SIMULATION_MAX_WORKERS", os.cpu_count() or 1))
+SIMULATION_MAX_CONCURRENCY = int(os.getenv("SIMULATION_MAX_CONCURRENCY", SIMULATION_MAX_WORKERS))
+
+_default_executor = None
+
+
+class SimulationExecutor:
+    """
+    Runs blocking simulation work on a thread or process pool.
+
+    At most max_concurrency calls are in flight at once; further callers wait
+    on the event loop without occupying a pool slot. A slot is only released
+    when the underlying call has really finished.
+
+    Cancelling a caller whose call is already running behaves differently per
+    pool kind. The process pool is terminated and replaced, which stops the
+    simulation; other calls that were running in it are resubmitted to the new
+    pool. Threads cannot be stopped, so on the thread pool the call runs to
+    completion in the background and keeps its slot until then.
+    """
+
+    def __init__(self, kind=SIMULATION_EXECUTOR, max_workers=SIMULATION_MAX_WORKERS,
+                 max_concurrency=SIMULATION_MAX_CONCURRENCY):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown simulation executor '{kind}', expected 'thread' or 'process'")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.executor = self._create_pool()
+        self._generation = 0
+        self._semaphores = weakref.WeakKeyDictionary()
+        logger.info(f"Initialized {kind} simulation executor with {max_workers} workers "
+                    f"and concurrency limit {max_concurrency}")
+
+    def _create_pool(self):
+        if self.kind == "process":
+            # Forking a process that already runs simulator threads can deadlock the child
+            return ProcessPoolExecutor(max_workers=self.max_workers,
+                                       mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_warm_up_process)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="simulation")
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) on the pool and await its result.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        await semaphore.acquire()
+
+        while True:
+            generation = self._generation
+            try:
+                future = self.executor.submit(fn, *args)
+            except BaseException:
+                semaphore.release()
+                raise
+            future.add_done_callback(lambda _: _release_slot(loop, semaphore))
+
+            try:
+                return await asyncio.wrap_future(future, loop=loop)
+            except asyncio.CancelledError:
+                if self.kind == "process" and future.running():
+                    self._recycle_pool()
+                raise
+            except BrokenProcessPool:
+                if generation == self._generation:
+                    raise
+                # The pool was recycled to stop another call; run this one again
+                await semaphore.acquire()
+
+    def _recycle_pool(self):
+        """
+        Terminate the process pool, stopping every running call, and start a new one.
+        """
+        old_pool = self.executor
+        self._generation += 1
+        self.executor = self._create_pool()
+
+        for process in list(getattr(old_pool, "_processes", {}).values()):
+            process.terminate()
+        old_pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Terminated simulation process pool to stop a cancelled call")
+
+    def _semaphore(self, loop):
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _warm_up_process():
+    # Each pool process serves one call at a time and keeps its own simulators
+    from app.main.service.simulator_pool import get_default_simulator_pool
+    get_default_simulator_pool().warm_up(instances=1)
+
+
+def _release_slot(loop, semaphore):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The loop that submitted the call has already been closed
+        pass
+
+
+def get_default_executor():
+    """
+    Return the process-wide simulation executor, creating it on first use.
+    """
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = SimulationExecutor()
+    return _default_executor
@@ -0,0 +1,123 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+logger = logging.getLogger(__name__)
+
+SIMULATOR_POOL_SIZE = int(os.getenv("SIMULATOR_POOL_SIZE", os.getenv("SIMULATION_MAX_WORKERS", os.cpu_count() or 1)))
+SIMULATOR_WARMUP_METHODS = [
+    method.strip() for method in os.getenv("SIMULATOR_WARMUP_METHODS", "statevector,stabilizer").split(",") if method.strip()
+]
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+class SimulatorPool:
+    """
+    Long-lived pool of initialized AerSimulator instances.
+
+    Simulators are grouped by configuration (simulation method plus backend
+    options). A task checks one out for the duration of a run and returns it
+    afterwards, so concurrent runs never share an instance and no run pays
+    for backend construction once the pool is warm. When every instance of a
+    configuration is in use a new one is created; at most size idle instances
+    per configuration are kept.
+    """
+
+    def __init__(self, size=SIMULATOR_POOL_SIZE):
+        self.size = size
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.checkouts = 0
+
+    @staticmethod
+    def _config_key(method, options):
+        return (method,) + tuple(sorted(options.items()))
+
+    def _idle_queue(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle is None:
+                idle = queue.LifoQueue(maxsize=self.size)
+                self._idle[key] = idle
+            return idle
+
+    def _create(self, method, options):
+        simulator = AerSimulator(method=method, **options)
+        with self._lock:
+            self.created += 1
+        return simulator
+
+    @contextmanager
+    def checkout(self, method="automatic", **options):
+        """
+        Borrow a simulator configured with method and options.
+        """
+        idle = self._idle_queue(self._config_key(method, options))
+        try:
+            simulator = idle.get_nowait()
+        except queue.Empty:
+            simulator = self._create(method, options)
+
+        with self._lock:
+            self.checkouts += 1
+        try:
+            yield simulator
+        finally:
+            try:
+                idle.put_nowait(simulator)
+            except queue.Full:
+                pass
+
+    def warm_up(self, methods=None, instances=None):
+        """
+        Create simulators ahead of time and run a trivial circuit on each.
+
+        Args:
+            methods: Simulation methods to prepare, SIMULATOR_WARMUP_METHODS by default
+            instances: Number of simulators per method, the pool size by default
+        """
+        methods = methods or SIMULATOR_WARMUP_METHODS
+        instances = instances or self.size
+
+        circuit = QuantumCircuit(1, 1)
+        circuit.h(0)
+        circuit.measure(0, 0)
+
+        for method in methods:
+            idle = self._idle_queue(self._config_key(method, {}))
+            for _ in range(max(instances - idle.qsize(), 0)):
+                simulator = self._create(method, {})
+                simulator.run(circuit, shots=1).result()
+                try:
+                    idle.put_nowait(simulator)
+                except queue.Full:
+                    # Another thread warming up the same pool filled it first
+                    break
+        logger.info(f"Warmed up {instances} simulators for methods {', '.join(methods)}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "idle": {",".join(map(str, key)): idle.qsize() for key, idle in self._idle.items()}
+            }
+
+
+def get_default_simulator_pool():
+    """
+    Return the simulator pool of this process, creating it on first use.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SimulatorPool()
+        return _default_pool
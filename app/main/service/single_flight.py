@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+
+import redis
+
+from app.main.service.qasm_translator import normalize_qasm
+
+logger = logging.getLogger(__name__)
+
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+# Seconds a leader may take from submission to completion before new submissions stop attaching to it
+COALESCE_LEASE_TTL = int(os.getenv("COALESCE_LEASE_TTL", 60 * 60))
+
+LEASE_KEY_PREFIX = "inflight:"
+
+
+def flight_key(qasm_string, shots, seed, normalized=None):
+    """
+    Identity of a submission for coalescing, or None if the program cannot be translated.
+
+    Malformed programs are not coalesced, so every submitter gets the
+    parsing error of its own task.
+
+    Args:
+        normalized: normalize_qasm(qasm_string) if the caller already has it
+    """
+    if normalized is None:
+        try:
+            normalized = normalize_qasm(qasm_string)
+        except Exception:
+            return None
+    payload = json.dumps({"qasm": normalized, "shots": shots, "seed": seed}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SingleFlight:
+    """
+    Attaches identical submissions to one in-flight execution, across API replicas.
+
+    The first submission of a flight key takes a Redis lease naming its task
+    (SET NX with a TTL) and is queued as the leader. Later submissions find
+    the lease and append their task ids to the flight's follower list
+    instead of being queued. When the leader finishes, the worker takes the
+    follower list and the lease in one transaction and copies the outcome to
+    every follower.
+
+    Attaching watches the lease, so a follower either lands in the list
+    before the leader takes it or finds the lease gone and leads a new
+    flight; no follower is left waiting on a finished leader. If a leader
+    is lost the lease expires after lease_ttl seconds and the next
+    submission starts over.
+    """
+
+    def __init__(self, redis_client, lease_ttl=COALESCE_LEASE_TTL):
+        # An asyncio Redis client
+        self.redis_client = redis_client
+        self.lease_ttl = lease_ttl
+
+    @staticmethod
+    def _keys(key):
+        return f"{LEASE_KEY_PREFIX}{key}", f"{LEASE_KEY_PREFIX}{key}:followers"
+
+    async def join(self, key, task_id):
+        """
+        Lead the flight of key or follow the task leading it.
+
+        Returns:
+            None if task_id now leads the flight and has to be executed,
+            otherwise the id of the leading task
+        """
+        lease_key, followers_key = self._keys(key)
+        while True:
+            if await self.redis_client.set(lease_key, task_id, nx=True, ex=self.lease_ttl):
+                return None
+            async with self.redis_client.pipeline() as pipeline:
+                try:
+                    await pipeline.watch(lease_key)
+                    leader = await pipeline.get(lease_key)
+                    if leader is None:
+                        continue
+                    pipeline.multi()
+                    pipeline.rpush(followers_key, task_id)
+                    pipeline.expire(followers_key, self.lease_ttl)
+                    await pipeline.execute()
+                    return leader
+                except redis.WatchError:
+                    continue
+
+    async def release(self, key, task_id):
+        """
+        End the flight led by task_id and return the ids of its followers.
+
+        The lease is only deleted while task_id still holds it; after it
+        expired and another task took it, the followers gathered so far are
+        still handed to task_id, whose result they asked for just the same.
+        """
+        lease_key, followers_key = self._keys(key)
+        async with self.redis_client.pipeline() as pipeline:
+            while True:
+                try:
+                    await pipeline.watch(lease_key)
+                    leader = await pipeline.get(lease_key)
+                    pipeline.multi()
+                    pipeline.lrange(followers_key, 0, -1)
+                    pipeline.delete(followers_key)
+                    if leader == task_id:
+                        pipeline.delete(lease_key)
+                    return (await pipeline.execute())[0]
+                except redis.WatchError:
+                    continue
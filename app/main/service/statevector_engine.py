@@ -0,0 +1,183 @@
+import logging
+import os
+
+import numpy as np
+from qiskit.circuit import Barrier, Gate, Measure
+from qiskit.quantum_info import Operator
+
+logger = logging.getLogger(__name__)
+
+STATEVECTOR_MAX_QUBITS = int(os.getenv("STATEVECTOR_MAX_QUBITS", 12))
+
+
+def samples_final_state(circuit):
+    """
+    Whether every shot of the circuit can be drawn from its final state.
+
+    That is the case for circuits of unitary gates and barriers whose
+    measurements are not followed by any gate on the measured qubit: no
+    resets, conditions, mid-circuit measurements or parameters.
+    """
+    if circuit.num_qubits == 0 or not circuit.cregs:
+        return False
+
+    measured = set()
+    for instruction in circuit.data:
+        operation = instruction.operation
+        if getattr(operation, "condition", None) is not None:
+            return False
+        if isinstance(operation, Barrier):
+            continue
+        if isinstance(operation, Measure):
+            measured.update(instruction.qubits)
+            continue
+        if not isinstance(operation, Gate) or operation.is_parameterized():
+            return False
+        if measured.intersection(instruction.qubits):
+            return False
+    return True
+
+
+class StatevectorEngine:
+    """
+    Lightweight NumPy statevector simulator for small circuits.
+
+    The state of n qubits is kept as a tensor of shape (2,) * n and every gate
+    is applied as one tensor contraction over the axes of its qubits. All shots
+    are sampled at once from the final probabilities, so the cost of a run is
+    independent of the number of shots.
+
+    Only circuits of at most max_qubits qubits made of unitary gates, barriers
+    and terminal measurements are supported; everything else (resets,
+    conditions, mid-circuit measurements) has to go to Aer.
+    """
+
+    def __init__(self, max_qubits=STATEVECTOR_MAX_QUBITS):
+        self.max_qubits = max_qubits
+
+    def supports(self, circuit):
+        """
+        Whether the circuit can be simulated by this engine.
+        """
+        return circuit.num_qubits <= self.max_qubits and samples_final_state(circuit)
+
+    def run(self, circuit, shots, seed=None):
+        """
+        Simulate the circuit and sample shots measurement outcomes.
+
+        Args:
+            circuit: QuantumCircuit accepted by supports()
+            shots: Number of shots to sample
+            seed: Optional seed for reproducible counts
+
+        Returns:
+            Counts keyed by bitstring in the layout of Qiskit's get_counts
+        """
+        return self.sample(circuit, self.probabilities(circuit), shots, seed)
+
+    def probabilities(self, circuit):
+        """
+        Probabilities of the basis states of the circuit's final state, qubit 0 as the least significant bit.
+        """
+        num_qubits = circuit.num_qubits
+        state = np.zeros((2,) * num_qubits, dtype=complex)
+        state[(0,) * num_qubits] = 1
+
+        qubit_indices = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+        matrices = {}
+        for instruction in circuit.data:
+            operation = instruction.operation
+            if isinstance(operation, (Barrier, Measure)):
+                continue
+            qubits = [qubit_indices[qubit] for qubit in instruction.qubits]
+            state = self._apply(state, self._matrix(operation, matrices), qubits)
+
+        probabilities = np.abs(state.reshape(-1)) ** 2
+        return probabilities / probabilities.sum()
+
+    @classmethod
+    def sample(cls, circuit, probabilities, shots, seed=None):
+        """
+        Draw the shots of a circuit from the probabilities of its final state in one multinomial draw.
+
+        The cost depends on the number of basis states, not on the number of shots.
+
+        Args:
+            circuit: QuantumCircuit for which samples_final_state holds
+            probabilities: Basis state probabilities in the order of probabilities()
+            shots: Number of shots to sample
+            seed: Optional seed for reproducible counts
+
+        Returns:
+            Counts keyed by bitstring in the layout of Qiskit's get_counts
+        """
+        qubit_indices = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+        clbit_indices = {clbit: index for index, clbit in enumerate(circuit.clbits)}
+        measurements = {}
+        for instruction in circuit.data:
+            if isinstance(instruction.operation, Measure):
+                measurements[clbit_indices[instruction.clbits[0]]] = qubit_indices[instruction.qubits[0]]
+
+        rng = np.random.default_rng(seed)
+        outcome_counts = rng.multinomial(shots, probabilities)
+        return cls._counts(circuit, outcome_counts, measurements)
+
+    @staticmethod
+    def _matrix(operation, matrices):
+        # Custom QASM gates share names across circuits, so matrices are only
+        # reused within one run
+        key = (operation.name, operation.num_qubits, tuple(float(param) for param in operation.params))
+        matrix = matrices.get(key)
+        if matrix is None:
+            try:
+                matrix = operation.to_matrix()
+            except Exception:
+                matrix = Operator(operation).data
+            matrices[key] = matrix
+        return matrix
+
+    @staticmethod
+    def _apply(state, matrix, qubits):
+        # The flat state index has qubit 0 as its least significant bit, and
+        # gate matrices list their first qubit as the least significant one
+        num_qubits = state.ndim
+        if len(qubits) == 1:
+            # Single-qubit gates mix the two halves of the state along one axis
+            qubit = qubits[0]
+            view = state.reshape(1 << (num_qubits - 1 - qubit), 2, 1 << qubit)
+            zero, one = view[:, 0, :], view[:, 1, :]
+            result = np.empty_like(view)
+            result[:, 0, :] = matrix[0, 0] * zero + matrix[0, 1] * one
+            result[:, 1, :] = matrix[1, 0] * zero + matrix[1, 1] * one
+            return result.reshape(state.shape)
+
+        arity = len(qubits)
+        axes = [num_qubits - 1 - qubit for qubit in reversed(qubits)]
+        gate = matrix.reshape((2,) * (2 * arity))
+        state = np.tensordot(gate, state, axes=(list(range(arity, 2 * arity)), axes))
+        return np.moveaxis(state, list(range(arity)), axes)
+
+    @staticmethod
+    def _counts(circuit, outcome_counts, measurements):
+        # Pack the measured clbits of every sampled basis state into one integer
+        outcomes = np.flatnonzero(outcome_counts)
+        values = np.zeros(len(outcomes), dtype=np.int64)
+        for clbit, qubit in measurements.items():
+            values |= ((outcomes >> qubit) & 1) << clbit
+        values, inverse = np.unique(values, return_inverse=True)
+        totals = np.bincount(inverse.reshape(-1), weights=outcome_counts[outcomes], minlength=len(values))
+
+        # Registers are listed last to first, each from its highest bit down
+        clbit_indices = {clbit: index for index, clbit in enumerate(circuit.clbits)}
+        register_values = []
+        for register in reversed(circuit.cregs):
+            register_value = np.zeros_like(values)
+            for position, clbit in enumerate(register):
+                register_value |= ((values >> clbit_indices[clbit]) & 1) << position
+            register_values.append((register_value.tolist(), f"0{register.size}b"))
+
+        counts = {}
+        for row, total in enumerate(totals.tolist()):
+            key = " ".join(format(register_value[row], width) for register_value, width in register_values)
+            counts[key] = int(total)
+        return counts
@@ -0,0 +1,137 @@
+import base64
+import json
+import logging
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from app.main.service.counts_encoding import PackedCounts
+
+logger = logging.getLogger(__name__)
+
+# Points per stored chunk; a page only decodes the chunks it overlaps
+SWEEP_RESULT_CHUNK_POINTS = int(os.getenv("SWEEP_RESULT_CHUNK_POINTS", 1000))
+
+# points, parameters, outcome entries
+CHUNK_HEADER = struct.Struct("<III")
+
+
+def sweep_chunk_key(task_id, chunk):
+    return f"task:{task_id}:sweep:{chunk}"
+
+
+def encode_chunk(values, counts):
+    """
+    Binary form of the points of one chunk.
+
+    The parameter values are a float64 (points x parameters) array, and the
+    counts of all points are concatenated into one outcome and one count
+    array with uint32 offsets, like a sparse matrix in CSR layout.
+    """
+    lengths = np.fromiter((len(point_counts) for point_counts in counts), dtype=np.uint32, count=len(counts))
+    offsets = np.concatenate([np.zeros(1, dtype=np.uint32), np.cumsum(lengths, dtype=np.uint32)])
+    outcomes = np.concatenate([point_counts.outcomes for point_counts in counts] or [np.zeros(0, dtype=np.uint64)])
+    totals = np.concatenate([point_counts.counts for point_counts in counts] or [np.zeros(0, dtype=np.int64)])
+    payload = b"".join((
+        CHUNK_HEADER.pack(values.shape[0], values.shape[1], len(outcomes)),
+        values.astype("<f8").tobytes(),
+        offsets.astype("<u4").tobytes(),
+        outcomes.astype("<u8").tobytes(),
+        totals.astype("<i8").tobytes()
+    ))
+    return zlib.compress(payload)
+
+
+def decode_chunk(data):
+    """
+    Inverse of encode_chunk: (values array, list of PackedCounts).
+    """
+    payload = zlib.decompress(data)
+    num_points, num_parameters, num_entries = CHUNK_HEADER.unpack_from(payload)
+    offset = CHUNK_HEADER.size
+    values = np.frombuffer(payload, dtype="<f8", count=num_points * num_parameters, offset=offset)
+    offset += values.nbytes
+    offsets = np.frombuffer(payload, dtype="<u4", count=num_points + 1, offset=offset)
+    offset += offsets.nbytes
+    outcomes = np.frombuffer(payload, dtype="<u8", count=num_entries, offset=offset)
+    offset += outcomes.nbytes
+    totals = np.frombuffer(payload, dtype="<i8", count=num_entries, offset=offset)
+    counts = [PackedCounts(outcomes[offsets[index]:offsets[index + 1]], totals[offsets[index]:offsets[index + 1]])
+              for index in range(num_points)]
+    return values.reshape(num_points, num_parameters), counts
+
+
+class SweepResults:
+    """
+    Results of a parameter sweep, stored as array-backed chunks of consecutive points.
+
+    Chunk i of a task holds points [i * chunk_points, (i + 1) * chunk_points)
+    under task:{task_id}:sweep:{i}, base64-encoded because the Redis clients
+    decode responses as text. The parameter names, the number of points and
+    the chunk size are kept in the task hash.
+    """
+
+    def __init__(self, redis_client, chunk_points=SWEEP_RESULT_CHUNK_POINTS):
+        # An asyncio Redis client
+        self.redis_client = redis_client
+        self.chunk_points = chunk_points
+
+    def add(self, task_id, names, values, counts, pipeline):
+        """
+        Write the chunks of a sweep's results.
+
+        Args:
+            task_id: Unique task identifier
+            names: Parameter names, in the column order of values
+            values: (points x parameters) array of parameter values
+            counts: PackedCounts of every point
+            pipeline: Pipeline to add the commands to; the caller executes it
+
+        Returns:
+            Fields describing the results, to be stored in the task hash
+        """
+        for chunk, start in enumerate(range(0, len(counts), self.chunk_points)):
+            stop = start + self.chunk_points
+            encoded = encode_chunk(values[start:stop], counts[start:stop])
+            pipeline.set(sweep_chunk_key(task_id, chunk), base64.b64encode(encoded).decode("ascii"))
+        return {
+            "sweep_points": len(counts),
+            "sweep_parameters": json.dumps(list(names)),
+            "sweep_chunk_points": self.chunk_points
+        }
+
+    async def page(self, task_id, task_data, offset=0, limit=100):
+        """
+        Return the points [offset, offset + limit) of a sweep.
+
+        Args:
+            task_id: Unique task identifier
+            task_data: Contents of the task hash, with the fields returned by add
+            offset: Index of the first point
+            limit: Maximum number of points
+
+        Returns:
+            list of (index, parameter values array, PackedCounts) tuples
+        """
+        num_points = int(task_data["sweep_points"])
+        chunk_points = int(task_data["sweep_chunk_points"])
+        stop = min(offset + limit, num_points)
+        if offset >= stop:
+            return []
+
+        chunks = range(offset // chunk_points, (stop - 1) // chunk_points + 1)
+        pipeline = self.redis_client.pipeline()
+        for chunk in chunks:
+            pipeline.get(sweep_chunk_key(task_id, chunk))
+
+        points = []
+        for chunk, encoded in zip(chunks, await pipeline.execute()):
+            if encoded is None:
+                raise KeyError(f"Sweep result chunk {chunk} of task {task_id} is missing")
+            values, counts = decode_chunk(base64.b64decode(encoded))
+            first = chunk * chunk_points
+            for index in range(max(offset, first), min(stop, first + len(counts))):
+                points.append((index, values[index - first], counts[index - first]))
+        return points
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import time
+
+from app.main.service.task_index import TaskIndex
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_TIMEOUT = int(os.getenv("TASK_EVENTS_TIMEOUT", 300))
+TASK_EVENTS_KEEPALIVE = int(os.getenv("TASK_EVENTS_KEEPALIVE", 15))
+
+CHANNEL_PREFIX = "task-events:"
+FINAL_STATUSES = {"completed", "error"}
+
+
+def task_channel(task_id):
+    return f"{CHANNEL_PREFIX}{task_id}"
+
+
+async def store_task_status(redis_client, task_id, mapping, pipeline=None, index=True):
+    """
+    Write fields of a task hash and notify subscribers of the task's events.
+
+    The notification carries the written fields, so subscribers do not have
+    to read the hash again. A new status is also reflected in the task index.
+
+    Args:
+        redis_client: Asyncio Redis client holding the task:{task_id} hashes
+        task_id: Unique task identifier
+        mapping: Fields to write, including the new status
+        pipeline: Optional pipeline to add the commands to; it is then up to
+            the caller to execute it
+        index: Set to False when the caller updates the task index itself,
+            e.g. once for a whole batch
+    """
+    commands = pipeline if pipeline is not None else redis_client.pipeline()
+    commands.hset(f"task:{task_id}", mapping=mapping)
+    commands.publish(task_channel(task_id), json.dumps(mapping))
+    if index and "status" in mapping:
+        await TaskIndex(redis_client).set_status({task_id: mapping["status"]}, commands)
+    if pipeline is None:
+        await commands.execute()
+
+
+async def task_events(redis_client, task_id, timeout=TASK_EVENTS_TIMEOUT, keepalive=TASK_EVENTS_KEEPALIVE,
+                      pubsub_client=None):
+    """
+    Yield the contents of a task hash now and after every status change, until the task is done.
+
+    The channel is subscribed before the hash is read, so a status written in
+    between is never missed. None is yielded after keepalive seconds without
+    a change, letting the caller keep the connection open.
+
+    Args:
+        redis_client: Asyncio Redis client holding the task:{task_id} hashes
+        task_id: Unique task identifier
+        timeout: Stop after this many seconds even if the task is not done
+        keepalive: Seconds of silence after which None is yielded
+        pubsub_client: Asyncio Redis client to subscribe with, redis_client if
+            omitted; a subscription holds its connection while it lasts
+    """
+    pubsub = (pubsub_client or redis_client).pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(task_channel(task_id))
+    try:
+        task_data = await redis_client.hgetall(f"task:{task_id}")
+        yield task_data
+        if not task_data:
+            return
+
+        deadline = time.monotonic() + timeout
+        while task_data.get("status") not in FINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.info(f"Stopped streaming events of task {task_id} after {timeout} seconds")
+                return
+
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=min(keepalive, remaining))
+            if message is None:
+                yield None
+                continue
+
+            task_data = {**task_data, **json.loads(message["data"])}
+            yield task_data
+    finally:
+        await pubsub.aclose()
@@ -0,0 +1,86 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+TASK_INDEX_KEY = "tasks:index"
+STATUS_INDEX_PREFIX = "tasks:index:"
+SEQUENCE_KEY = "tasks:sequence"
+TASK_STATUSES = ("pending", "completed", "error")
+
+
+def status_index_key(status):
+    return f"{STATUS_INDEX_PREFIX}{status}"
+
+
+class TaskIndex:
+    """
+    Sorted-set index of task ids in creation order.
+
+    Every task gets a sequence number from a Redis counter when it is
+    submitted. The number is its score in the index of all tasks and in the
+    index of its current status. Listing walks an index from the newest task
+    down, with the last returned score as an exclusive cursor, so a page costs
+    one range query plus one pipelined fetch of its task hashes.
+    """
+
+    def __init__(self, redis_client):
+        # An asyncio Redis client
+        self.redis_client = redis_client
+
+    async def add(self, task_ids, pipeline):
+        """
+        Index newly submitted tasks as pending.
+
+        Args:
+            task_ids: Ids of the new tasks, in submission order
+            pipeline: Pipeline that also writes the task hashes; the caller executes it
+        """
+        last = await self.redis_client.incrby(SEQUENCE_KEY, len(task_ids))
+        scores = {task_id: last - len(task_ids) + offset + 1 for offset, task_id in enumerate(task_ids)}
+        pipeline.zadd(TASK_INDEX_KEY, scores)
+        pipeline.zadd(status_index_key("pending"), scores)
+
+    async def set_status(self, statuses, pipeline):
+        """
+        Move tasks to the index of their new status.
+
+        Args:
+            statuses: Mapping of task id to its new status
+            pipeline: Pipeline to add the commands to; the caller executes it
+        """
+        task_ids = list(statuses)
+        if not task_ids:
+            return
+        scores = await self.redis_client.zmscore(TASK_INDEX_KEY, task_ids)
+        for task_id, score in zip(task_ids, scores):
+            if score is None:
+                # Submitted before the index existed
+                continue
+            for status in TASK_STATUSES:
+                if status != statuses[task_id]:
+                    pipeline.zrem(status_index_key(status), task_id)
+            pipeline.zadd(status_index_key(statuses[task_id]), {task_id: score})
+
+    async def page(self, status=None, cursor=None, limit=50):
+        """
+        Return a page of tasks, newest first.
+
+        Args:
+            status: Only list tasks with this status
+            cursor: next_cursor of the previous page, None for the first page
+            limit: Maximum number of tasks on the page
+
+        Returns:
+            (list of (task_id, task hash) tuples, cursor of the next page or None)
+        """
+        key = status_index_key(status) if status else TASK_INDEX_KEY
+        maximum = f"({cursor}" if cursor is not None else "+inf"
+        entries = await self.redis_client.zrevrangebyscore(key, maximum, "-inf", start=0, num=limit, withscores=True)
+
+        pipeline = self.redis_client.pipeline()
+        for task_id, _ in entries:
+            pipeline.hgetall(f"task:{task_id}")
+        tasks = list(zip((task_id for task_id, _ in entries), await pipeline.execute()))
+
+        next_cursor = int(entries[-1][1]) if len(entries) == limit else None
+        return tasks, next_cursor
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import logging
+import time
+
+import redis
+
+from app.main.exceptions.custom_exceptions import QASMParsingError, CircuitExecutionError, TaskProcessingError, \
+    TaskTimeoutError
+from app.main.service.circuit_sweep import sweep_points
+from app.main.service.counts_encoding import encode_counts
+from app.main.service.pipeline_metrics import get_default_pipeline_metrics, qubit_bucket
+from app.main.service.result_cache import compute_cache_key
+from app.main.service.shot_memory import ShotMemory
+from app.main.service.single_flight import SingleFlight
+from app.main.service.sweep_results import SweepResults
+from app.main.service.task_events import FINAL_STATUSES, store_task_status
+from app.main.service.task_index import TaskIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def record_start(redis_client, task_ids, enqueued_at):
+    """
+    Store when tasks left the queue and how long they waited there.
+
+    Args:
+        redis_client: Asyncio Redis client holding the task:{task_id} hashes
+        task_ids: Tasks that were reserved together
+        enqueued_at: Submission time of the tasks as a UNIX timestamp
+    """
+    started_at = time.time()
+    queue_wait = max(started_at - enqueued_at, 0.0)
+    mapping = {"started_at": started_at, "queue_wait_seconds": queue_wait}
+    pipeline = redis_client.pipeline()
+    for task_id in task_ids:
+        await store_task_status(redis_client, task_id, mapping, pipeline=pipeline)
+    await pipeline.execute()
+
+    metrics = get_default_pipeline_metrics()
+    for _ in task_ids:
+        metrics.observe("quantum_stage_seconds", queue_wait, stage="queue")
+
+
+async def process_quantum_circuit(redis_client, service, task_id: str, qasm_string: str, timeout: int = 30,
+                                  shots=None, seed=None, result_cache=None, use_cache=True, memory=False,
+                                  flight_key=None):
+    """
+    Process a quantum circuit and store the outcome in the task hash.
+
+    Args:
+        redis_client: Asyncio Redis client holding the task:{task_id} hashes
+        service: QuantumCircuitService used to execute the circuit
+        task_id: Unique task identifier
+        qasm_string: QASM representation of a quantum circuit
+        timeout: Maximum processing time in seconds
+        shots: Number of shots, defaults to the service setting
+        seed: Optional simulator seed
+        result_cache: Optional ResultCache; only seeded runs are cached
+            because unseeded counts are not reproducible
+        use_cache: Set to False to bypass the result cache for this task
+        memory: Also store the outcome of every shot (see shot_memory.py);
+            such tasks bypass the result cache, which only holds counts
+        flight_key: Set if identical submissions may have attached to this
+            task; its outcome is then copied to them (see single_flight.py)
+    """
+    metrics = get_default_pipeline_metrics()
+    try:
+        cache_key = None
+        if result_cache is not None and use_cache and seed is not None and not memory:
+            cache_key = compute_cache_key(
+                service.normalized_qasm(qasm_string),
+                shots or service.shots,
+                seed,
+                service.simulator_options()
+            )
+            cached_counts = await _cache_get(result_cache, cache_key)
+            if cached_counts is not None:
+                await store_task_status(
+                    redis_client,
+                    task_id,
+                    {
+                        "status": "completed",
+                        "result": encode_counts(cached_counts),
+                        "cached": "true"
+                    }
+                )
+                metrics.increment("quantum_tasks_total", outcome="cached")
+                logger.info(f"Task {task_id} served from the result cache")
+                return
+
+        result = await asyncio.wait_for(service.execute_qasm(qasm_string, shots, seed, memory), timeout=timeout)
+
+        if result.get("error", False):
+            await store_task_status(
+                redis_client,
+                task_id,
+                {
+                    "status": "error",
+                    "message": result.get("message", "Unknown error")
+                }
+            )
+            metrics.increment("quantum_tasks_total", outcome="error")
+        else:
+            _observe_result(metrics, result)
+            mapping = {
+                "status": "completed",
+                "result": encode_counts(result.get("counts", {}))
+            }
+            if result.get("method"):
+                mapping["method"] = result["method"]
+            if result.get("optimization"):
+                mapping["optimization"] = json.dumps(result["optimization"])
+            with metrics.time("store"):
+                pipeline = redis_client.pipeline()
+                if result.get("memory") is not None:
+                    # Written in the same transaction, so a completed task always has its memory
+                    mapping.update(
+                        ShotMemory(redis_client).add(task_id, result["memory"], result["memory_width"], pipeline)
+                    )
+                await store_task_status(redis_client, task_id, mapping, pipeline=pipeline)
+                await pipeline.execute()
+                if cache_key is not None:
+                    await _cache_put(result_cache, cache_key, result.get("counts", {}))
+            metrics.increment("quantum_tasks_total", outcome="completed")
+
+        logger.info(f"Task {task_id} completed successfully")
+    except asyncio.TimeoutError:
+        logger.error(f"Task {task_id} timed out after {timeout} seconds")
+        metrics.increment("quantum_tasks_total", outcome="timeout")
+        await store_task_status(
+            redis_client,
+            task_id,
+            {
+                "status": "error",
+                "message": f"Task timed out after {timeout} seconds"
+            }
+        )
+        raise TaskTimeoutError(task_id=task_id, timeout=timeout)
+    except QASMParsingError as e:
+        logger.error(f"QASM parsing error for task {task_id}: {str(e)}")
+        metrics.increment("quantum_tasks_total", outcome="error")
+        await store_task_status(
+            redis_client,
+            task_id,
+            {
+                "status": "error",
+                "message": f"QASM parsing error: {str(e)}"
+            }
+        )
+    except CircuitExecutionError as e:
+        logger.error(f"Circuit execution error for task {task_id}: {str(e)}")
+        metrics.increment("quantum_tasks_total", outcome="error")
+        await store_task_status(
+            redis_client,
+            task_id,
+            {
+                "status": "error",
+                "message": f"Circuit execution error: {str(e)}"
+            }
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error processing task {task_id}: {str(e)}")
+        metrics.increment("quantum_tasks_total", outcome="error")
+        await store_task_status(
+            redis_client,
+            task_id,
+            {
+                "status": "error",
+                "message": f"Unexpected error: {str(e)}"
+            }
+        )
+        raise TaskProcessingError(task_id=task_id, message=str(e))
+    finally:
+        if flight_key is not None:
+            await _complete_followers(redis_client, task_id, flight_key)
+
+
+async def _complete_followers(redis_client, task_id, flight_key):
+    """
+    Copy the outcome of a finished leader to the tasks that attached to it.
+    """
+    task_data = await redis_client.hgetall(f"task:{task_id}")
+    if task_data.get("status") not in FINAL_STATUSES:
+        # The outcome was not stored; the task is retried and keeps its followers
+        return
+
+    followers = await SingleFlight(redis_client).release(flight_key, task_id)
+    if not followers:
+        return
+
+    mapping = {field: task_data[field] for field in ("status", "result", "method", "optimization", "cached", "message")
+               if field in task_data}
+    mapping["coalesced_with"] = task_id
+    pipeline = redis_client.pipeline()
+    for follower in followers:
+        await store_task_status(redis_client, follower, mapping, pipeline=pipeline, index=False)
+    await TaskIndex(redis_client).set_status({follower: mapping["status"] for follower in followers}, pipeline)
+    await pipeline.execute()
+
+    get_default_pipeline_metrics().increment("quantum_tasks_total", len(followers), outcome="coalesced")
+    logger.info(f"Task {task_id} shared its outcome with {len(followers)} identical tasks")
+
+
+def _observe_result(metrics, result):
+    # Stage timings are measured where the circuit runs, so they also cover process pool workers
+    timings = result.get("timings", {})
+    metrics.observe_stages(timings)
+    if "simulate" in timings and result.get("num_qubits") is not None:
+        metrics.observe(
+            "quantum_simulation_seconds",
+            timings["simulate"],
+            qubits=qubit_bucket(result["num_qubits"]),
+            method=result.get("method", "unknown")
+        )
+
+
+async def _cache_get(result_cache, cache_key):
+    try:
+        return await result_cache.get(cache_key)
+    except redis.RedisError as e:
+        logger.warning(f"Result cache lookup failed, simulating instead: {str(e)}")
+        return None
+
+
+async def _cache_put(result_cache, cache_key, counts):
+    try:
+        await result_cache.put(cache_key, counts)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to store result in cache: {str(e)}")
+
+
+async def process_batch(redis_client, service, batch, timeout: int = 300):
+    """
+    Execute a QueuedBatch and store every task outcome in a single pipelined round-trip.
+
+    Args:
+        redis_client: Asyncio Redis client holding the task and batch hashes
+        service: QuantumCircuitService used to execute the circuits
+        batch: QueuedBatch with the task ids and circuits, in matching order
+        timeout: Maximum processing time of the whole batch in seconds
+    """
+    try:
+        results = await asyncio.wait_for(
+            service.execute_batch(batch.circuits, batch.shots, batch.seed),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Batch {batch.batch_id} timed out after {timeout} seconds")
+        results = [{"error": True, "message": f"Task timed out after {timeout} seconds"}] * len(batch.task_ids)
+    except Exception as e:
+        logger.error(f"Unexpected error processing batch {batch.batch_id}: {str(e)}")
+        results = [{"error": True, "message": f"Unexpected error: {str(e)}"}] * len(batch.task_ids)
+
+    metrics = get_default_pipeline_metrics()
+    with metrics.time("store"):
+        pipeline = redis_client.pipeline()
+        statuses = {}
+        for task_id, result in zip(batch.task_ids, results):
+            if result.get("error", False):
+                mapping = {"status": "error", "message": result.get("message", "Unknown error")}
+            else:
+                _observe_result(metrics, result)
+                mapping = {"status": "completed", "result": encode_counts(result.get("counts", {}))}
+                if result.get("method"):
+                    mapping["method"] = result["method"]
+                if result.get("optimization"):
+                    mapping["optimization"] = json.dumps(result["optimization"])
+            await store_task_status(redis_client, task_id, mapping, pipeline=pipeline, index=False)
+            statuses[task_id] = mapping["status"]
+        await TaskIndex(redis_client).set_status(statuses, pipeline)
+        pipeline.hset(f"batch:{batch.batch_id}", mapping={"status": "completed"})
+        await pipeline.execute()
+
+    failed = sum(1 for result in results if result.get("error", False))
+    metrics.increment("quantum_tasks_total", len(results) - failed, outcome="completed")
+    if failed:
+        metrics.increment("quantum_tasks_total", failed, outcome="error")
+    logger.info(f"Batch {batch.batch_id} completed with {len(results) - failed} successful and {failed} failed tasks")
+
+
+async def process_sweep(redis_client, service, sweep, timeout: int = 300):
+    """
+    Execute a QueuedSweep and store its results as array-backed chunks (see sweep_results.py).
+
+    Args:
+        redis_client: Asyncio Redis client holding the task:{sweep_id} hash
+        service: QuantumCircuitService used to execute the sweep
+        sweep: QueuedSweep with the template and parameter values
+        timeout: Maximum processing time of the whole sweep in seconds
+    """
+    names = list(sweep.parameters)
+    try:
+        values = sweep_points(sweep.parameters, sweep.mode)
+        result = await asyncio.wait_for(
+            service.execute_sweep(sweep.qc, names, values, sweep.shots, sweep.seed),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Sweep {sweep.sweep_id} timed out after {timeout} seconds")
+        result = {"error": True, "message": f"Task timed out after {timeout} seconds"}
+    except Exception as e:
+        logger.error(f"Unexpected error processing sweep {sweep.sweep_id}: {str(e)}")
+        result = {"error": True, "message": f"Unexpected error: {str(e)}"}
+
+    metrics = get_default_pipeline_metrics()
+    if result.get("error", False):
+        await store_task_status(redis_client, sweep.sweep_id,
+                                {"status": "error", "message": result.get("message", "Unknown error")})
+        metrics.increment("quantum_tasks_total", outcome="error")
+        return
+
+    with metrics.time("store"):
+        pipeline = redis_client.pipeline()
+        mapping = {"status": "completed", "method": result["method"]}
+        mapping.update(SweepResults(redis_client).add(sweep.sweep_id, names, values, result["counts"], pipeline))
+        await store_task_status(redis_client, sweep.sweep_id, mapping, pipeline=pipeline)
+        await pipeline.execute()
+    metrics.increment("quantum_tasks_total", outcome="completed")
+    logger.info(f"Sweep {sweep.sweep_id} completed with {len(values)} points")
@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+
+import redis
+
+from app.main.models.QueuedBatch import QueuedBatch
+from app.main.models.QueuedSweep import QueuedSweep
+from app.main.models.QueuedTask import QueuedTask
+from app.main.service.task_scheduler import schedule_score
+
+logger = logging.getLogger(__name__)
+
+TASK_QUEUE_KEY = "tasks:scheduled"
+# Receives a token per submission so idle workers wake up immediately
+READY_KEY = "tasks:ready"
+PROCESSING_KEY_PREFIX = "tasks:processing:"
+WORKERS_KEY = "tasks:workers"
+HEARTBEAT_KEY_PREFIX = "tasks:heartbeat:"
+
+
+class TaskQueue:
+    """
+    Reliable priority work queue on top of a Redis sorted set.
+
+    Submitted tasks are added to a shared sorted set, scored by
+    schedule_score() from their priority class, estimated cost and submission
+    time. A worker reserves the lowest-scored task by moving it into its own
+    processing list in one transaction, and acknowledges it by removing it
+    from there once the result has been written. Tasks left in the processing
+    list of a worker whose heartbeat expired are put back into the queue with
+    their original score, so a crashed or restarted worker never loses
+    in-flight work.
+    """
+
+    def __init__(self, redis_client, heartbeat_ttl=90):
+        self.redis_client = redis_client
+        self.heartbeat_ttl = heartbeat_ttl
+
+    def enqueue(self, task, pipeline=None):
+        """
+        Add a task to the queue.
+
+        Args:
+            task: QueuedTask, QueuedBatch or QueuedSweep to schedule, with its
+                priority and estimated cost set; enqueued_at is filled in if missing
+            pipeline: Optional Redis pipeline to add the commands to, so the
+                caller can submit them together with the task status write
+        """
+        if not task.enqueued_at:
+            task.enqueued_at = time.time()
+        client = pipeline if pipeline is not None else self.redis_client.pipeline()
+        client.zadd(TASK_QUEUE_KEY, {task.model_dump_json(): schedule_score(task.priority, task.cost, task.enqueued_at)})
+        client.lpush(READY_KEY, 1)
+        client.ltrim(READY_KEY, 0, 0)
+        if pipeline is None:
+            client.execute()
+
+    def reserve(self, worker_id, timeout=5):
+        """
+        Block until a task is available and move the next one to the worker's processing list.
+
+        Returns:
+            Tuple of (raw payload, QueuedTask, QueuedBatch or QueuedSweep), or
+            None if the timeout expired
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            raw = self._take_next(worker_id)
+            if raw is not None:
+                return raw, self._parse(raw)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.redis_client.blpop(READY_KEY, timeout=remaining)
+
+    def _take_next(self, worker_id):
+        with self.redis_client.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(TASK_QUEUE_KEY)
+                    entries = pipeline.zrange(TASK_QUEUE_KEY, 0, 0)
+                    if not entries:
+                        return None
+                    raw = entries[0]
+                    pipeline.multi()
+                    pipeline.zrem(TASK_QUEUE_KEY, raw)
+                    pipeline.lpush(f"{PROCESSING_KEY_PREFIX}{worker_id}", raw)
+                    pipeline.execute()
+                    return raw
+                except redis.WatchError:
+                    # Another worker changed the queue first
+                    continue
+
+    @classmethod
+    def _score(cls, raw):
+        task = cls._parse(raw)
+        return schedule_score(task.priority, task.cost, task.enqueued_at)
+
+    @staticmethod
+    def _parse(raw):
+        payload = json.loads(raw)
+        if "batch_id" in payload:
+            return QueuedBatch.model_validate(payload)
+        if "sweep_id" in payload:
+            return QueuedSweep.model_validate(payload)
+        return QueuedTask.model_validate(payload)
+
+    def ack(self, worker_id, raw):
+        """
+        Acknowledge a reserved task once its result has been stored.
+        """
+        self.redis_client.lrem(f"{PROCESSING_KEY_PREFIX}{worker_id}", 1, raw)
+
+    def release(self, worker_id, raw):
+        """
+        Return a reserved task to the queue, at its original position, without acknowledging it.
+        """
+        pipeline = self.redis_client.pipeline()
+        pipeline.lrem(f"{PROCESSING_KEY_PREFIX}{worker_id}", 1, raw)
+        pipeline.zadd(TASK_QUEUE_KEY, {raw: self._score(raw)})
+        pipeline.execute()
+
+    def register(self, worker_id):
+        """
+        Register a worker and start its heartbeat.
+
+        Tasks left in the processing list by a previous run under the same
+        worker id are returned to the queue first.
+        """
+        self._requeue(worker_id)
+        self.heartbeat(worker_id)
+
+    def heartbeat(self, worker_id):
+        """
+        Refresh the worker heartbeat so its reserved tasks are not reclaimed.
+
+        The worker is registered again as well, in case another worker
+        wrongly took it for dead and removed it from the registry.
+        """
+        pipeline = self.redis_client.pipeline()
+        pipeline.set(f"{HEARTBEAT_KEY_PREFIX}{worker_id}", 1, ex=self.heartbeat_ttl)
+        pipeline.sadd(WORKERS_KEY, worker_id)
+        pipeline.execute()
+
+    def unregister(self, worker_id):
+        """
+        Return any reserved tasks to the queue and remove the worker.
+        """
+        self._requeue(worker_id)
+        self.redis_client.delete(f"{HEARTBEAT_KEY_PREFIX}{worker_id}")
+        self.redis_client.srem(WORKERS_KEY, worker_id)
+
+    def requeue_orphaned(self):
+        """
+        Push tasks reserved by dead workers back onto the queue.
+
+        Returns:
+            Number of tasks returned to the queue
+        """
+        requeued = 0
+        for worker_id in self.redis_client.smembers(WORKERS_KEY):
+            if self.redis_client.exists(f"{HEARTBEAT_KEY_PREFIX}{worker_id}"):
+                continue
+            requeued += self._requeue(worker_id)
+            self.redis_client.srem(WORKERS_KEY, worker_id)
+        return requeued
+
+    def _requeue(self, worker_id):
+        processing_key = f"{PROCESSING_KEY_PREFIX}{worker_id}"
+        raws = self.redis_client.lrange(processing_key, 0, -1)
+        requeued = len(raws)
+        if requeued:
+            pipeline = self.redis_client.pipeline()
+            pipeline.zadd(TASK_QUEUE_KEY, {raw: self._score(raw) for raw in raws})
+            pipeline.lpush(READY_KEY, 1)
+            pipeline.ltrim(READY_KEY, 0, 0)
+            pipeline.delete(processing_key)
+            pipeline.execute()
+            logger.warning(f"Requeued {requeued} in-flight tasks from worker {worker_id}")
+        return requeued
+
+    def depth(self):
+        """
+        Number of tasks waiting to be reserved.
+        """
+        return self.redis_client.zcard(TASK_QUEUE_KEY)
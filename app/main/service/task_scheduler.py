@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+
+from app.main.service.circuit_analyzer import CIRCUIT_ANALYZER_STATEVECTOR_MAX_QUBITS
+from app.main.service.qasm_translator import translate_qasm
+from app.main.service.resource_estimator import estimate_resources
+
+logger = logging.getLogger(__name__)
+
+# Shots of tasks that do not set them, the worker default
+DEFAULT_SHOTS = int(os.getenv("TASK_SHOTS", 1024))
+# Seconds a task yields its queue position per second of estimated cost, and the cap on that delay
+SCHEDULER_COST_WEIGHT = float(os.getenv("SCHEDULER_COST_WEIGHT", 5))
+SCHEDULER_MAX_DELAY = float(os.getenv("SCHEDULER_MAX_DELAY", 600))
+# Seconds of queue position that separate neighbouring priority classes; larger
+# than the cost delay, so a class only yields to a lower one after waiting this long
+SCHEDULER_PRIORITY_STEP = float(os.getenv("SCHEDULER_PRIORITY_STEP", 3600))
+
+PRIORITY_CLASSES = {"high": -1, "normal": 0, "low": 1}
+
+_QREG = re.compile(r'^qreg\s+([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]$')
+_OPERAND = re.compile(r'([A-Za-z_]\w*)\s*(?:\[\s*(\d+)\s*\])?')
+_NON_GATE_STATEMENTS = ("OPENQASM", "include", "creg", "measure", "barrier", "reset", "opaque")
+
+
+class CircuitCost:
+    """
+    Size of a circuit as far as it can be told from its source, and the estimated simulation time.
+    """
+
+    def __init__(self, num_qubits, num_gates, depth, shots, seconds):
+        self.num_qubits = num_qubits
+        self.num_gates = num_gates
+        self.depth = depth
+        self.shots = shots
+        self.seconds = seconds
+
+
+def estimate_cost(qasm_string, shots=None, translated=None):
+    """
+    Estimate how long a circuit takes to simulate, without building it.
+
+    The translated program is scanned once for register sizes and gate
+    applications; the depth is tracked per qubit. The runtime is predicted for
+    the statevector method, or for matrix-product state on circuits too wide
+    for it (see resource_estimator.py). Unparsable programs get cost 0 and
+    fail fast on the worker.
+
+    Args:
+        qasm_string: QASM representation of a quantum circuit
+        shots: Number of shots the circuit is sampled with, the worker default if omitted
+        translated: The program as returned by translate_qasm or normalize_qasm,
+            if the caller already has it
+
+    Returns:
+        CircuitCost of the circuit
+    """
+    shots = shots or DEFAULT_SHOTS
+    if translated is None:
+        try:
+            translated = translate_qasm(qasm_string)
+        except Exception as e:
+            logger.warning(f"Could not estimate the cost of a circuit: {str(e)}")
+            return CircuitCost(0, 0, 0, shots, 0.0)
+    statements = translated.splitlines()
+
+    registers = {}
+    levels = {}
+    num_gates = 0
+    depth = 0
+    in_definition = 0
+
+    for statement in statements:
+        if statement.endswith("{"):
+            in_definition += 1
+            continue
+        if statement == "}":
+            in_definition -= 1
+            continue
+        if in_definition or statement.startswith(_NON_GATE_STATEMENTS):
+            continue
+
+        statement = statement.rstrip(";")
+        register = _QREG.match(statement)
+        if register is not None:
+            registers[register.group(1)] = int(register.group(2))
+            continue
+
+        # Drop the gate name and parameters, what remains are the operands
+        operands = statement.rpartition(")")[2] if "(" in statement else statement.partition(" ")[2]
+        qubits = [(name, index) for name, index in _OPERAND.findall(operands) if name in registers]
+        if not qubits:
+            continue
+
+        # A whole-register operand applies the gate once per qubit of the register
+        width = max((registers[name] for name, index in qubits if index == ""), default=1)
+        for offset in range(width):
+            targets = [(name, int(index) if index != "" else offset) for name, index in qubits]
+            layer = max(levels.get(target, 0) for target in targets) + 1
+            for target in targets:
+                levels[target] = layer
+            depth = max(depth, layer)
+            num_gates += 1
+
+    num_qubits = sum(registers.values())
+    method = "statevector" if num_qubits <= CIRCUIT_ANALYZER_STATEVECTOR_MAX_QUBITS else "matrix_product_state"
+    seconds = estimate_resources(method, num_qubits, num_gates, depth, shots).seconds
+    return CircuitCost(num_qubits, num_gates, depth, shots, seconds)
+
+
+def schedule_score(priority, cost, enqueued_at):
+    """
+    Position of a task in the queue; the lowest score runs first.
+
+    A task is placed as if it had been submitted later by an amount that grows
+    with its estimated cost, up to SCHEDULER_MAX_DELAY, so cheap tasks overtake
+    expensive ones submitted around the same time (shortest job first), while
+    an expensive task still runs before anything submitted more than that
+    delay after it (aging). Priority classes shift tasks by
+    SCHEDULER_PRIORITY_STEP.
+
+    Args:
+        priority: One of PRIORITY_CLASSES
+        cost: Estimated simulation time in seconds
+        enqueued_at: Submission time as a UNIX timestamp
+    """
+    delay = min(SCHEDULER_COST_WEIGHT * cost, SCHEDULER_MAX_DELAY)
+    return enqueued_at + delay + PRIORITY_CLASSES[priority] * SCHEDULER_PRIORITY_STEP
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import threading
+
+import redis
+
+from app.main.exceptions.custom_exceptions import TaskProcessingError, TaskTimeoutError
+from app.main.redis_connection import create_async_redis_client, create_redis_client
+from app.main.service.admission_control import configure_admission_controller
+from app.main.service.pipeline_metrics import get_default_pipeline_metrics
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.service.result_cache import RESULT_CACHE_ENABLED, ResultCache
+from app.main.service.simulation_executor import get_default_executor
+from app.main.service.simulator_pool import get_default_simulator_pool
+from app.main.models.QueuedBatch import QueuedBatch
+from app.main.models.QueuedSweep import QueuedSweep
+from app.main.service.task_processor import process_batch, process_quantum_circuit, process_sweep, record_start
+from app.main.service.task_queue import TaskQueue
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 1))
+TASK_TIMEOUT = int(os.getenv("TASK_TIMEOUT", 30))
+TASK_SHOTS = int(os.getenv("TASK_SHOTS", 1024))
+BATCH_TIMEOUT = int(os.getenv("BATCH_TIMEOUT", 300))
+RESERVE_TIMEOUT = int(os.getenv("WORKER_RESERVE_TIMEOUT", 5))
+# A live worker must never look dead while it blocks on the queue or runs a task
+HEARTBEAT_TTL = int(os.getenv("WORKER_HEARTBEAT_TTL", 3 * (RESERVE_TIMEOUT + max(TASK_TIMEOUT, BATCH_TIMEOUT))))
+REDIS_ERROR_BACKOFF = float(os.getenv("WORKER_REDIS_ERROR_BACKOFF", 2))
+
+
+class HeartbeatThread(threading.Thread):
+    """
+    Refreshes the worker heartbeat independently of the task loop, which
+    blocks while waiting on the queue and while a simulation runs.
+    """
+
+    def __init__(self, task_queue, worker_id, interval):
+        super().__init__(name=f"heartbeat-{worker_id}", daemon=True)
+        self.task_queue = task_queue
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.task_queue.heartbeat(self.worker_id)
+            except redis.RedisError as e:
+                logger.error(f"Failed to refresh heartbeat of worker {self.worker_id}: {str(e)}")
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+async def run_worker(worker_id, redis_client=None, stop_event=None, max_tasks=None, async_redis_client=None):
+    """
+    Pull tasks from the Redis queue and execute them until stopped.
+
+    Queue operations, which block on the queue anyway, use a synchronous
+    client; results are written through an asyncio client.
+
+    Args:
+        worker_id: Unique identifier of this worker, used for its processing list
+        redis_client: Redis client for the queue, a new one is created if omitted
+        stop_event: Optional event that ends the loop once set
+        max_tasks: Optional number of tasks after which the loop ends
+        async_redis_client: Asyncio Redis client for task results and the
+            result cache, a new one is created if omitted
+    """
+    redis_client = redis_client or create_redis_client()
+    async_redis_client = async_redis_client or create_async_redis_client()
+    task_queue = TaskQueue(redis_client, heartbeat_ttl=HEARTBEAT_TTL)
+    service = QuantumCircuitService(shots=TASK_SHOTS)
+    if get_default_executor().kind == "thread":
+        # Process pools warm up their own simulators when they start
+        get_default_simulator_pool().warm_up()
+    result_cache = ResultCache(async_redis_client) if RESULT_CACHE_ENABLED else None
+    metrics = get_default_pipeline_metrics()
+
+    task_queue.register(worker_id)
+    heartbeat = HeartbeatThread(task_queue, worker_id, interval=max(HEARTBEAT_TTL / 3, 1))
+    heartbeat.start()
+    logger.info(f"Worker {worker_id} started")
+
+    processed = 0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if max_tasks is not None and processed >= max_tasks:
+                break
+            # Also runs when the reserve times out, so an idle worker publishes what it collected
+            await _flush_metrics(metrics, async_redis_client)
+
+            try:
+                reserved = task_queue.reserve(worker_id, timeout=RESERVE_TIMEOUT)
+                if reserved is None:
+                    task_queue.requeue_orphaned()
+                    continue
+            except redis.RedisError as e:
+                logger.error(f"Worker {worker_id} failed to reserve a task: {str(e)}")
+                await asyncio.sleep(REDIS_ERROR_BACKOFF)
+                continue
+
+            raw, task = reserved
+            if isinstance(task, QueuedBatch):
+                task_ids = task.task_ids
+            elif isinstance(task, QueuedSweep):
+                task_ids = [task.sweep_id]
+            else:
+                task_ids = [task.task_id]
+            try:
+                await record_start(async_redis_client, task_ids, task.enqueued_at)
+            except redis.RedisError as e:
+                logger.warning(f"Worker {worker_id} could not record the queue wait of {', '.join(task_ids)}: {str(e)}")
+
+            if isinstance(task, QueuedBatch):
+                logger.info(f"Worker {worker_id} processing batch {task.batch_id} of {len(task.circuits)} circuits")
+                try:
+                    await process_batch(async_redis_client, service, task, timeout=BATCH_TIMEOUT)
+                except redis.RedisError as e:
+                    logger.error(f"Worker {worker_id} could not store the results of batch {task.batch_id}: {str(e)}")
+                    await asyncio.sleep(REDIS_ERROR_BACKOFF)
+                    _release(task_queue, worker_id, raw)
+                    continue
+                _ack(task_queue, worker_id, raw)
+                processed += 1
+                continue
+
+            if isinstance(task, QueuedSweep):
+                logger.info(f"Worker {worker_id} processing sweep {task.sweep_id}")
+                try:
+                    await process_sweep(async_redis_client, service, task, timeout=BATCH_TIMEOUT)
+                except redis.RedisError as e:
+                    logger.error(f"Worker {worker_id} could not store the results of sweep {task.sweep_id}: {str(e)}")
+                    await asyncio.sleep(REDIS_ERROR_BACKOFF)
+                    _release(task_queue, worker_id, raw)
+                    continue
+                _ack(task_queue, worker_id, raw)
+                processed += 1
+                continue
+
+            logger.info(f"Worker {worker_id} processing task {task.task_id}")
+            try:
+                await process_quantum_circuit(
+                    async_redis_client, service, task.task_id, task.qc, timeout=TASK_TIMEOUT,
+                    shots=task.shots, seed=task.seed, result_cache=result_cache, use_cache=task.use_cache,
+                    memory=task.memory, flight_key=task.flight_key
+                )
+            except (TaskTimeoutError, TaskProcessingError) as e:
+                logger.error(f"Worker {worker_id} failed task {task.task_id}: {str(e)}")
+            except redis.RedisError as e:
+                logger.error(f"Worker {worker_id} could not store the result of task {task.task_id}: {str(e)}")
+                await asyncio.sleep(REDIS_ERROR_BACKOFF)
+                _release(task_queue, worker_id, raw)
+                continue
+
+            _ack(task_queue, worker_id, raw)
+            processed += 1
+    finally:
+        heartbeat.stop()
+        await _flush_metrics(metrics, async_redis_client, force=True)
+        try:
+            task_queue.unregister(worker_id)
+        except redis.RedisError as e:
+            logger.error(f"Worker {worker_id} failed to unregister: {str(e)}")
+        logger.info(f"Worker {worker_id} stopped after {processed} tasks")
+
+
+async def _flush_metrics(metrics, async_redis_client, force=False):
+    try:
+        await metrics.flush(async_redis_client, force=force)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to flush pipeline metrics: {str(e)}")
+
+
+def _ack(task_queue, worker_id, raw):
+    try:
+        task_queue.ack(worker_id, raw)
+    except redis.RedisError as e:
+        logger.error(f"Worker {worker_id} failed to acknowledge a task: {str(e)}")
+
+
+def _release(task_queue, worker_id, raw):
+    try:
+        task_queue.release(worker_id, raw)
+    except redis.RedisError as e:
+        # Left in the processing list, it is requeued when this worker stops or dies
+        logger.error(f"Worker {worker_id} failed to return a task to the queue: {str(e)}")
+
+
+def _worker_process(worker_id, commitments, slot):
+    # Simulations of all worker processes share one memory budget
+    configure_admission_controller(commitments, slot)
+    stop_event = multiprocessing.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    asyncio.run(run_worker(worker_id, stop_event=stop_event))
+
+
+def _start_process(worker_id, commitments, slot):
+    process = multiprocessing.Process(target=_worker_process, args=(worker_id, commitments, slot), daemon=False)
+    process.start()
+    return process
+
+
+def main():
+    """
+    Start WORKER_PROCESSES worker processes and keep them running.
+
+    A worker process that exits while the pool is not shutting down is
+    started again under the same worker id, which also returns the tasks it
+    had reserved to the queue. The memory it had committed to running
+    simulations is returned to the shared budget as well.
+    """
+    hostname = socket.gethostname()
+    worker_ids = [f"{hostname}-{index}" for index in range(WORKER_PROCESSES)]
+    shutting_down = threading.Event()
+    processes = {}
+    # Memory committed by the simulations of each worker process, see admission_control.py
+    commitments = multiprocessing.Array("q", WORKER_PROCESSES)
+
+    def shutdown(signum, frame):
+        shutting_down.set()
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for slot, worker_id in enumerate(worker_ids):
+        processes[worker_id] = _start_process(worker_id, commitments, slot)
+    logger.info(f"Started {WORKER_PROCESSES} worker processes")
+
+    while not shutting_down.is_set():
+        multiprocessing.connection.wait([process.sentinel for process in processes.values()], timeout=1)
+        if shutting_down.is_set():
+            break
+        for worker_id, process in list(processes.items()):
+            if not process.is_alive():
+                logger.error(f"Worker process {worker_id} exited with code {process.exitcode}, restarting")
+                process.join()
+                # Avoid a tight restart loop while e.g. Redis is unreachable
+                shutting_down.wait(REDIS_ERROR_BACKOFF)
+                if shutting_down.is_set():
+                    break
+                processes[worker_id] = _start_process(worker_id, commitments, worker_ids.index(worker_id))
+
+    for process in processes.values():
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
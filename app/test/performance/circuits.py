@@ -0,0 +1,65 @@
+import math
+import random
+
+HEADER = 'OPENQASM 2.0;\ninclude "qelib1.inc";'
+
+
+def ghz_qasm(num_qubits):
+    lines = [HEADER, f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];", "h q[0];"]
+    lines += [f"cx q[{qubit}], q[{qubit + 1}];" for qubit in range(num_qubits - 1)]
+    lines.append("measure q -> c;")
+    return "\n".join(lines)
+
+
+def qft_qasm(num_qubits, seed=1234):
+    """
+    Quantum Fourier transform of a random basis state.
+    """
+    rng = random.Random(seed)
+    lines = [HEADER, f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];"]
+    lines += [f"x q[{qubit}];" for qubit in range(num_qubits) if rng.random() < 0.5]
+    for target in reversed(range(num_qubits)):
+        lines.append(f"h q[{target}];")
+        for control in reversed(range(target)):
+            lines.append(f"cu1({math.pi / 2 ** (target - control):.12f}) q[{control}], q[{target}];")
+    lines += [f"swap q[{qubit}], q[{num_qubits - 1 - qubit}];" for qubit in range(num_qubits // 2)]
+    lines.append("measure q -> c;")
+    return "\n".join(lines)
+
+
+def random_layered_qasm(num_qubits, seed=1234, depth=20):
+    """
+    Layers of random single-qubit rotations followed by cx gates on a random pairing of the qubits.
+    """
+    rng = random.Random(seed)
+    lines = [HEADER, f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];"]
+    for _ in range(depth):
+        for qubit in range(num_qubits):
+            lines.append(f"u3({rng.uniform(0, math.pi):.6f}, {rng.uniform(0, math.pi):.6f}, "
+                         f"{rng.uniform(0, math.pi):.6f}) q[{qubit}];")
+        order = rng.sample(range(num_qubits), num_qubits)
+        lines += [f"cx q[{control}], q[{target}];" for control, target in zip(order[::2], order[1::2])]
+    lines.append("measure q -> c;")
+    return "\n".join(lines)
+
+
+def clifford_qasm(num_qubits, seed=1234, depth=20):
+    """
+    Random h, s and cx layers, which the stabilizer method can simulate at any width.
+    """
+    rng = random.Random(seed)
+    lines = [HEADER, f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];"]
+    for _ in range(depth):
+        lines += [f"{rng.choice(('h', 's', 'sdg', 'x'))} q[{qubit}];" for qubit in range(num_qubits)]
+        order = rng.sample(range(num_qubits), num_qubits)
+        lines += [f"cx q[{control}], q[{target}];" for control, target in zip(order[::2], order[1::2])]
+    lines.append("measure q -> c;")
+    return "\n".join(lines)
+
+
+CIRCUITS = {
+    "ghz": ghz_qasm,
+    "qft": qft_qasm,
+    "random_layered": random_layered_qasm,
+    "clifford": clifford_qasm,
+}
@@ -0,0 +1,248 @@
+"""
+Open-loop load generator for the task API and worker path.
+
+Runs the FastAPI app in-process against an in-memory Redis (fakeredis) with
+worker threads draining the queue, submits circuits at a target arrival
+rate regardless of how fast earlier ones complete, and reports throughput
+and latency percentiles:
+
+    python -m app.test.performance.load_generator --rate 20 --duration 30 --mix ghz:5=4,qft:8=1
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import numpy as np
+
+from app.main import redis_connection
+from app.main.worker import run_worker
+from app.test.performance.circuits import CIRCUITS
+
+DEFAULT_MIX = "ghz:5=4,qft:8=2,random_layered:10=1,clifford:16=1"
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(spec):
+    """
+    Parse a circuit mix such as "ghz:5=4,qft:8=1" into a list of (name, qubits, weight).
+
+    Raises:
+        ValueError: If a circuit is unknown or an entry is malformed
+    """
+    mix = []
+    for entry in spec.split(","):
+        circuit, _, weight = entry.strip().partition("=")
+        name, _, qubits = circuit.partition(":")
+        if name not in CIRCUITS:
+            raise ValueError(f"Unknown circuit '{name}', expected one of {', '.join(CIRCUITS)}")
+        mix.append((name, int(qubits or 5), float(weight or 1)))
+    return mix
+
+
+def summarize(samples):
+    """
+    Count, mean, maximum and percentiles of latencies in seconds.
+    """
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples)
+    summary = {"count": len(samples), "mean": float(values.mean()), "max": float(values.max())}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{percentile}"] = float(value)
+    return summary
+
+
+@contextmanager
+def in_process_app():
+    """
+    Import the API against a fresh in-memory Redis server.
+
+    Yields:
+        (FastAPI app, fakeredis.FakeServer shared by the API and the workers)
+    """
+    server = fakeredis.FakeServer()
+    originals = redis_connection.create_redis_client, redis_connection.create_async_redis_client
+    redis_connection.create_redis_client = lambda: fakeredis.FakeRedis(server=server, decode_responses=True)
+    redis_connection.create_async_redis_client = \
+        lambda **kwargs: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    try:
+        sys.modules.pop("app.main.app", None)
+        yield importlib.import_module("app.main.app").app, server
+    finally:
+        redis_connection.create_redis_client, redis_connection.create_async_redis_client = originals
+        sys.modules.pop("app.main.app", None)
+
+
+@contextmanager
+def worker_threads(server, count):
+    """
+    Run count workers against server, each in a thread with its own event loop.
+    """
+    stop_event = threading.Event()
+
+    def work(worker_id):
+        asyncio.run(run_worker(
+            worker_id,
+            redis_client=fakeredis.FakeRedis(server=server, decode_responses=True),
+            stop_event=stop_event,
+            async_redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        ))
+
+    threads = [threading.Thread(target=work, args=(f"load-{index}",), daemon=True) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop_event.set()
+        # Workers notice the stop event once their reserve times out
+        for thread in threads:
+            thread.join()
+
+
+async def generate_load(client, rate, duration, mix, shots=1024, arrival="poisson", poll_interval=0.01,
+                        drain_timeout=60, seed=1234):
+    """
+    Submit tasks at a target rate for duration seconds and follow each one until it has a result.
+
+    Arrivals are scheduled ahead of time, so slow responses do not lower
+    the offered load. Every arrival submits one circuit drawn from mix,
+    then polls GET /api/tasks/{task_id} until the task leaves pending.
+
+    Args:
+        client: httpx.AsyncClient for the API
+        rate: Target arrivals per second
+        duration: Seconds during which tasks are submitted
+        mix: Output of parse_mix
+        shots: Shots of every task
+        arrival: "poisson" for exponential gaps between arrivals, "constant" for even spacing
+        poll_interval: Seconds between two polls of a task
+        drain_timeout: Seconds to wait for outstanding tasks once submission ends
+        seed: Seed of the arrival times and circuit choices
+
+    Returns:
+        Report with throughput, outcome counts and latency summaries
+    """
+    rng = random.Random(seed)
+    programs = [CIRCUITS[name](qubits) for name, qubits, _ in mix]
+    weights = [weight for _, _, weight in mix]
+    latencies = {"submit": [], "get_task": [], "time_to_result": []}
+    outcomes = {"completed": 0, "error": 0, "rejected": 0, "unfinished": 0}
+    finished_at = []
+
+    async def follow(qasm):
+        started = time.perf_counter()
+        response = await client.post("/api/tasks", json={"qc": qasm, "shots": shots})
+        latencies["submit"].append(time.perf_counter() - started)
+        if response.status_code != 202:
+            outcomes["rejected"] += 1
+            return
+        task_id = response.json()["task_id"]
+
+        while True:
+            polled = time.perf_counter()
+            status = (await client.get(f"/api/tasks/{task_id}")).json().get("status")
+            latencies["get_task"].append(time.perf_counter() - polled)
+            if status != "pending":
+                latencies["time_to_result"].append(time.perf_counter() - started)
+                finished_at.append(time.perf_counter())
+                outcomes["completed" if status == "completed" else "error"] += 1
+                return
+            await asyncio.sleep(poll_interval)
+
+    if arrival == "poisson":
+        offsets = []
+        offset = rng.expovariate(rate)
+        while offset < duration:
+            offsets.append(offset)
+            offset += rng.expovariate(rate)
+    else:
+        offsets = [index / rate for index in range(round(rate * duration))]
+
+    start = time.perf_counter()
+    tasks = []
+    for offset in offsets:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        qasm = rng.choices(programs, weights)[0]
+        tasks.append(asyncio.create_task(follow(qasm)))
+
+    _, pending = await asyncio.wait(tasks, timeout=drain_timeout) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+    outcomes["unfinished"] = len(pending)
+
+    elapsed = (max(finished_at) if finished_at else time.perf_counter()) - start
+    return {
+        "target_rate": rate,
+        "offered_rate": len(offsets) / duration,
+        "duration": duration,
+        "submitted": len(offsets),
+        **outcomes,
+        "throughput": outcomes["completed"] / elapsed if elapsed > 0 else 0.0,
+        "latency": {name: summarize(samples) for name, samples in latencies.items()}
+    }
+
+
+async def run_load_test(rate, duration, mix=DEFAULT_MIX, workers=2, **kwargs):
+    """
+    Start the in-process API and workers, generate load and return the report (see generate_load).
+    """
+    with in_process_app() as (app, server), worker_threads(server, workers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-generator") as client:
+            report = await generate_load(client, rate, duration, parse_mix(mix), **kwargs)
+    report["workers"] = workers
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"Offered {report['offered_rate']:.1f} tasks/s (target {report['target_rate']:.1f}) "
+        f"for {report['duration']:.0f} s with {report['workers']} workers",
+        f"Submitted {report['submitted']}: {report['completed']} completed, {report['error']} failed, "
+        f"{report['rejected']} rejected, {report['unfinished']} unfinished",
+        f"Throughput: {report['throughput']:.1f} tasks/s",
+    ]
+    for name, summary in report["latency"].items():
+        if summary["count"]:
+            percentiles = ", ".join(f"p{percentile} {summary[f'p{percentile}'] * 1000:.1f} ms"
+                                    for percentile in PERCENTILES)
+            lines.append(f"{name}: {percentiles}, max {summary['max'] * 1000:.1f} ms ({summary['count']} samples)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the in-process API at a target arrival rate")
+    parser.add_argument("--rate", type=float, default=10, help="Target arrivals per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of submission")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Circuit mix as name:qubits=weight,...")
+    parser.add_argument("--workers", type=int, default=2, help="Worker threads draining the queue")
+    parser.add_argument("--shots", type=int, default=1024)
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--poll-interval", type=float, default=0.01)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    # Per-task INFO logs of the API and workers would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = asyncio.run(run_load_test(
+        args.rate, args.duration, mix=args.mix, workers=args.workers, shots=args.shots,
+        arrival=args.arrival, poll_interval=args.poll_interval
+    ))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
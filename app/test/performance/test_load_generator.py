@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from app.test.performance.load_generator import format_report, parse_mix, run_load_test
+
+
+class TestLoadGenerator:
+    """
+    Short open-loop run of the in-process API and workers
+    """
+
+    def test_parse_mix(self):
+        assert parse_mix("ghz:5=3, qft:8") == [("ghz", 5, 3.0), ("qft", 8, 1.0)]
+        with pytest.raises(ValueError):
+            parse_mix("bogus:5=1")
+
+    def test_sustains_offered_load(self):
+        report = asyncio.run(run_load_test(rate=10, duration=3, mix="ghz:3=1,qft:4=1", arrival="constant"))
+        print("\n" + format_report(report))
+
+        assert report["submitted"] == 30
+        assert report["completed"] == report["submitted"], "Every task should finish at this rate"
+        for name in ("submit", "get_task", "time_to_result"):
+            latency = report["latency"][name]
+            assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+        assert report["latency"]["time_to_result"]["p50"] >= report["latency"]["submit"]["p50"]
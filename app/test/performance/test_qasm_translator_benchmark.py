@@ -0,0 +1,50 @@
+import random
+import time
+
+from app.main.service.qasm_translator import translate_qasm
+
+
+def generate_qasm3_program(num_qubits, num_gates, seed=1234):
+    """
+    Generate a large random OpenQASM 3 program with a measurement per qubit.
+    """
+    rng = random.Random(seed)
+    lines = ["OPENQASM 3.0;", 'include "stdgates.inc";', f"qubit[{num_qubits}] q;", f"bit[{num_qubits}] c;"]
+    for _ in range(num_gates):
+        kind = rng.random()
+        if kind < 0.4:
+            lines.append(f"h q[{rng.randrange(num_qubits)}];")
+        elif kind < 0.7:
+            lines.append(f"rz({rng.random():.6f}) q[{rng.randrange(num_qubits)}]; // rotation")
+        else:
+            control, target = rng.sample(range(num_qubits), 2)
+            lines.append(f"cx q[{control}], q[{target}];")
+    for qubit in range(num_qubits):
+        lines.append(f"c[{qubit}] = measure q[{qubit}];")
+    return "\n".join(lines)
+
+
+class TestQasmTranslatorBenchmark:
+    """
+    Throughput benchmark of the QASM translator on large generated programs
+    """
+
+    def test_translation_throughput(self):
+        program = generate_qasm3_program(num_qubits=20, num_gates=200000)
+        size_mb = len(program) / (1024 * 1024)
+
+        start_time = time.perf_counter()
+        translated = translate_qasm(program)
+        whole_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        streamed = translate_qasm(program.splitlines(keepends=True))
+        streamed_time = time.perf_counter() - start_time
+
+        print(f"\nQASM Translation Throughput ({size_mb:.1f} MB, 200000 gates):")
+        print(f"Whole program: {size_mb / whole_time:.1f} MB/s")
+        print(f"Line stream: {size_mb / streamed_time:.1f} MB/s")
+
+        assert streamed == translated
+        assert translated.count("\n") == 4 + 200000 + 20
+        assert size_mb / whole_time > 1.0, "QASM translation throughput is too low"
@@ -0,0 +1,113 @@
+import json
+import math
+import os
+import tracemalloc
+
+import pytest
+
+from app.main.service.circuit_cache import CircuitCache
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.test.performance.circuits import CIRCUITS, ghz_qasm
+
+# JSON file the measurements are compared against; machine specific, so recorded locally and not committed
+BENCHMARK_BASELINE = os.getenv(
+    "BENCHMARK_BASELINE", os.path.join(os.path.dirname(__file__), "service_benchmark_baseline.json")
+)
+# Set to true to overwrite the baseline with this run instead of comparing
+BENCHMARK_UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE", "false").lower() == "true"
+# Allowed slowdown or memory growth relative to the baseline, 0.25 = 25 %
+BENCHMARK_REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", 0.25))
+BENCHMARK_REPETITIONS = int(os.getenv("BENCHMARK_REPETITIONS", 5))
+# Differences below these are noise on stages that take microseconds
+BENCHMARK_MIN_SECONDS = float(os.getenv("BENCHMARK_MIN_SECONDS", 0.005))
+BENCHMARK_MIN_BYTES = int(os.getenv("BENCHMARK_MIN_BYTES", 1024 * 1024))
+
+QUBITS = (5, 10, 20)
+SHOTS = (1024, 65536)
+STAGES = ("preprocess", "parse", "simulate", "format")
+
+
+def measure_case(service, qasm, shots, repetitions=BENCHMARK_REPETITIONS):
+    """
+    Fastest time of every stage over the repetitions and the peak of traced allocations.
+
+    Memory is measured in an extra run because tracing allocations slows
+    down every stage. tracemalloc sees Python objects and NumPy buffers, not
+    the native state vector of Aer, whose size the resource estimate covers.
+    """
+    timings = {stage: math.inf for stage in STAGES}
+    for repetition in range(repetitions):
+        result = service.run_qasm(qasm, shots=shots, seed=repetition)
+        assert not result["error"], result.get("message")
+        assert sum(result["counts"].values()) == shots
+        for stage in STAGES:
+            timings[stage] = min(timings[stage], result["timings"][stage])
+
+    tracemalloc.start()
+    try:
+        service.run_qasm(qasm, shots=shots, seed=0)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"method": result["method"], "seconds": timings, "peak_bytes": peak}
+
+
+def find_regressions(baseline, measurements, threshold=BENCHMARK_REGRESSION_THRESHOLD):
+    """
+    Describe every stage time and peak memory that grew beyond the threshold.
+
+    Cases missing from the baseline are not compared.
+    """
+    regressions = []
+    for case, measured in measurements.items():
+        expected = baseline.get(case)
+        if expected is None:
+            continue
+        for stage, seconds in measured["seconds"].items():
+            limit = expected["seconds"].get(stage, math.inf) * (1 + threshold)
+            if seconds > max(limit, expected["seconds"].get(stage, 0.0) + BENCHMARK_MIN_SECONDS):
+                regressions.append(f"{case} {stage}: {seconds * 1000:.2f} ms, "
+                                   f"baseline {expected['seconds'][stage] * 1000:.2f} ms")
+        limit = expected["peak_bytes"] * (1 + threshold)
+        if measured["peak_bytes"] > max(limit, expected["peak_bytes"] + BENCHMARK_MIN_BYTES):
+            regressions.append(f"{case} memory: {measured['peak_bytes']} bytes, "
+                               f"baseline {expected['peak_bytes']} bytes")
+    return regressions
+
+
+class TestServiceBenchmark:
+    """
+    In-process benchmark of QuantumCircuitService compared against a JSON baseline
+    """
+
+    def test_no_regression_against_baseline(self):
+        if not BENCHMARK_UPDATE_BASELINE and not os.path.exists(BENCHMARK_BASELINE):
+            pytest.skip(f"No baseline at {BENCHMARK_BASELINE}, record one with BENCHMARK_UPDATE_BASELINE=true")
+
+        # Without a circuit cache every repetition parses again
+        service = QuantumCircuitService(circuit_cache=CircuitCache(max_bytes=0))
+        service.run_qasm(ghz_qasm(2), shots=1)
+
+        measurements = {}
+        print(f"\nQuantumCircuitService Benchmark (fastest of {BENCHMARK_REPETITIONS} runs):")
+        for name, generate in CIRCUITS.items():
+            for num_qubits in QUBITS:
+                qasm = generate(num_qubits)
+                for shots in SHOTS:
+                    case = f"{name}/{num_qubits}q/{shots}shots"
+                    measured = measurements[case] = measure_case(service, qasm, shots)
+                    stages = ", ".join(f"{stage} {measured['seconds'][stage] * 1000:.2f} ms" for stage in STAGES)
+                    print(f"{case} [{measured['method']}]: {stages}, "
+                          f"peak {measured['peak_bytes'] / (1024 * 1024):.1f} MiB")
+
+        if BENCHMARK_UPDATE_BASELINE:
+            with open(BENCHMARK_BASELINE, "w") as baseline_file:
+                json.dump(measurements, baseline_file, indent=2, sort_keys=True)
+            print(f"Baseline written to {BENCHMARK_BASELINE}")
+            return
+
+        with open(BENCHMARK_BASELINE) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(baseline, measurements)
+        assert not regressions, "Performance regressed against the baseline:\n" + "\n".join(regressions)
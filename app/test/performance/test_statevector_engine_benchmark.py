@@ -0,0 +1,57 @@
+import random
+import time
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from app.main.service.statevector_engine import StatevectorEngine
+
+
+def generate_circuit(num_qubits, num_gates, seed=1234):
+    """
+    Generate a random circuit of h, rz and cx gates measuring every qubit.
+    """
+    rng = random.Random(seed)
+    circuit = QuantumCircuit(num_qubits, num_qubits)
+    for _ in range(num_gates):
+        kind = rng.random()
+        if kind < 0.4:
+            circuit.h(rng.randrange(num_qubits))
+        elif kind < 0.7:
+            circuit.rz(rng.random(), rng.randrange(num_qubits))
+        else:
+            control, target = rng.sample(range(num_qubits), 2)
+            circuit.cx(control, target)
+    circuit.measure(range(num_qubits), range(num_qubits))
+    return circuit
+
+
+class TestStatevectorEngineBenchmark:
+    """
+    Latency comparison of the NumPy statevector engine and AerSimulator on small circuits
+    """
+
+    def test_latency_against_aer(self):
+        engine = StatevectorEngine()
+        simulator = AerSimulator()
+        repetitions = 20
+
+        print("\nStatevector Engine Latency (1000 shots, mean of 20 runs):")
+        for num_qubits, num_gates in ((2, 10), (6, 60), (12, 200)):
+            circuit = generate_circuit(num_qubits, num_gates)
+            assert engine.supports(circuit)
+            simulator.run(circuit, shots=1).result()
+
+            start_time = time.perf_counter()
+            for _ in range(repetitions):
+                counts = engine.run(circuit, shots=1000, seed=1)
+            engine_latency = (time.perf_counter() - start_time) / repetitions
+
+            start_time = time.perf_counter()
+            for _ in range(repetitions):
+                simulator.run(circuit, shots=1000, seed_simulator=1).result()
+            aer_latency = (time.perf_counter() - start_time) / repetitions
+
+            assert sum(counts.values()) == 1000
+            print(f"{num_qubits} qubits, {num_gates} gates: "
+                  f"engine {engine_latency * 1000:.2f} ms, Aer {aer_latency * 1000:.2f} ms")
@@ -0,0 +1,304 @@
+import asyncio
+import importlib
+import json
+import sys
+import threading
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import redis_connection
+from app.main.service import qasm_translator, task_scheduler
+from app.main.service.counts_encoding import TEXT_PREFIX, PackedCounts
+from app.main.service.task_queue import TASK_QUEUE_KEY
+from app.main.worker import run_worker
+
+BELL_QASM = "OPENQASM 3.0;\nqreg q[2];\ncreg c[2];\nh q[0];\ncx q[0], q[1];\nmeasure q -> c;"
+GHZ_QASM = "OPENQASM 3.0;\nqreg q[3];\ncreg c[3];\nh q[0];\ncx q[0], q[1];\ncx q[1], q[2];\nmeasure q -> c;"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """FastAPI app imported against an in-memory Redis"""
+    server = fakeredis.FakeServer()
+    redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(redis_connection, "create_redis_client", lambda: redis_client)
+    monkeypatch.setattr(redis_connection, "create_async_redis_client",
+                        lambda **kwargs: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    sys.modules.pop("app.main.app", None)
+    module = importlib.import_module("app.main.app")
+    with TestClient(module.app) as client:
+        yield client, redis_client
+
+
+def work(redis_client, max_tasks=1):
+    """Run a worker against the same in-memory Redis until it processed max_tasks tasks"""
+    server = redis_client.connection_pool.connection_kwargs["server"]
+    asyncio.run(run_worker("worker-a", redis_client=redis_client, max_tasks=max_tasks,
+                           async_redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)))
+
+
+class TestApi:
+    """
+    In-process tests of the HTTP API with a worker draining the queue
+    """
+
+    def test_submit_and_complete_task(self, api):
+        client, redis_client = api
+
+        response = client.post("/api/tasks", json={"qc": BELL_QASM, "shots": 100})
+        assert response.status_code == 202
+        task_id = response.json()["task_id"]
+        assert client.get(f"/api/tasks/{task_id}").json()["status"] == "pending"
+
+        work(redis_client)
+
+        status_data = client.get(f"/api/tasks/{task_id}").json()
+        assert status_data["status"] == "completed"
+        assert sum(status_data["result"].values()) == 100
+        assert status_data["optimization"] == {"gates_before": 2, "qubits_before": 2, "gates_after": 2, "qubits_after": 2}
+
+        assert redis_client.hget(f"task:{task_id}", "result").startswith(TEXT_PREFIX), "Counts are stored packed"
+        binary = client.get(f"/api/tasks/{task_id}", params={"format": "binary"})
+        assert binary.headers["content-type"] == "application/octet-stream"
+        assert dict(PackedCounts.from_bytes(binary.content)) == status_data["result"]
+
+    def test_shot_memory_streamed(self, api):
+        client, redis_client = api
+
+        task_id = client.post("/api/tasks", json={"qc": BELL_QASM, "shots": 500, "memory": True}).json()["task_id"]
+        assert client.get(f"/api/tasks/{task_id}/memory").status_code == 409
+
+        work(redis_client)
+
+        assert client.get(f"/api/tasks/{task_id}").json()["memory_shots"] == 500
+        lines = [json.loads(line) for line in client.get(f"/api/tasks/{task_id}/memory").text.splitlines()]
+        outcomes = sum((line["outcomes"] for line in lines), [])
+        assert len(outcomes) == 500 and set(outcomes) <= {0, 3}
+
+        window = client.get(f"/api/tasks/{task_id}/memory", params={"start": 100, "stop": 110}).text
+        assert json.loads(window) == {"offset": 100, "outcomes": outcomes[100:110]}
+
+        binary = client.get(f"/api/tasks/{task_id}/memory", params={"format": "binary"})
+        assert binary.headers["x-shot-item-size"] == "1"
+        assert list(binary.content) == outcomes
+
+        partial = client.get(f"/api/tasks/{task_id}/memory", params={"format": "binary"},
+                             headers={"Range": "bytes=10-19"})
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == "bytes 10-19/500"
+        assert list(partial.content) == outcomes[10:20]
+        unsatisfiable = client.get(f"/api/tasks/{task_id}/memory", params={"format": "binary"},
+                                   headers={"Range": "bytes=600-"})
+        assert unsatisfiable.status_code == 416
+
+    def test_sweep_results_paginated(self, api):
+        client, redis_client = api
+        template = "OPENQASM 3.0;\ninput float[64] theta;\nqubit[1] q;\nbit[1] c;\nrx(theta) q[0];\nc = measure q;"
+
+        assert client.post("/api/sweeps", json={
+            "qc": template, "parameters": {"theta": [0.0], "phi": [1.0, 2.0]}, "mode": "zip"
+        }).status_code == 400
+        response = client.post("/api/sweeps", json={
+            "qc": template, "parameters": {"theta": [0.0, 3.141592653589793] * 3}, "shots": 50
+        })
+        sweep_id = response.json()["task_id"]
+
+        work(redis_client)
+
+        assert client.get(f"/api/tasks/{sweep_id}").json()["sweep_points"] == 6
+        page = client.get(f"/api/sweeps/{sweep_id}", params={"limit": 4}).json()
+        assert page["points"] == 6 and page["parameters"] == ["theta"]
+        assert [point["counts"] for point in page["results"]] == [{"0": 50}, {"1": 50}] * 2
+        last = client.get(f"/api/sweeps/{sweep_id}", params={"offset": page["next_offset"], "limit": 4}).json()
+        assert [point["index"] for point in last["results"]] == [4, 5]
+        assert last["next_offset"] is None
+
+    def test_batch_submission(self, api):
+        client, redis_client = api
+
+        response = client.post("/api/tasks/batch", json={
+            "circuits": [BELL_QASM, "INVALID CIRCUIT", GHZ_QASM],
+            "shots": 64
+        })
+        assert response.status_code == 202
+        batch = response.json()
+        assert len(batch["task_ids"]) == 3
+        assert redis_client.zcard("tasks:scheduled") == 1, "A batch should be queued as a single job"
+
+        work(redis_client)
+
+        batch_data = client.get(f"/api/tasks/batch/{batch['batch_id']}").json()
+        assert batch_data["status"] == "completed"
+        statuses = [task["status"] for task in batch_data["tasks"]]
+        assert statuses == ["completed", "error", "completed"]
+        assert [task["task_id"] for task in batch_data["tasks"]] == batch["task_ids"]
+
+        ghz = client.get(f"/api/tasks/{batch['task_ids'][2]}").json()
+        assert set(ghz["result"]) <= {"0", "7"}
+        assert sum(ghz["result"].values()) == 64
+
+    def test_empty_batch_rejected(self, api):
+        client, _ = api
+
+        assert client.post("/api/tasks/batch", json={"circuits": []}).status_code == 422
+
+    def test_task_events_pushed_on_completion(self, api):
+        client, redis_client = api
+        task_id = client.post("/api/tasks", json={"qc": BELL_QASM, "shots": 50}).json()["task_id"]
+
+        def finish_task():
+            time.sleep(0.3)
+            work(redis_client)
+
+        worker = threading.Thread(target=finish_task)
+        worker.start()
+        with client.stream("GET", f"/api/tasks/{task_id}/events") as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+        worker.join()
+
+        assert events[0]["status"] == "pending"
+        assert events[-1]["status"] == "completed"
+        assert sum(events[-1]["result"].values()) == 50
+
+    def test_task_events_websocket(self, api):
+        client, redis_client = api
+        task_id = client.post("/api/tasks", json={"qc": "INVALID CIRCUIT"}).json()["task_id"]
+        work(redis_client)
+
+        with client.websocket_connect(f"/api/tasks/{task_id}/ws") as websocket:
+            assert websocket.receive_json()["status"] == "error"
+
+        with client.websocket_connect("/api/tasks/unknown/ws") as websocket:
+            assert websocket.receive_json()["message"] == "Task not found."
+
+    def test_task_listing_is_paginated(self, api):
+        client, redis_client = api
+        first = client.post("/api/tasks", json={"qc": "INVALID CIRCUIT"}).json()["task_id"]
+        batch = client.post("/api/tasks/batch", json={"circuits": [BELL_QASM, GHZ_QASM]}).json()
+        last = client.post("/api/tasks", json={"qc": BELL_QASM}).json()["task_id"]
+        work(redis_client)
+
+        listed = []
+        cursor = None
+        while True:
+            params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+            page = client.get("/api/tasks", params=params).json()
+            assert len(page["tasks"]) <= 2
+            listed += page["tasks"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert [task["task_id"] for task in listed] == [last] + batch["task_ids"][::-1] + [first]
+        assert [task["task_id"] for task in client.get("/api/tasks", params={"status": "error"}).json()["tasks"]] == [first]
+        assert len(client.get("/api/tasks", params={"status": "pending"}).json()["tasks"]) == 3
+        assert client.get("/api/tasks", params={"status": "bogus"}).status_code == 400
+
+    def test_identical_submissions_coalesced(self, api):
+        client, redis_client = api
+        relaid = "// refresh\n" + GHZ_QASM.replace("\n", "\n  ")
+        task_ids = [client.post("/api/tasks", json={"qc": qasm, "shots": 200}).json()["task_id"]
+                    for qasm in (GHZ_QASM, relaid, GHZ_QASM)]
+        fresh = client.post("/api/tasks", json={"qc": GHZ_QASM, "shots": 200, "use_cache": False}).json()["task_id"]
+        assert redis_client.zcard(TASK_QUEUE_KEY) == 2, "Identical submissions should share one queued task"
+
+        work(redis_client, max_tasks=2)
+
+        leader, *followers = [client.get(f"/api/tasks/{task_id}").json() for task_id in task_ids]
+        assert leader["status"] == "completed"
+        assert leader["coalesced_with"] is None
+        for follower in followers:
+            assert follower["result"] == leader["result"]
+            assert follower["coalesced_with"] == task_ids[0]
+        assert client.get(f"/api/tasks/{fresh}").json()["coalesced_with"] is None
+        assert len(client.get("/api/tasks", params={"status": "completed"}).json()["tasks"]) == 4
+
+        client.post("/api/tasks", json={"qc": GHZ_QASM, "shots": 200})
+        assert redis_client.zcard(TASK_QUEUE_KEY) == 1, "A finished flight should not capture new submissions"
+
+    def test_metrics_exposed(self, api):
+        client, redis_client = api
+        client.post("/api/tasks", json={"qc": BELL_QASM, "shots": 100})
+        client.post("/api/tasks", json={"qc": BELL_QASM})
+        work(redis_client)
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        lines = response.text.splitlines()
+        assert "# TYPE quantum_stage_seconds histogram" in lines
+        assert any(line.startswith('quantum_stage_seconds_bucket{stage="simulate",le="+Inf"} ') for line in lines)
+        assert any(line.startswith('quantum_stage_seconds_count{stage="queue"} ') for line in lines)
+        assert any(line.startswith('quantum_simulation_seconds_count{method=') and 'qubits="1-5"' in line
+                   for line in lines)
+        assert 'quantum_tasks_total{outcome="completed"} 1' in lines
+        assert "quantum_queue_depth 1" in lines, "The second task is still queued"
+
+    def test_cost_estimated_off_the_event_loop(self, api, monkeypatch):
+        client, _ = api
+        module = sys.modules["app.main.app"]
+        original = module.estimate_cost
+        on_loop = []
+
+        def estimate_cost(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(module, "estimate_cost", estimate_cost)
+
+        assert client.post("/api/tasks", json={"qc": BELL_QASM}).status_code == 202
+        assert client.post("/api/tasks/batch", json={"circuits": [BELL_QASM, GHZ_QASM]}).status_code == 202
+        assert on_loop == [False, False, False], "Translating a circuit must not block the event loop"
+
+    def test_submission_translated_once(self, api, monkeypatch):
+        client, _ = api
+        translations = []
+
+        def counting(module):
+            original = module.translate_qasm
+            monkeypatch.setattr(module, "translate_qasm", lambda source: translations.append(source) or original(source))
+
+        counting(qasm_translator)
+        counting(task_scheduler)
+
+        assert client.post("/api/tasks", json={"qc": BELL_QASM, "seed": 3}).status_code == 202
+        assert len(translations) == 1, "The flight key and the cost share one translation"
+
+    def test_health_probes(self, api):
+        client, redis_client = api
+
+        assert client.get("/health/live").json() == {"status": "alive"}
+        assert client.get("/health/ready").json() == {"status": "ready"}
+
+        redis_client.connection_pool.connection_kwargs["server"].connected = False
+        assert client.get("/health/live").status_code == 200, "Liveness does not depend on Redis"
+        assert client.get("/health/ready").status_code == 503
+
+    def test_connection_pool_tracks_saturation(self):
+        pool = redis_connection.InstrumentedConnectionPool(
+            connection_class=fakeredis.aioredis.FakeConnection,
+            server=fakeredis.FakeServer(),
+            max_connections=2,
+            timeout=5
+        )
+        client = redis_connection.redis.asyncio.Redis(connection_pool=pool)
+
+        async def scenario():
+            await asyncio.gather(*(client.blpop("empty", timeout=0.2) for _ in range(4)))
+
+        asyncio.run(scenario())
+
+        stats = pool.stats()
+        assert stats["peak_in_use"] == 2
+        assert stats["in_use"] == 0
+        assert stats["saturated"] == 2, "Two callers should have waited for a free connection"
+        assert stats["max_wait_seconds"] >= 0.1
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import redis
+
+from app.main.redis_connection import wait_for_redis
+
+# Seconds importing the API may take in a fresh interpreter
+API_IMPORT_BUDGET_SECONDS = float(os.getenv("API_IMPORT_BUDGET_SECONDS", 2.0))
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main.app
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+class FlakyRedis:
+    def __init__(self, failures):
+        self.failures = failures
+        self.pings = 0
+
+    async def ping(self):
+        self.pings += 1
+        if self.pings <= self.failures:
+            raise redis.ConnectionError("Connection refused")
+        return True
+
+
+class TestAppStartup:
+    """
+    Cold start of the API tier
+    """
+
+    def test_api_imports_within_budget_without_redis_or_simulator(self):
+        # Nothing listens on port 1, the import must neither connect nor fail
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        environment = {**os.environ, "REDIS_HOST": "127.0.0.1", "REDIS_PORT": "1"}
+        completed = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=root, env=environment,
+                                   capture_output=True, text=True, timeout=60)
+        assert completed.returncode == 0, completed.stderr
+
+        probe = json.loads(completed.stdout.splitlines()[-1])
+        heavy = [module for module in probe["modules"] if module.split(".")[0] in ("qiskit", "qiskit_aer", "scipy")]
+        assert not heavy, "The API must not load the simulator stack"
+        assert probe["seconds"] < API_IMPORT_BUDGET_SECONDS
+
+    def test_wait_for_redis_backs_off_until_reachable(self):
+        client = FlakyRedis(failures=3)
+
+        attempts = asyncio.run(wait_for_redis(client, initial_delay=0.01, max_delay=0.02))
+
+        assert attempts == 4
+        assert client.pings == 4
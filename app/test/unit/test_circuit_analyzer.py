@@ -0,0 +1,61 @@
+import asyncio
+
+from qiskit import QuantumCircuit
+
+from app.main.service.circuit_analyzer import analyze_circuit
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+
+
+def ghz_qasm(num_qubits):
+    lines = ["OPENQASM 2.0;", 'include "qelib1.inc";', f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];", "h q[0];"]
+    lines += [f"cx q[{qubit}], q[{qubit + 1}];" for qubit in range(num_qubits - 1)]
+    lines.append("measure q -> c;")
+    return "\n".join(lines)
+
+
+class TestCircuitAnalyzer:
+    """
+    Unit tests for the simulation method selection
+    """
+
+    def test_clifford_circuits_use_stabilizer(self):
+        circuit = QuantumCircuit.from_qasm_str(ghz_qasm(5))
+
+        analysis = analyze_circuit(circuit)
+
+        assert analysis.clifford
+        assert analysis.method == "stabilizer"
+
+    def test_non_clifford_circuits(self):
+        small = QuantumCircuit(4)
+        small.h(0)
+        small.t(0)
+        small.cx(0, 1)
+        assert analyze_circuit(small).method == "statevector"
+
+        shallow = QuantumCircuit(40)
+        for qubit in range(40):
+            shallow.rx(0.3, qubit)
+        for qubit in range(0, 39, 2):
+            shallow.cx(qubit, qubit + 1)
+        assert analyze_circuit(shallow).method == "matrix_product_state"
+
+        shallow_medium = QuantumCircuit(20)
+        shallow_medium.t(range(20))
+        assert analyze_circuit(shallow_medium).method == "matrix_product_state"
+
+    def test_wide_ghz_runs_with_stabilizer(self):
+        service = QuantumCircuitService(shots=100)
+
+        result = asyncio.run(service.execute_qasm(ghz_qasm(200), seed=3))
+
+        assert result["method"] == "stabilizer"
+        assert sum(result["counts"].values()) == 100
+        assert set(result["counts"]) <= {"0", str(2 ** 200 - 1)}
+
+    def test_configured_method_is_kept(self):
+        service = QuantumCircuitService(shots=16, method="statevector")
+
+        result = asyncio.run(service.execute_qasm(ghz_qasm(3)))
+
+        assert result["method"] == "statevector"
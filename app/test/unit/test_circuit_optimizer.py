@@ -0,0 +1,140 @@
+import asyncio
+
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+from qiskit.quantum_info import Statevector
+
+from app.main.service.circuit_optimizer import cancel_inverses, merge_1q, optimize_circuit, remove_idle_qubits
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+
+# Inverse pairs, a rotation run and three qubits no gate acts on
+REDUNDANT_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[6];
+creg c[6];
+h q[0];
+h q[0];
+h q[0];
+rz(0.3) q[1];
+rx(0.2) q[1];
+rz(-0.1) q[1];
+cx q[0], q[1];
+cx q[0], q[1];
+cx q[0], q[1];
+s q[2];
+sdg q[2];
+x q[4];
+x q[4];
+barrier q;
+measure q -> c;
+"""
+
+
+def probabilities(circuit):
+    return Statevector(circuit.remove_final_measurements(inplace=False)).probabilities_dict()
+
+
+class TestCircuitOptimizer:
+    """
+    Unit tests for the pre-simulation optimization passes
+    """
+
+    def test_cancel_inverses(self):
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        circuit.cx(0, 1)
+        circuit.cx(0, 1)
+        circuit.h(0)
+        circuit.s(1)
+        circuit.sdg(1)
+
+        assert len(cancel_inverses(circuit).data) == 0
+
+    def test_merge_1q_keeps_clifford_circuits(self):
+        clifford = QuantumCircuit(1)
+        clifford.h(0)
+        clifford.s(0)
+        assert merge_1q(clifford) is clifford, "Merging would rule out the stabilizer method"
+
+        rotations = QuantumCircuit(1)
+        rotations.rz(0.3, 0)
+        rotations.rx(0.2, 0)
+        rotations.h(0)
+        merged = merge_1q(rotations)
+        assert len(merged.data) == 1
+        expected = probabilities(rotations)
+        assert all(abs(probabilities(merged).get(key, 0) - value) < 1e-12 for key, value in expected.items())
+
+    def test_remove_idle_qubits_keeps_classical_bits(self):
+        circuit = QuantumCircuit.from_qasm_str(
+            'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[3];\ncreg c[3];\nx q[1];\nbarrier q;\nmeasure q -> c;'
+        )
+
+        optimized = remove_idle_qubits(circuit)
+
+        assert optimized.num_qubits == 1
+        assert optimized.num_clbits == 3
+        assert [circuit.find_bit(instruction.clbits[0]).index for instruction in optimized.data
+                if instruction.operation.name == "measure"] == [1]
+
+    def test_idle_qubit_measured_twice_is_kept(self):
+        circuit = QuantumCircuit(2, 1)
+        circuit.x(0)
+        circuit.measure(0, 0)
+        circuit.measure(1, 0)
+
+        assert remove_idle_qubits(circuit).num_qubits == 2
+
+    def test_measure_only_circuit_kept(self):
+        qasm = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[2];\ncreg c[2];\nmeasure q -> c;'
+        circuit = QuantumCircuit.from_qasm_str(qasm)
+
+        assert remove_idle_qubits(circuit) is circuit, "Dropping every measurement would leave no counts"
+
+        result = asyncio.run(QuantumCircuitService(shots=64, statevector_max_qubits=0).execute_qasm(qasm))
+        assert result["error"] is False
+        assert result["counts"] == {"0": 64}
+
+    def test_optimize_circuit_reports_reduction(self):
+        circuit = QuantumCircuit.from_qasm_str(REDUNDANT_QASM)
+
+        optimized, report = optimize_circuit(circuit, ["cancel_inverses", "merge_1q", "remove_idle_qubits"])
+
+        assert report == {"gates_before": 13, "qubits_before": 6, "gates_after": 3, "qubits_after": 2}
+        assert optimized.num_clbits == 6
+
+    def test_parameterized_circuits_unchanged(self):
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        circuit.h(0)
+        circuit.rx(Parameter("theta"), 1)
+
+        optimized, report = optimize_circuit(circuit, ["cancel_inverses"])
+
+        assert optimized is circuit
+        assert report["gates_after"] == report["gates_before"]
+
+    def test_service_runs_optimized_circuit(self):
+        optimized = QuantumCircuitService(shots=4000, statevector_max_qubits=0)
+        plain = QuantumCircuitService(shots=4000, statevector_max_qubits=0, optimization_passes=[])
+
+        result = asyncio.run(optimized.execute_qasm(REDUNDANT_QASM, seed=11))
+        reference = asyncio.run(plain.execute_qasm(REDUNDANT_QASM, seed=11))
+
+        assert result["optimization"] == {"gates_before": 13, "qubits_before": 6, "gates_after": 3, "qubits_after": 2}
+        assert result["num_qubits"] == 2
+        assert set(result["counts"]) == set(reference["counts"])
+        for outcome, count in reference["counts"].items():
+            assert abs(result["counts"][outcome] - count) < 250
+
+    def test_idle_qubits_removed_before_planning(self):
+        # 30 declared qubits would need 16 GiB as a statevector, the 2 in use a few bytes
+        qasm = ('OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[30];\ncreg c[2];\n'
+                'h q[0];\ncx q[0], q[1];\nmeasure q[0] -> c[0];\nmeasure q[1] -> c[1];')
+        service = QuantumCircuitService(shots=100, method="statevector", max_job_memory=1024 * 1024)
+
+        result = asyncio.run(service.execute_qasm(qasm))
+
+        assert result["error"] is False
+        assert set(result["counts"]) <= {"0", "3"}
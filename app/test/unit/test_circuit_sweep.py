@@ -0,0 +1,70 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.main.service.circuit_cache import CircuitCache
+from app.main.service.circuit_sweep import parse_template, sweep_points, sweep_size
+from app.main.service.counts_encoding import PackedCounts
+from app.main.service.qasm_translator import translate_qasm
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.service.sweep_results import decode_chunk, encode_chunk
+
+TEMPLATE_QASM = """
+OPENQASM 3.0;
+include "stdgates.inc";
+input float[64] theta;
+input angle phi;
+qubit[2] q;
+bit[2] c;
+rx(theta) q;
+crz(phi + theta / 2) q[0], q[1];
+c = measure q;
+"""
+
+
+class TestCircuitSweep:
+    """
+    Unit tests for parameterized sweep templates, bulk binding and result chunks
+    """
+
+    def test_template_keeps_parameter_expressions(self):
+        circuit = parse_template(translate_qasm(TEMPLATE_QASM), ["theta", "phi"])
+
+        assert sorted(parameter.name for parameter in circuit.parameters) == ["phi", "theta"]
+        assert circuit.count_ops()["rx"] == 2, "Register arguments are still broadcast"
+        with pytest.raises(ValueError):
+            parse_template(translate_qasm(TEMPLATE_QASM), ["theta"])
+
+    def test_grid_and_zip_points(self):
+        parameters = {"theta": [0.0, 1.0], "phi": [5.0, 6.0, 7.0]}
+
+        assert sweep_size(parameters, "grid") == 6
+        assert sweep_points(parameters, "grid")[:3].tolist() == [[0.0, 5.0], [0.0, 6.0], [0.0, 7.0]]
+        assert sweep_points({"theta": [1.0, 2.0], "phi": [3.0, 4.0]}, "zip").tolist() == [[1.0, 3.0], [2.0, 4.0]]
+        with pytest.raises(ValueError):
+            sweep_size(parameters, "zip")
+
+    def test_sweep_parses_once_and_matches_bound_circuits(self):
+        circuit_cache = CircuitCache()
+        service = QuantumCircuitService(shots=2000, circuit_cache=circuit_cache)
+        values = sweep_points({"theta": [0.0, np.pi / 2, np.pi], "phi": [0.3]}, "grid")
+
+        result = asyncio.run(service.execute_sweep(TEMPLATE_QASM, ["theta", "phi"], values, seed=5))
+        asyncio.run(service.execute_sweep(TEMPLATE_QASM, ["theta", "phi"], values, seed=5))
+
+        assert result["error"] is False
+        assert [sum(counts.values()) for counts in result["counts"]] == [2000] * 3
+        assert dict(result["counts"][0]) == {"0": 2000}
+        assert dict(result["counts"][2]) == {"3": 2000}
+        assert 400 < result["counts"][1]["0"] < 600, "theta = pi/2 leaves both qubits at 0 a quarter of the time"
+        assert circuit_cache.stats()["misses"] == 1
+
+    def test_result_chunk_round_trip(self):
+        values = np.array([[0.1, 0.2], [0.3, 0.4]])
+        counts = [PackedCounts([0, 3], [5, 7]), PackedCounts([1], [12])]
+
+        decoded_values, decoded_counts = decode_chunk(encode_chunk(values, counts))
+
+        assert decoded_values.tolist() == values.tolist()
+        assert [dict(point_counts) for point_counts in decoded_counts] == [{"0": 5, "3": 7}, {"1": 12}]
@@ -0,0 +1,48 @@
+import pickle
+
+import numpy as np
+
+from app.main.service.counts_encoding import PackedCounts, counts_to_bytes, decode_counts, encode_counts
+
+
+class TestCountsEncoding:
+    """
+    Unit tests for packed measurement counts and their binary encoding
+    """
+
+    def test_bitstrings_packed_to_decimal_outcomes(self):
+        counts = {"000": 3, "101": 5, "111": 1}
+
+        packed = PackedCounts.from_bitstrings(counts)
+
+        assert dict(packed) == {str(int(key, 2)): value for key, value in counts.items()}
+        assert packed.outcomes.tolist() == [0, 5, 7]
+        assert PackedCounts.from_bitstrings({"11 1": 4}) is None, "Several registers keep their bitstrings"
+        assert PackedCounts.from_bitstrings({"1" * 65: 1}) is None, "Outcomes must fit in 64 bits"
+
+    def test_wide_register_round_trip(self):
+        rng = np.random.default_rng(3)
+        outcomes = rng.integers(0, 2 ** 63, size=5000, dtype=np.uint64)
+        counts = {format(int(outcome), "064b"): 1 + index % 7 for index, outcome in enumerate(outcomes)}
+
+        packed = PackedCounts.from_bitstrings(counts)
+        encoded = encode_counts(packed)
+        decoded = decode_counts(encoded)
+
+        assert dict(decoded) == {str(int(key, 2)): value for key, value in counts.items()}
+        assert len(encoded) < len(encode_counts(packed, encoding="json")) / 2
+        assert dict(pickle.loads(pickle.dumps(packed))) == dict(packed)
+
+    def test_compression_and_json_fallback(self):
+        packed = PackedCounts(np.arange(4096, dtype=np.uint64), np.full(4096, 10))
+
+        assert len(packed.to_bytes()) < len(packed.to_bytes(compression_min_bytes=-1)) / 3
+        assert decode_counts(encode_counts({"3": 2})) == {"3": 2}
+        assert counts_to_bytes(encode_counts({"3": 2})) == PackedCounts([3], [2]).to_bytes()
+        assert counts_to_bytes(encode_counts({"11 1": 2})) is None
+
+    def test_merge_adds_counts(self):
+        first = PackedCounts.from_bitstrings({"00": 2, "11": 3})
+        second = PackedCounts.from_bitstrings({"11": 4, "01": 1})
+
+        assert dict(PackedCounts.merge([first, second])) == {"0": 2, "1": 1, "3": 7}
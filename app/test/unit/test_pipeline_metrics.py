@@ -0,0 +1,60 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from app.main.service.pipeline_metrics import PipelineMetrics, qubit_bucket, render_metrics
+
+
+class TestPipelineMetrics:
+    """
+    Unit tests for the Redis-aggregated pipeline metrics
+    """
+
+    def test_qubit_buckets(self):
+        assert qubit_bucket(1) == "1-5"
+        assert qubit_bucket(5) == "1-5"
+        assert qubit_bucket(6) == "6-10"
+        assert qubit_bucket(30) == "26-30"
+        assert qubit_bucket(31) == "31+"
+
+    def test_histograms_aggregate_across_workers(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        first = PipelineMetrics(flush_interval=60)
+        second = PipelineMetrics(flush_interval=60)
+
+        first.observe_stages({"parse": 0.002, "simulate": 0.2})
+        second.observe_stages({"parse": 0.02})
+        second.increment("quantum_tasks_total", outcome="completed")
+        second.increment("quantum_tasks_total", outcome="completed")
+
+        async def scenario():
+            await first.flush(redis_client, force=True)
+            await second.flush(redis_client, force=True)
+            # Nothing new was observed, so a second flush adds nothing
+            await second.flush(redis_client, force=True)
+            return await render_metrics(redis_client)
+
+        lines = asyncio.run(scenario()).splitlines()
+
+        assert 'quantum_stage_seconds_bucket{stage="parse",le="0.001"} 0' in lines
+        assert 'quantum_stage_seconds_bucket{stage="parse",le="0.005"} 1' in lines
+        assert 'quantum_stage_seconds_bucket{stage="parse",le="0.05"} 2' in lines, "Buckets are cumulative"
+        assert 'quantum_stage_seconds_bucket{stage="parse",le="+Inf"} 2' in lines
+        assert 'quantum_stage_seconds_count{stage="parse"} 2' in lines
+        assert 'quantum_stage_seconds_count{stage="simulate"} 1' in lines
+        assert 'quantum_tasks_total{outcome="completed"} 2' in lines
+        assert "quantum_queue_depth 0" in lines
+
+        parse_buckets = [line for line in lines if line.startswith('quantum_stage_seconds_bucket{stage="parse"')]
+        assert parse_buckets[-1].startswith('quantum_stage_seconds_bucket{stage="parse",le="+Inf"}')
+
+    def test_flush_waits_for_interval(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        metrics = PipelineMetrics(flush_interval=60)
+        metrics.increment("quantum_tasks_total", outcome="error")
+
+        async def scenario():
+            await metrics.flush(redis_client)
+            return await render_metrics(redis_client)
+
+        assert 'quantum_tasks_total{outcome="error"} 1' not in asyncio.run(scenario()).splitlines()
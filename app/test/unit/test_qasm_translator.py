@@ -0,0 +1,70 @@
+from app.main.service.qasm_translator import QasmTranslator, translate_qasm
+
+QASM3_PROGRAM = """OPENQASM 3.0;
+include "stdgates.inc";
+// two-qubit register
+qubit[2] q;
+bit[2] c;
+qubit ancilla;
+bit flag;
+/* block comment with ; and { } inside */
+h q[0];
+cx q[0],
+   q[1];
+c[0] = measure q[0];
+c[1] = measure q[1];
+flag = measure ancilla;
+"""
+
+
+class TestQasmTranslator:
+    """
+    Unit tests for the streaming QASM 3 to QASM 2 translator
+    """
+
+    def test_translates_qasm3_constructs(self):
+        assert translate_qasm(QASM3_PROGRAM).splitlines() == [
+            "OPENQASM 2.0;",
+            'include "qelib1.inc";',
+            "qreg q[2];",
+            "creg c[2];",
+            "qreg ancilla[1];",
+            "creg flag[1];",
+            "h q[0];",
+            "cx q[0], q[1];",
+            "measure q[0] -> c[0];",
+            "measure q[1] -> c[1];",
+            "measure ancilla -> flag;",
+        ]
+
+    def test_adds_missing_include_to_single_line_qasm2(self):
+        translated = translate_qasm("OPENQASM 2.0; qreg q[1]; creg c[1]; h q[0]; measure q -> c;")
+
+        assert translated.splitlines()[:3] == ["OPENQASM 2.0;", 'include "qelib1.inc";', "qreg q[1];"]
+
+    def test_does_not_duplicate_include(self):
+        translated = translate_qasm('OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[1];')
+
+        assert translated.count("qelib1.inc") == 1
+
+    def test_other_versions_pass_through(self):
+        translated = translate_qasm("OPENQASM 4.0;\nqubit[2] q;")
+
+        assert translated.splitlines() == ["OPENQASM 4.0;", "qubit[2] q;"]
+
+    def test_chunk_boundaries_do_not_change_output(self):
+        expected = translate_qasm(QASM3_PROGRAM)
+
+        translator = QasmTranslator()
+        pieces = [translator.feed(character) for character in QASM3_PROGRAM]
+        pieces.append(translator.close())
+
+        assert "".join(pieces) == expected
+        assert translate_qasm(QASM3_PROGRAM.splitlines(keepends=True)) == expected
+
+    def test_gate_definitions_kept(self):
+        translated = translate_qasm("OPENQASM 2.0;\ngate bell a, b { h a; cx a, b; }\nqreg q[2];\nbell q[0], q[1];")
+
+        assert "gate bell a, b {" in translated
+        assert "h a;" in translated
+        assert "}" in translated
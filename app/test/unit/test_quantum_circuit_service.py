@@ -0,0 +1,332 @@
+import asyncio
+import time
+
+import pytest
+
+from app.main.service.admission_control import AdmissionController
+from app.main.service.circuit_cache import CircuitCache, estimate_circuit_size
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.service.simulation_executor import SimulationExecutor
+from app.main.service.simulator_pool import SimulatorPool
+from app.main.service.statevector_engine import StatevectorEngine
+
+BELL_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[2];
+h q[0];
+cx q[0], q[1];
+measure q -> c;
+"""
+
+# The reset keeps it off final state sampling, so its shots are simulated one by one
+RESET_BELL_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[2];
+reset q;
+h q[0];
+cx q[0], q[1];
+measure q -> c;
+"""
+
+# Non-Clifford and shallow, the analyzer picks statevector for it
+ROTATIONS_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[14];
+creg c[14];
+rx(0.3) q;
+measure q -> c;
+"""
+
+
+def _sleep_and_return(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class SlowService(QuantumCircuitService):
+    def run_qasm(self, qasm_string, shots=None, seed=None, method=None, memory=False):
+        time.sleep(1)
+        return super().run_qasm(qasm_string, shots, seed, method, memory)
+
+
+class ShotRecordingService(QuantumCircuitService):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shots_run = []
+        self.seeds_run = []
+
+    def run_qasm(self, qasm_string, shots=None, seed=None, method=None, memory=False):
+        self.shots_run.append(shots)
+        self.seeds_run.append(seed)
+        return super().run_qasm(qasm_string, shots, seed, method, memory)
+
+
+class TestQuantumCircuitService:
+    """
+    Unit tests for QuantumCircuitService running in-process
+    """
+
+    def test_execute_bell_state(self):
+        service = QuantumCircuitService(shots=256)
+
+        result = asyncio.run(service.execute_qasm(BELL_QASM))
+
+        assert result["error"] is False
+        assert set(result["counts"]) <= {"0", "3"}
+        assert sum(result["counts"].values()) == 256
+
+    def test_execute_on_process_executor(self):
+        executor = SimulationExecutor(kind="process", max_workers=1, max_concurrency=1)
+        try:
+            service = QuantumCircuitService(shots=128, executor=executor)
+            result = asyncio.run(service.execute_qasm(BELL_QASM))
+        finally:
+            executor.shutdown()
+
+        assert sum(result["counts"].values()) == 128
+
+    def test_timeout_stops_running_process_call(self):
+        executor = SimulationExecutor(kind="process", max_workers=1, max_concurrency=1)
+
+        async def scenario():
+            # Warm the pool up so the timed-out call is really running
+            await executor.run(_sleep_and_return, 0)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(executor.run(_sleep_and_return, 30), timeout=0.5)
+            started = time.perf_counter()
+            result = await asyncio.wait_for(executor.run(_sleep_and_return, 0), timeout=20)
+            return result, time.perf_counter() - started
+
+        try:
+            result, elapsed = asyncio.run(scenario())
+        finally:
+            executor.shutdown(wait=False)
+
+        assert result == 0
+        assert elapsed < 20, "Timed-out call should not keep holding the only slot"
+
+    def test_simulation_does_not_block_event_loop(self):
+        executor = SimulationExecutor(kind="thread", max_workers=1, max_concurrency=1)
+        service = SlowService(shots=16, executor=executor)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(service.execute_qasm(BELL_QASM), timeout=0.2)
+            elapsed = time.perf_counter() - started
+            ticker_task.cancel()
+            return ticks, elapsed
+
+        ticks, elapsed = asyncio.run(scenario())
+        executor.shutdown()
+
+        assert elapsed < 0.5, "wait_for timeout should fire while the simulation is still running"
+        assert ticks > 5, "Event loop should keep running while the simulation executes"
+
+    def test_concurrency_limit(self):
+        executor = SimulationExecutor(kind="thread", max_workers=4, max_concurrency=2)
+        running = 0
+        peak = 0
+
+        def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            time.sleep(0.05)
+            running -= 1
+
+        async def scenario():
+            await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+        asyncio.run(scenario())
+        executor.shutdown()
+
+        assert peak <= 2
+
+    def test_simulators_reused_from_pool(self):
+        pool = SimulatorPool(size=2)
+        pool.warm_up(methods=["stabilizer"], instances=1)
+        service = QuantumCircuitService(shots=32, simulator_pool=pool, statevector_max_qubits=0)
+
+        for _ in range(3):
+            asyncio.run(service.execute_qasm(BELL_QASM))
+
+        assert pool.created == 1, "Warm simulator should be reused for every run"
+        assert pool.checkouts == 3
+
+    def test_pool_separates_configurations(self):
+        pool = SimulatorPool(size=2)
+
+        with pool.checkout("statevector") as first:
+            with pool.checkout("statevector") as second:
+                assert first is not second, "Concurrent runs must not share a simulator"
+        with pool.checkout("stabilizer") as stabilizer:
+            assert stabilizer.options.method == "stabilizer"
+        with pool.checkout("statevector") as reused:
+            assert reused in (first, second)
+
+    def test_parsed_circuits_cached(self):
+        circuit_cache = CircuitCache()
+        service = QuantumCircuitService(shots=32, circuit_cache=circuit_cache)
+
+        for _ in range(3):
+            result = asyncio.run(service.execute_qasm(BELL_QASM))
+            assert sum(result["counts"].values()) == 32
+
+        stats = circuit_cache.stats()
+        # Every run looks the circuit up once to plan it and once to simulate it
+        assert stats["misses"] == 1
+        assert stats["hits"] == 5
+        assert stats["entries"] == 1
+
+    def test_circuit_cache_memory_bound(self):
+        service = QuantumCircuitService()
+        circuit = service._parse_circuit(service._preprocess_qasm(BELL_QASM))
+        circuit_cache = CircuitCache(max_bytes=2 * estimate_circuit_size(circuit))
+
+        for index in range(4):
+            circuit_cache.get_or_create(f"circuit-{index}", lambda: circuit)
+
+        stats = circuit_cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 2
+        assert stats["size_bytes"] <= circuit_cache.max_bytes
+
+    def test_small_circuits_use_statevector_engine(self):
+        pool = SimulatorPool(size=1)
+        service = QuantumCircuitService(shots=512, simulator_pool=pool, statevector_max_qubits=2)
+
+        result = asyncio.run(service.execute_qasm(BELL_QASM, seed=7))
+
+        assert pool.checkouts == 0, "Bell state should not reach Aer"
+        assert set(result["counts"]) == {"0", "3"}
+        assert sum(result["counts"].values()) == 512
+        assert result["counts"] == asyncio.run(service.execute_qasm(BELL_QASM, seed=7))["counts"]
+
+        service = QuantumCircuitService(shots=32, simulator_pool=pool, statevector_max_qubits=1)
+        asyncio.run(service.execute_qasm(BELL_QASM))
+        assert pool.checkouts == 1, "Circuits above the threshold run on Aer"
+
+    def test_statevector_engine_matches_aer_layout(self):
+        qasm = """
+        OPENQASM 2.0;
+        include "qelib1.inc";
+        qreg q[3];
+        creg a[1];
+        creg b[2];
+        x q[0];
+        u3(3.141592653589793, 0, 0) q[2];
+        ccx q[0], q[2], q[1];
+        measure q[0] -> a[0];
+        measure q[1] -> b[0];
+        measure q[2] -> b[1];
+        """
+        service = QuantumCircuitService(statevector_max_qubits=0)
+        circuit = service._parse_circuit(service._preprocess_qasm(qasm))
+        engine = StatevectorEngine()
+
+        assert engine.supports(circuit)
+        assert engine.run(circuit, shots=8) == {"11 1": 8}
+
+        circuit.h(0)
+        assert not engine.supports(circuit), "Gates after a measurement need Aer"
+
+    def test_oversized_circuit_falls_back_to_matrix_product_state(self):
+        # 2^14 amplitudes take 256 KiB, a shallow matrix-product state a few KiB
+        service = QuantumCircuitService(shots=64, statevector_max_qubits=0, max_job_memory=64 * 1024)
+
+        result = asyncio.run(service.execute_qasm(ROTATIONS_QASM))
+
+        assert result["error"] is False
+        assert result["method"] == "matrix_product_state"
+        assert sum(result["counts"].values()) == 64
+
+    def test_circuit_exceeding_job_limits_rejected(self):
+        pool = SimulatorPool(size=1)
+        service = QuantumCircuitService(shots=64, simulator_pool=pool, statevector_max_qubits=0, max_job_memory=1024)
+
+        result = asyncio.run(service.execute_qasm(ROTATIONS_QASM))
+        batch = service.run_batch([ROTATIONS_QASM, BELL_QASM])
+
+        assert result["error"] is True
+        assert "statevector" in result["message"] and "14 qubits" in result["message"]
+        assert pool.checkouts == 1, "Only the Bell state of the batch should be simulated"
+        assert batch[0]["error"] is True
+        assert batch[1]["error"] is False
+
+    def test_admission_waits_for_memory_budget(self):
+        controller = AdmissionController(budget=100)
+
+        async def scenario():
+            admitted = []
+
+            async def second():
+                async with controller.reserve(80):
+                    admitted.append(controller.committed())
+
+            async with controller.reserve(80):
+                waiting = asyncio.create_task(second())
+                await asyncio.sleep(0.2)
+                assert not admitted, "Second job does not fit next to the first"
+            await waiting
+            return admitted
+
+        assert asyncio.run(scenario()) == [80]
+        assert controller.committed() == 0
+        assert controller.waits == 1
+
+    def test_shots_sharded_with_derived_seeds(self):
+        service = ShotRecordingService(shots=1000, shot_shard_size=300, max_shards=8)
+
+        first = asyncio.run(service.execute_qasm(RESET_BELL_QASM, seed=11))
+        second = asyncio.run(service.execute_qasm(RESET_BELL_QASM, seed=11))
+
+        assert sorted(service.shots_run[:4]) == [250, 250, 250, 250]
+        assert len(set(service.seeds_run[:4])) == 4, "Shards must sample independently"
+        assert sum(first["counts"].values()) == 1000
+        assert set(first["counts"]) == {"0", "3"}
+        assert first["counts"] == second["counts"], "Seeded sharded runs are reproducible"
+        assert QuantumCircuitService(shot_shard_size=300, max_shards=2).shard_shots(1000, seed=11)[0][0] == 500
+
+    def test_terminal_measurements_sampled_from_final_state(self):
+        pool = SimulatorPool(size=1)
+        service = ShotRecordingService(simulator_pool=pool, statevector_max_qubits=0, shot_shard_size=300)
+
+        result = asyncio.run(service.execute_qasm(ROTATIONS_QASM, shots=10 ** 7, seed=5))
+
+        assert service.shots_run == [10 ** 7], "Final state sampling is never sharded"
+        assert result["method"] == "statevector"
+        assert sum(result["counts"].values()) == 10 ** 7
+        # Every qubit reads 1 with probability sin^2(0.15)
+        ones = sum(count for outcome, count in result["counts"].items() if int(outcome) & 1)
+        assert ones / 10 ** 7 == pytest.approx(0.0223, abs=0.001)
+        assert result["counts"] == asyncio.run(service.execute_qasm(ROTATIONS_QASM, shots=10 ** 7, seed=5))["counts"]
+
+        # Shot memory needs every shot simulated, which Aer samples from the same distribution
+        per_shot = asyncio.run(service.execute_qasm(ROTATIONS_QASM, shots=20000, seed=5, memory=True))
+        ones = sum(count for outcome, count in per_shot["counts"].items() if int(outcome) & 1)
+        assert ones / 20000 == pytest.approx(0.0223, abs=0.005)
+
+    def test_mid_circuit_measurements_simulated_per_shot(self):
+        service = QuantumCircuitService(statevector_max_qubits=0)
+        mid_circuit = BELL_QASM.replace("measure q -> c;", "measure q[0] -> c[0];\nh q[0];\nmeasure q -> c;")
+
+        for qasm, expected in ((ROTATIONS_QASM, True), (RESET_BELL_QASM, False), (mid_circuit, False)):
+            assert service.plan_qasm(qasm, shots=1000).final_state_sampling is expected
+
+        assert not QuantumCircuitService(final_state_sampling_max_qubits=13, statevector_max_qubits=0) \
+            .plan_qasm(ROTATIONS_QASM, shots=1000).final_state_sampling
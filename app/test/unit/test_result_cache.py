@@ -0,0 +1,92 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from app.main.service.counts_encoding import decode_counts
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.service.result_cache import ResultCache
+from app.main.service.task_processor import process_quantum_circuit
+
+GHZ_QASM = "OPENQASM 3.0;\nqreg q[3];\ncreg c[3];\nh q[0];\ncx q[0], q[1];\ncx q[1], q[2];\nmeasure q -> c;"
+
+
+class CountingService(QuantumCircuitService):
+    """QuantumCircuitService that counts how often it really simulates"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.runs = 0
+
+    def run_qasm(self, qasm_string, shots=None, seed=None, method=None, memory=False):
+        self.runs += 1
+        return super().run_qasm(qasm_string, shots, seed, method, memory)
+
+
+class TestResultCache:
+    """
+    Unit tests for the content-addressed result cache
+    """
+
+    def _process(self, redis_client, service, result_cache, task_id, qasm, **kwargs):
+        async def scenario():
+            await process_quantum_circuit(redis_client, service, task_id, qasm, result_cache=result_cache, **kwargs)
+            return await redis_client.hgetall(f"task:{task_id}")
+
+        return asyncio.run(scenario())
+
+    def test_seeded_submission_served_from_cache(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        result_cache = ResultCache(redis_client)
+        service = CountingService(shots=512)
+
+        first = self._process(redis_client, service, result_cache, "first", GHZ_QASM, seed=7)
+        # Same circuit with different layout and comments
+        relaid = "  // GHZ\n" + GHZ_QASM.replace("\n", "\n\n  ")
+        second = self._process(redis_client, service, result_cache, "second", relaid, seed=7)
+
+        assert service.runs == 1, "Second submission should not reach the simulator"
+        assert decode_counts(second["result"]) == decode_counts(first["result"])
+        assert second["cached"] == "true"
+        stats = asyncio.run(result_cache.stats())
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_cache_keyed_by_shots_and_seed(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        result_cache = ResultCache(redis_client)
+        service = CountingService(shots=512)
+
+        self._process(redis_client, service, result_cache, "a", GHZ_QASM, seed=7)
+        self._process(redis_client, service, result_cache, "b", GHZ_QASM, seed=8)
+        self._process(redis_client, service, result_cache, "c", GHZ_QASM, seed=7, shots=100)
+        self._process(redis_client, service, result_cache, "d", GHZ_QASM)
+
+        assert service.runs == 4
+
+    def test_bypass_cache(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        result_cache = ResultCache(redis_client)
+        service = CountingService(shots=512)
+
+        self._process(redis_client, service, result_cache, "a", GHZ_QASM, seed=7)
+        self._process(redis_client, service, result_cache, "b", GHZ_QASM, seed=7, use_cache=False)
+
+        assert service.runs == 2
+
+    def test_least_recently_used_entries_evicted(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        result_cache = ResultCache(redis_client, max_entries=2)
+
+        async def scenario():
+            await result_cache.put("a", {"0": 1})
+            await result_cache.put("b", {"0": 2})
+            assert await result_cache.get("a") == {"0": 1}
+            await result_cache.put("c", {"0": 3})
+
+            assert await result_cache.get("b") is None, "Least recently used entry should be evicted"
+            assert await result_cache.get("a") == {"0": 1}
+            return await result_cache.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
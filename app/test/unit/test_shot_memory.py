@@ -0,0 +1,67 @@
+import asyncio
+
+import fakeredis.aioredis
+import numpy as np
+
+from app.main.service.quantum_circuit_service import QuantumCircuitService
+from app.main.service.shot_memory import ShotMemory, memory_from_bitstrings, pack_shots, unpack_shots
+
+TWO_REGISTERS_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[3];
+creg a[1];
+creg b[2];
+h q[0];
+x q[2];
+measure q[0] -> a[0];
+measure q[1] -> b[0];
+measure q[2] -> b[1];
+"""
+
+
+class TestShotMemory:
+    """
+    Unit tests for per-shot memory packing and chunked storage
+    """
+
+    def test_pack_round_trip(self):
+        values = np.random.default_rng(5).integers(0, 2 ** 13, size=1001, dtype=np.uint64)
+
+        packed = pack_shots(values, 13)
+
+        assert len(packed) == -(-1001 * 13 // 8)
+        assert unpack_shots(packed, 13, 1001).tolist() == values.tolist()
+
+    def test_bitstrings_keep_clbit_positions(self):
+        assert memory_from_bitstrings(["10 1", "00 0"], 3).tolist() == [5, 0]
+
+    def test_service_returns_memory_in_shard_order(self):
+        service = QuantumCircuitService(shots=300, shot_shard_size=100)
+
+        result = asyncio.run(service.execute_qasm(TWO_REGISTERS_QASM, seed=3, memory=True))
+
+        assert result["memory_width"] == 3
+        assert len(result["memory"]) == 300
+        assert set(result["memory"].tolist()) <= {4, 5}, "Clbit 2 is always set and clbit 1 never"
+        assert np.count_nonzero(result["memory"] == 5) == result["counts"]["10 1"]
+        repeated = asyncio.run(service.execute_qasm(TWO_REGISTERS_QASM, seed=3, memory=True))
+        assert repeated["memory"].tolist() == result["memory"].tolist()
+
+    def test_ranges_read_one_chunk_at_a_time(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        shot_memory = ShotMemory(redis_client, chunk_shots=64)
+        values = np.arange(200, dtype=np.uint64) % 7
+
+        async def scenario():
+            pipeline = redis_client.pipeline()
+            task_data = shot_memory.add("task-1", values, 3, pipeline)
+            await pipeline.execute()
+            task_data = {key: str(value) for key, value in task_data.items()}
+            return [(offset, outcomes.tolist()) async for offset, outcomes in
+                    shot_memory.read("task-1", task_data, start=60, stop=140)]
+
+        slices = asyncio.run(scenario())
+
+        assert [offset for offset, _ in slices] == [60, 64, 128]
+        assert sum((outcomes for _, outcomes in slices), []) == values[60:140].tolist()
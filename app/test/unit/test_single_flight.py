@@ -0,0 +1,52 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from app.main.service.single_flight import SingleFlight, flight_key
+
+BELL_QASM = "OPENQASM 3.0;\nqreg q[2];\ncreg c[2];\nh q[0];\ncx q[0], q[1];\nmeasure q -> c;"
+
+
+class TestSingleFlight:
+    """
+    Unit tests for coalescing identical submissions behind a Redis lease
+    """
+
+    def test_flight_key_ignores_layout(self):
+        relaid = "  // Bell pair\n" + BELL_QASM.replace("\n", "\n\n   ")
+        assert flight_key(relaid, 100, 7) == flight_key(BELL_QASM, 100, 7)
+        assert flight_key(BELL_QASM, 100, 8) != flight_key(BELL_QASM, 100, 7)
+        assert flight_key(BELL_QASM, None, 7) != flight_key(BELL_QASM, 100, 7)
+
+    def test_followers_attach_until_leader_releases(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        flights = [SingleFlight(redis_client), SingleFlight(redis_client)]
+
+        async def scenario():
+            assert await flights[0].join("key", "a") is None
+            assert await flights[1].join("key", "b") == "a"
+            assert await flights[0].join("key", "c") == "a"
+            assert await flights[1].join("other", "d") is None
+
+            assert await flights[0].release("key", "a") == ["b", "c"]
+            # The flight is over, so the next submission leads a new one
+            assert await flights[1].join("key", "e") is None
+            assert await flights[1].release("key", "e") == []
+
+        asyncio.run(scenario())
+
+    def test_expired_lease_keeps_new_leader(self):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        single_flight = SingleFlight(redis_client)
+
+        async def scenario():
+            assert await single_flight.join("key", "a") is None
+            await redis_client.delete("inflight:key")
+            assert await single_flight.join("key", "b") is None
+            assert await single_flight.join("key", "c") == "b"
+
+            # The stale leader hands over the waiting follower but leaves the lease of b alone
+            assert await single_flight.release("key", "a") == ["c"]
+            assert await single_flight.join("key", "d") == "b"
+
+        asyncio.run(scenario())
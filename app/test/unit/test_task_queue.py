@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import redis
+
+from app.main.models.QueuedTask import QueuedTask
+from app.main.service import task_scheduler
+from app.main.service.counts_encoding import decode_counts
+from app.main.service.task_queue import TaskQueue
+from app.main.service.task_scheduler import estimate_cost
+from app.main import worker
+from app.main.worker import run_worker
+
+
+class FlakyRedis(fakeredis.aioredis.FakeRedis):
+    """Asyncio FakeRedis whose first status writes fail as if the connection dropped"""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def zmscore(self, *args, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise redis.ConnectionError("Connection reset by peer")
+        return await super().zmscore(*args, **kwargs)
+
+
+BELL_QASM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[2];
+h q[0];
+cx q[0], q[1];
+measure q -> c;
+"""
+
+WIDE_QASM = "OPENQASM 3.0;\nqubit[28] q;\nbit[28] c;\nh q;\n" + "".join(
+    f"cx q[{qubit}], q[{qubit + 1}];\n" for qubit in range(27)) + "c = measure q;"
+
+
+class TestTaskQueue:
+    """
+    Unit tests for the Redis-backed work queue and worker loop
+    """
+
+    def test_reserve_and_ack(self):
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+
+        task_queue.enqueue(QueuedTask(task_id="first", qc=BELL_QASM))
+        task_queue.enqueue(QueuedTask(task_id="second", qc=BELL_QASM))
+
+        raw, task = task_queue.reserve("worker-a", timeout=1)
+        assert task.task_id == "first", "Tasks should be reserved in submission order"
+        assert task_queue.depth() == 1
+        assert redis_client.llen("tasks:processing:worker-a") == 1
+
+        task_queue.ack("worker-a", raw)
+        assert redis_client.llen("tasks:processing:worker-a") == 0
+
+    def test_orphaned_tasks_are_requeued(self):
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+
+        task_queue.register("worker-a")
+        task_queue.enqueue(QueuedTask(task_id="in-flight", qc=BELL_QASM))
+        task_queue.reserve("worker-a", timeout=1)
+
+        assert task_queue.requeue_orphaned() == 0, "Live workers must keep their tasks"
+
+        redis_client.delete("tasks:heartbeat:worker-a")
+        assert task_queue.requeue_orphaned() == 1
+
+        _, task = task_queue.reserve("worker-b", timeout=1)
+        assert task.task_id == "in-flight"
+
+    def test_worker_executes_queued_task(self):
+        server = fakeredis.FakeServer()
+        redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+
+        redis_client.hset("task:bell", mapping={"status": "pending"})
+        task_queue.enqueue(QueuedTask(task_id="bell", qc=BELL_QASM))
+
+        asyncio.run(run_worker("worker-a", redis_client=redis_client, max_tasks=1,
+                               async_redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)))
+
+        task_data = redis_client.hgetall("task:bell")
+        assert task_data["status"] == "completed"
+        counts = decode_counts(task_data["result"])
+        assert set(counts) <= {"0", "3"}
+        assert sum(counts.values()) == 1024
+        assert redis_client.llen("tasks:processing:worker-a") == 0, "Completed task should be acknowledged"
+
+    def test_heartbeat_registers_worker_again(self):
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+
+        task_queue.register("worker-a")
+        redis_client.srem("tasks:workers", "worker-a")
+        task_queue.heartbeat("worker-a")
+
+        assert redis_client.sismember("tasks:workers", "worker-a")
+
+    def test_worker_survives_redis_error(self, monkeypatch):
+        monkeypatch.setattr(worker, "REDIS_ERROR_BACKOFF", 0)
+        server = fakeredis.FakeServer()
+        redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+        task_queue.enqueue(QueuedTask(task_id="bell", qc=BELL_QASM))
+
+        asyncio.run(run_worker("worker-a", redis_client=redis_client, max_tasks=1,
+                               async_redis_client=FlakyRedis(failures=2, server=server, decode_responses=True)))
+
+        assert redis_client.hgetall("task:bell")["status"] == "completed", \
+            "Task should be retried after the Redis error instead of ending the worker"
+        assert task_queue.depth() == 0
+        assert redis_client.llen("tasks:processing:worker-a") == 0
+
+    def test_cheap_and_high_priority_tasks_run_first(self):
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+        now = time.time()
+        wide = estimate_cost(WIDE_QASM)
+        bell = estimate_cost(BELL_QASM)
+        assert (wide.num_qubits, bell.num_qubits, bell.num_gates, bell.depth) == (28, 2, 2, 2)
+        assert wide.seconds > bell.seconds
+
+        task_queue.enqueue(QueuedTask(task_id="wide", qc=WIDE_QASM, cost=wide.seconds, enqueued_at=now))
+        task_queue.enqueue(QueuedTask(task_id="bell", qc=BELL_QASM, cost=bell.seconds, enqueued_at=now + 1))
+        task_queue.enqueue(QueuedTask(task_id="urgent", qc=WIDE_QASM, cost=wide.seconds, priority="high",
+                                      enqueued_at=now + 2))
+        task_queue.enqueue(QueuedTask(task_id="late", qc=BELL_QASM, cost=bell.seconds,
+                                      enqueued_at=now + task_scheduler.SCHEDULER_MAX_DELAY + 1))
+
+        order = [task_queue.reserve("worker-a", timeout=1)[1].task_id for _ in range(4)]
+        assert order == ["urgent", "bell", "wide", "late"], "Expensive tasks must age ahead of later submissions"
+
+    def test_released_task_keeps_its_position(self):
+        redis_client = fakeredis.FakeRedis(decode_responses=True)
+        task_queue = TaskQueue(redis_client)
+        now = time.time()
+        task_queue.enqueue(QueuedTask(task_id="first", qc=BELL_QASM, enqueued_at=now))
+        task_queue.enqueue(QueuedTask(task_id="second", qc=BELL_QASM, enqueued_at=now + 1))
+
+        raw, _ = task_queue.reserve("worker-a", timeout=1)
+        task_queue.release("worker-a", raw)
+
+        assert task_queue.reserve("worker-a", timeout=1)[1].task_id == "first"
+        assert task_queue.reserve("worker-b", timeout=0.1)[1].task_id == "second"
+        assert task_queue.reserve("worker-b", timeout=0.1) is None